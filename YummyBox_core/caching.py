@@ -0,0 +1,203 @@
+"""
+Cache à deux niveaux : LRU en mémoire du processus (TTL court, taille bornée)
+puis cache partagé Django (Redis, mémoire locale en développement).
+
+Une clé expirée n'est reconstruite qu'une fois : les threads du même
+processus attendent le premier (single-flight), les autres processus voient
+le verrou posé par cache.add() et servent l'ancienne valeur pendant la
+reconstruction, ou l'attendent s'il n'y en a pas.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+
+from .metrics import registry
+
+RESULTS = ('local', 'shared', 'stale', 'wait', 'coalesced', 'miss')
+
+_namespaces = {}
+
+
+class LocalLRU:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.ok = False
+        self.value = None
+
+
+class TieredCache:
+    """
+    get_or_set(key, builder) : valeur en cache, sinon builder() appelé une
+    seule fois pour tous les demandeurs.
+
+    ttl : fraîcheur dans le cache partagé ; stale_ttl : délai pendant lequel
+    l'ancienne valeur reste servie pendant sa reconstruction ; local_ttl :
+    durée de vie en mémoire du processus (borne la désynchronisation entre
+    workers quand la clé n'est pas versionnée).
+    """
+
+    def __init__(self, namespace, ttl=300, local_ttl=5, stale_ttl=60, maxsize=1024,
+                 lock_timeout=10, poll_interval=0.05, alias='default'):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.stale_ttl = stale_ttl
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self.alias = alias
+        self.local = LocalLRU(maxsize)
+        self.flights_lock = threading.Lock()
+        self.flights = {}
+        self.counts = dict.fromkeys(RESULTS, 0)
+        _namespaces[namespace] = self
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def make_key(self, key):
+        return f'tiered:{self.namespace}:{key}'
+
+    def _count(self, result):
+        with self.flights_lock:
+            self.counts[result] += 1
+        registry.record_cache(self.namespace, result)
+
+    def get_or_set(self, key, builder):
+        full_key = self.make_key(key)
+        entry = self.local.get(full_key)
+        if entry is not None:
+            self._count('local')
+            return entry[1]
+
+        with self.flights_lock:
+            flight = self.flights.get(full_key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[full_key] = _Flight()
+        if not leader:
+            flight.done.wait(self.lock_timeout)
+            if flight.ok:
+                self._count('coalesced')
+                return flight.value
+            # Le premier a échoué ou tarde : on tente nous-mêmes
+            return self._load(full_key, builder)
+
+        try:
+            flight.value = self._load(full_key, builder)
+            flight.ok = True
+            return flight.value
+        finally:
+            with self.flights_lock:
+                del self.flights[full_key]
+            flight.done.set()
+
+    async def aget_or_set(self, key, builder):
+        # Lecture locale sans quitter la boucle d'événements ; sinon cache
+        # partagé et reconstruction (bloquants) dans un thread
+        entry = self.local.get(self.make_key(key))
+        if entry is not None:
+            self._count('local')
+            return entry[1]
+        return await sync_to_async(self.get_or_set)(key, builder)
+
+    def _load(self, full_key, builder):
+        envelope = self.shared.get(full_key)
+        if envelope is not None:
+            fresh_until, value = envelope
+            if fresh_until > time.time():
+                self._remember(full_key, fresh_until, value)
+                self._count('shared')
+                return value
+
+        lock_key = f'{full_key}:lock'
+        token = uuid.uuid4().hex
+        if not self.shared.add(lock_key, token, self.lock_timeout):
+            if envelope is not None:
+                # Un autre processus reconstruit : l'ancienne valeur suffit
+                self._count('stale')
+                return envelope[1]
+            value = self._wait_for(full_key)
+            if value is not None:
+                self._count('wait')
+                return value[1]
+            # Verrou expiré sans résultat (processus tué, construction trop lente)
+        try:
+            value = builder()
+            fresh_until = time.time() + self.ttl
+            self.shared.set(full_key, (fresh_until, value), self.ttl + self.stale_ttl)
+            self._remember(full_key, fresh_until, value)
+        finally:
+            if self.shared.get(lock_key) == token:
+                self.shared.delete(lock_key)
+        self._count('miss')
+        return value
+
+    def _wait_for(self, full_key):
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            envelope = self.shared.get(full_key)
+            if envelope is not None and envelope[0] > time.time():
+                self._remember(full_key, *envelope)
+                return envelope
+        return None
+
+    def _remember(self, full_key, fresh_until, value):
+        ttl = min(self.local_ttl, fresh_until - time.time())
+        if ttl > 0:
+            self.local.set(full_key, value, ttl)
+
+    def delete(self, key):
+        full_key = self.make_key(key)
+        self.local.delete(full_key)
+        self.shared.delete(full_key)
+
+    def stats(self):
+        with self.flights_lock:
+            counts = dict(self.counts)
+        total = sum(counts.values())
+        counts['hit_ratio'] = round((total - counts['miss']) / total, 4) if total else None
+        return counts
+
+
+def cache_stats():
+    """Compteurs et taux de succès par espace de noms, pour ce processus."""
+    return {namespace: layer.stats() for namespace, layer in _namespaces.items()}
@@ -0,0 +1,70 @@
+"""
+Mesures par requête : requêtes SQL, temps base de données et temps de rendu.
+
+Les compteurs vivent dans une ContextVar ouverte par RequestMetricsMiddleware ;
+hors requête (commandes, shell), rien n'est mesuré.
+"""
+import time
+from contextvars import ContextVar
+
+from django.template.backends.django import DjangoTemplates, Template
+
+_timings = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    __slots__ = ('db_seconds', 'db_queries', 'template_seconds', 'template_depth')
+
+    def __init__(self):
+        self.db_seconds = 0.0
+        self.db_queries = 0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+
+
+def start():
+    timings = RequestTimings()
+    return timings, _timings.set(timings)
+
+
+def stop(token):
+    _timings.reset(token)
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_seconds += time.perf_counter() - started
+        timings.db_queries += 1
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timings = _timings.get()
+        if timings is None:
+            return super().render(context, request)
+        # Seul le rendu le plus externe compte (pas de double comptage des imbrications)
+        timings.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings.template_depth -= 1
+            if timings.template_depth == 0:
+                timings.template_seconds += time.perf_counter() - started
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Moteur de templates Django standard dont les rendus sont chronométrés."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
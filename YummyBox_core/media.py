@@ -0,0 +1,170 @@
+"""
+Service des fichiers envoyés (MEDIA_ROOT : images des recettes et leurs
+déclinaisons), en production comme en développement.
+
+- Validateurs : ETag (date de modification et taille) et Last-Modified, tirés
+  d'un stat() ; If-None-Match / If-Modified-Since répondent 304 sans ouvrir le
+  fichier.
+- Cache : un an, immutable, pour les déclinaisons (RENDITIONS_DIR, noms avec
+  une empreinte du contenu, voir recipes.images) ; MEDIA_MAX_AGE sinon, même
+  pour un envoi dont le nom ressemble à une déclinaison.
+- Plages : un seul intervalle Range (If-Range respecté), 206 ou 416 ; une
+  demande de plusieurs intervalles reçoit le fichier complet (RFC 9110).
+- Transfert, selon MEDIA_ACCEL :
+    ''       : FileResponse sur le fichier ; gunicorn l'envoie par sendfile(2),
+               sans copie, en partant de la position courante et en s'arrêtant
+               à Content-Length (une plage aussi). Workers sync seulement :
+               uvicorn lirait le fichier en Python, d'où MEDIA_ACCEL exigé
+               sous SERVER_MODE=asgi (settings) ;
+    'nginx'  : en-tête X-Accel-Redirect vers MEDIA_ACCEL_PREFIX, location
+               `internal` du proxy qui envoie le fichier (et gère les plages) ;
+    'sendfile' : en-tête X-Sendfile avec le chemin absolu (Apache
+               mod_xsendfile, lighttpd).
+  Avec un proxy, le worker ne fait que le stat() : aucun octet d'image ne passe
+  par Python, même pour un client lent.
+"""
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+from recipes.images import RENDITIONS_DIR
+
+# Déclinaisons : RENDITIONS_DIR/<nom>.<largeur>w.<empreinte sur 12 caractères hexa>.<ext>
+HASHED_NAME_RE = re.compile(rf'^{re.escape(RENDITIONS_DIR)}/[^/]+\.[0-9a-f]{{12}}\.[A-Za-z0-9]+$')
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    """
+    Intervalle [start, start + length) d'un fichier ouvert, lu comme un fichier.
+    Le descripteur reste celui du fichier, positionné sur `start` : le sendfile
+    de gunicorn envoie exactement la plage, les autres serveurs lisent par blocs.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def seek(self, *args):
+        return self.file.seek(*args)
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    (début, longueur) de l'intervalle demandé ; None pour envoyer tout le
+    fichier (en-tête inconnu, invalide ou à plusieurs intervalles). ValueError
+    si l'intervalle est hors du fichier (416).
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffixe : les `last` derniers octets
+        length = min(int(last), size)
+        if length == 0:
+            raise ValueError(header)
+        return size - length, length
+    start = int(first)
+    if start >= size:
+        raise ValueError(header)
+    end = min(int(last), size - 1) if last else size - 1
+    if end < start:
+        return None
+    return start, end - start + 1
+
+
+def _if_range_matches(request, etag, last_modified):
+    # If-Range : la plage ne vaut que pour la version du fichier que le client détient
+    value = request.META.get('HTTP_IF_RANGE')
+    if value is None:
+        return True
+    if value.startswith(('"', 'W/')):
+        return value == etag
+    return parse_http_date_safe(value) == last_modified
+
+
+def _file_response(request, path, full_path, size, etag, last_modified):
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    if settings.MEDIA_ACCEL == 'nginx':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + quote(path)
+        return response
+    if settings.MEDIA_ACCEL == 'sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = full_path
+        return response
+
+    byte_range = None
+    if 'HTTP_RANGE' in request.META and _if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(request.META['HTTP_RANGE'], size)
+        except ValueError:
+            response = HttpResponse(status=416, content_type=content_type)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+    start, length = byte_range or (0, size)
+
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+    else:
+        response = FileResponse(FileRange(open(full_path, 'rb'), start, length), content_type=content_type)
+    response['Content-Length'] = length
+    if byte_range is not None:
+        response.status_code = 206
+        response['Content-Range'] = f'bytes {start}-{start + length - 1}/{size}'
+    return response
+
+
+@require_safe
+def serve(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        st = os.stat(full_path)
+    except (SuspiciousFileOperation, FileNotFoundError, NotADirectoryError):
+        raise Http404("Fichier introuvable.")
+    if not stat.S_ISREG(st.st_mode):
+        raise Http404("Fichier introuvable.")
+
+    etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+    last_modified = int(st.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = _file_response(request, path, full_path, st.st_size, etag, last_modified)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    if HASHED_NAME_RE.match(path):
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=settings.MEDIA_MAX_AGE)
+    return response
@@ -0,0 +1,256 @@
+"""
+Histogrammes de latence par nom d'URL, exposés au format texte Prometheus.
+
+Chaque processus (worker gunicorn) agrège en mémoire puis écrit régulièrement
+son état dans METRICS_DIR ; /metrics additionne les fichiers de tous les
+workers, y compris ceux qui ont été redémarrés.
+"""
+import fcntl
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+# Bornes (secondes) des histogrammes
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HISTOGRAMS = {
+    'yummybox_request_duration_seconds': "Durée totale des requêtes par vue.",
+    'yummybox_request_db_seconds': "Temps passé en base de données par requête.",
+    'yummybox_request_template_seconds': "Temps de rendu des templates par requête.",
+}
+COUNTERS = {
+    'yummybox_requests_total': "Requêtes traitées, par vue, méthode et statut.",
+    'yummybox_db_queries_total': "Requêtes SQL exécutées, par vue.",
+    'yummybox_cache_lookups_total': "Lectures du cache à deux niveaux, par espace de noms et résultat.",
+}
+
+FLUSH_INTERVAL = 1.0
+
+logger = logging.getLogger(__name__)
+
+
+def _histogram():
+    return [0] * (len(BUCKETS) + 1) + [0.0]  # compteurs par borne (+Inf), puis somme
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {name: {} for name in HISTOGRAMS}
+        self.counters = {name: {} for name in COUNTERS}
+        self.last_flush = 0.0
+        # Une seule écriture à la fois par processus, dans l'ordre des états
+        self.flush_lock = threading.Lock()
+
+    def observe(self, name, labels, value):
+        histogram = self.histograms[name].setdefault(labels, _histogram())
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                histogram[i] += 1
+                break
+        else:
+            histogram[len(BUCKETS)] += 1
+        histogram[-1] += value
+
+    def inc(self, name, labels, amount=1):
+        self.counters[name][labels] = self.counters[name].get(labels, 0) + amount
+
+    def record_request(self, view, method, status, total, db_seconds, db_queries, template_seconds):
+        with self.lock:
+            self.observe('yummybox_request_duration_seconds', (view,), total)
+            self.observe('yummybox_request_db_seconds', (view,), db_seconds)
+            self.observe('yummybox_request_template_seconds', (view,), template_seconds)
+            self.inc('yummybox_requests_total', (view, method, str(status)))
+            self.inc('yummybox_db_queries_total', (view,), db_queries)
+        self.maybe_flush()
+
+    def record_cache(self, namespace, result, amount=1):
+        with self.lock:
+            self.inc('yummybox_cache_lookups_total', (namespace, result), amount)
+        self.maybe_flush()
+
+    # --- Sérialisation / fusion multi-processus ---
+
+    def snapshot(self):
+        with self.lock:
+            return _serialize({'histograms': self.histograms, 'counters': self.counters})
+
+    def maybe_flush(self, force=False):
+        directory = metrics_dir()
+        if not directory:
+            return
+        with self.lock:
+            now = time.monotonic()
+            if not force and now - self.last_flush < FLUSH_INTERVAL:
+                return
+            self.last_flush = now
+        # Une requête n'attend pas l'écriture d'un autre thread : elle la laisse passer
+        if not self.flush_lock.acquire(blocking=force):
+            return
+        try:
+            os.makedirs(directory, exist_ok=True)
+            _write_json(os.path.join(directory, f'worker-{os.getpid()}.json'), self.snapshot())
+        except OSError:
+            # Les métriques ne doivent jamais faire échouer la requête mesurée
+            logger.warning("Écriture des métriques impossible dans %s", directory, exc_info=True)
+        finally:
+            self.flush_lock.release()
+
+
+registry = MetricsRegistry()
+
+
+def metrics_dir():
+    return getattr(settings, 'METRICS_DIR', None)
+
+
+def _write_json(path, data):
+    # Fichier temporaire propre à chaque écriture, puis remplacement atomique
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f'.{os.path.basename(path)}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+            json.dump(data, fh)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _merge(total, snapshot):
+    for name, series in snapshot.get('histograms', {}).items():
+        target = total['histograms'].setdefault(name, {})
+        for labels, values in series:
+            current = target.setdefault(tuple(labels), _histogram())
+            for i, value in enumerate(values):
+                current[i] += value
+    for name, series in snapshot.get('counters', {}).items():
+        target = total['counters'].setdefault(name, {})
+        for labels, value in series:
+            target[tuple(labels)] = target.get(tuple(labels), 0) + value
+    return total
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextmanager
+def _directory_lock(directory):
+    with open(os.path.join(directory, '.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding='utf-8') as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def collect():
+    """État agrégé de tous les workers (le processus courant lu en direct)."""
+    total = {'histograms': {}, 'counters': {}}
+    directory = metrics_dir()
+    if not directory or not os.path.isdir(directory):
+        return _merge(total, registry.snapshot())
+
+    registry.maybe_flush(force=True)
+    with _directory_lock(directory):
+        archive_path = os.path.join(directory, 'archive.json')
+        archive = {'histograms': {}, 'counters': {}}
+        _merge(archive, _read_json(archive_path))
+        archived = False
+        for name in os.listdir(directory):
+            if not (name.startswith('worker-') and name.endswith('.json')):
+                continue
+            path = os.path.join(directory, name)
+            pid = int(name[len('worker-'):-len('.json')])
+            if _pid_alive(pid):
+                _merge(total, _read_json(path))
+            else:
+                # Worker terminé : ses compteurs rejoignent l'archive (ils restent monotones)
+                _merge(archive, _read_json(path))
+                os.remove(path)
+                archived = True
+        if archived:
+            _write_json(archive_path, _serialize(archive))
+    return _merge(total, _serialize(archive))
+
+
+def _serialize(state):
+    return {
+        'histograms': {n: [[list(k), v[:]] for k, v in h.items()] for n, h in state['histograms'].items()},
+        'counters': {n: [[list(k), v] for k, v in c.items()] for n, c in state['counters'].items()},
+    }
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values):
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return '{' + pairs + '}' if pairs else ''
+
+
+COUNTER_LABELS = {
+    'yummybox_requests_total': ('view', 'method', 'status'),
+    'yummybox_db_queries_total': ('view',),
+    'yummybox_cache_lookups_total': ('namespace', 'result'),
+}
+
+
+def _cache_hit_ratios(state):
+    # Tout sauf 'miss' évite une reconstruction (ancienne valeur et attente comprises)
+    totals = {}
+    for (namespace, result), value in state['counters'].get('yummybox_cache_lookups_total', {}).items():
+        hits, total = totals.get(namespace, (0, 0))
+        totals[namespace] = (hits + (value if result != 'miss' else 0), total + value)
+    return {namespace: hits / total for namespace, (hits, total) in totals.items() if total}
+
+
+def render_prometheus(state=None, extra=()):
+    state = state or collect()
+    lines = []
+    for name, help_text in HISTOGRAMS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for labels, values in sorted(state['histograms'].get(name, {}).items()):
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ('+Inf',), values[:-1]):
+                cumulative += count
+                le = _labels(('view', 'le'), (*labels, bound))
+                lines.append(f'{name}_bucket{le} {cumulative}')
+            base = _labels(('view',), labels)
+            lines.append(f'{name}_sum{base} {values[-1]:.6f}')
+            lines.append(f'{name}_count{base} {cumulative}')
+    for name, help_text in COUNTERS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for labels, value in sorted(state['counters'].get(name, {}).items()):
+            lines.append(f'{name}{_labels(COUNTER_LABELS[name], labels)} {value}')
+    ratios = _cache_hit_ratios(state)
+    if ratios:
+        name = 'yummybox_cache_hit_ratio'
+        lines += [f'# HELP {name} Part des lectures servies sans reconstruction, par espace de noms.',
+                  f'# TYPE {name} gauge']
+        for namespace, ratio in sorted(ratios.items()):
+            lines.append(f'{name}{_labels(("namespace",), (namespace,))} {ratio:.4f}')
+    for name, kind, help_text, value in extra:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}', f'{name} {value}']
+    return '\n'.join(lines) + '\n'
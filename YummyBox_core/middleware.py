@@ -0,0 +1,141 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import DatabaseError, connection, connections
+from django.http import HttpResponse
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import instrumentation
+from .metrics import registry
+
+HEALTHZ_PATH = '/healthz/'
+
+
+class HealthCheckMiddleware:
+    """
+    Répond à la sonde de disponibilité (/healthz/) avant tout autre middleware :
+    pas de session, pas de contrôle ALLOWED_HOSTS (la sonde Kubernetes appelle
+    l'IP du pod), seulement un aller-retour vers la base.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if request.path != HEALTHZ_PATH:
+            return self.get_response(request)
+        return self.check()
+
+    async def __acall__(self, request):
+        if request.path != HEALTHZ_PATH:
+            return await self.get_response(request)
+        return await sync_to_async(self.check)()
+
+    def check(self):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+        except DatabaseError as exc:
+            return HttpResponse(f'database unavailable: {exc.__class__.__name__}\n',
+                                status=503, content_type='text/plain')
+        return HttpResponse('ok\n', content_type='text/plain')
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise (voir YummyBox_core.storage), utilisable aussi en ASGI : la
+    table des fichiers est en mémoire, la recherche reste sur la boucle
+    d'événements et les autres requêtes continuent en async.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            # Développement : recherche sur disque à chaque requête
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+
+class RequestMetricsMiddleware:
+    """
+    Mesure requêtes SQL, temps base, temps de rendu et durée totale de chaque
+    requête ; renvoie un en-tête Server-Timing et alimente /metrics.
+    Compatible WSGI et ASGI (les vues async ne repassent pas par un thread).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = self.begin()
+        try:
+            response = self.get_response(request)
+        finally:
+            self.end(state)
+        return self.record(request, response, state)
+
+    async def __acall__(self, request):
+        state = self.begin()
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.end(state)
+        return self.record(request, response, state)
+
+    def begin(self):
+        started = time.perf_counter()
+        timings, token = instrumentation.start()
+        wrappers = [conn.execute_wrapper(instrumentation.db_execute_wrapper) for conn in connections.all()]
+        for wrapper in wrappers:
+            wrapper.__enter__()
+        return started, timings, token, wrappers
+
+    def end(self, state):
+        _, _, token, wrappers = state
+        for wrapper in reversed(wrappers):
+            wrapper.__exit__(None, None, None)
+        instrumentation.stop(token)
+
+    def record(self, request, response, state):
+        started, timings = state[:2]
+        total = time.perf_counter() - started
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={timings.db_seconds * 1000:.1f};desc="{timings.db_queries} queries"',
+            f'tpl;dur={timings.template_seconds * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unmatched'
+        registry.record_request(
+            view, request.method, response.status_code, total,
+            timings.db_seconds, timings.db_queries, timings.template_seconds,
+        )
+        return response
@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,7 +47,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'YummyBox_core.middleware.HealthCheckMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # Fichiers statiques servis avant les métriques, la session et l'authentification
+    'YummyBox_core.middleware.StaticFilesMiddleware',
+    'YummyBox_core.middleware.RequestMetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -59,7 +65,8 @@ ROOT_URLCONF = 'YummyBox_core.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates dont les rendus sont chronométrés (Server-Timing, /metrics)
+        'BACKEND': 'YummyBox_core.instrumentation.InstrumentedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -67,28 +74,115 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'accounts.context_processors.role',
             ],
         },
     },
 ]
 
 WSGI_APPLICATION = 'YummyBox_core.wsgi.application'
+ASGI_APPLICATION = 'YummyBox_core.asgi.application'
+
+# wsgi : workers gunicorn synchrones ; asgi : workers uvicorn (gunicorn.conf.py)
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi')
+# Liste, détail et ajout d'avis en vues async (par défaut sous ASGI uniquement :
+# sous WSGI, chaque vue async coûterait une boucle d'événements par requête)
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', '1' if SERVER_MODE == 'asgi' else '0') == '1'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite en production : pragmas appliqués à chaque nouvelle connexion
+#   journal_mode=WAL   les lectures ne sont plus bloquées par une écriture en cours
+#   synchronous=NORMAL sûr en WAL (pas de corruption), fsync au checkpoint seulement
+#   mmap_size          lectures par mappage mémoire (128 Mo)
+#   cache_size         cache de pages par connexion (négatif = Kio, ici 64 Mo)
+#   temp_store=MEMORY  tris et index temporaires en mémoire
+SQLITE_INIT_COMMAND = ';'.join([
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    f"PRAGMA mmap_size={int(os.environ.get('SQLITE_MMAP_SIZE', 128 * 1024 * 1024))}",
+    f"PRAGMA cache_size={int(os.environ.get('SQLITE_CACHE_SIZE', -64 * 1024))}",
+    'PRAGMA temp_store=MEMORY',
+])
+
+# Connexion réutilisée entre requêtes (pragmas appliqués une seule fois), sous
+# WSGI seulement : sous ASGI, Django exécute l'accès base de chaque requête dans
+# un nouveau thread, la connexion persistante n'y serait jamais réutilisée ni
+# fermée (une connexion ouverte de plus par requête)
+CONN_MAX_AGE = int(os.environ.get('CONN_MAX_AGE', 0 if SERVER_MODE == 'asgi' else 600))
+if SERVER_MODE == 'asgi' and CONN_MAX_AGE:
+    raise ImproperlyConfigured("SERVER_MODE=asgi exige CONN_MAX_AGE=0 (connexion par thread, jamais réutilisée)")
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        'OPTIONS': {
+            'init_command': SQLITE_INIT_COMMAND,
+            # Les transactions (atomic) prennent le verrou d'écriture dès BEGIN :
+            # pas d'échec immédiat « database is locked » lors de la montée en écriture
+            'transaction_mode': 'IMMEDIATE',
+            # busy_timeout : attente du verrou d'écriture (secondes)
+            'timeout': int(os.environ.get('SQLITE_TIMEOUT', 20)),
+        },
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
 
+# Cache partagé entre workers et réplicas (Redis) ; mémoire locale à défaut
+REDIS_URL = os.environ.get('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
+# Sessions : choix du stockage par variable d'environnement
+#   db             : une lecture SQLite par requête authentifiée (défaut)
+#   cache          : Redis uniquement, aucune requête SQL (perdue si Redis est vidé)
+#   cached_db      : lecture en cache, écriture en cache et en base
+#   signed_cookies : sans état, pour des réplicas sans stockage partagé
+# Avec db ou cached_db, la CronJob clearsessions du chart purge les lignes expirées.
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'db')
+if SESSION_BACKEND not in SESSION_ENGINES:
+    raise ImproperlyConfigured(
+        f"SESSION_BACKEND={SESSION_BACKEND!r} inconnu (choix : {', '.join(SESSION_ENGINES)})"
+    )
+SESSION_ENGINE = SESSION_ENGINES[SESSION_BACKEND]
+# Sans Redis, le cache est propre à chaque worker : une session écrite par l'un
+# serait absente (ou périmée) chez les autres
+if SESSION_BACKEND in ('cache', 'cached_db') and not REDIS_URL:
+    raise ImproperlyConfigured(
+        f"SESSION_BACKEND={SESSION_BACKEND} exige REDIS_URL (cache partagé entre workers)"
+    )
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
+# Utilisateur de session chargé avec son profil (rôle) en une requête
+AUTHENTICATION_BACKENDS = ['accounts.backends.ProfileModelBackend']
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -121,11 +215,38 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = '/static/'
+# static/ du projet : polices générées par `manage.py build_fonts`
 STATICFILES_DIRS = [BASE_DIR / 'static'] 
+STATIC_ROOT = Path(os.environ.get('STATIC_ROOT', BASE_DIR / 'staticfiles'))
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    # collectstatic : minification, noms hachés, .gz et .br (YummyBox_core.storage)
+    'staticfiles': {
+        'BACKEND': 'YummyBox_core.storage.StaticStorage',
+    },
+}
+# Fichiers hachés : en cache dix ans (immutable) ; les autres (noms stables) : une heure
+WHITENOISE_MAX_AGE = 3600
 
 # Media files (User uploaded files)
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
+MEDIA_ROOT = Path(os.environ.get('MEDIA_ROOT', BASE_DIR / 'media'))
+# Servis par YummyBox_core.media : transfert par gunicorn (sendfile, défaut, WSGI
+# seulement) ou délégué au proxy (nginx : X-Accel-Redirect ; sendfile : X-Sendfile)
+MEDIA_ACCEL = os.environ.get('MEDIA_ACCEL', '')
+if MEDIA_ACCEL not in ('', 'nginx', 'sendfile'):
+    raise ImproperlyConfigured(f"MEDIA_ACCEL={MEDIA_ACCEL!r} inconnu (choix : nginx, sendfile ou vide)")
+# Sous ASGI, uvicorn n'a pas de sendfile : FileResponse ferait passer chaque
+# image par Python, bloc par bloc, dans un thread. Le proxy doit l'envoyer.
+if SERVER_MODE == 'asgi' and not MEDIA_ACCEL:
+    raise ImproperlyConfigured("SERVER_MODE=asgi exige MEDIA_ACCEL (nginx ou sendfile)")
+# Location `internal` du proxy qui pointe sur MEDIA_ROOT (mode nginx)
+MEDIA_ACCEL_PREFIX = os.environ.get('MEDIA_ACCEL_PREFIX', '/protected-media/')
+# Images d'origine (noms sans empreinte) ; les déclinaisons sont immutables
+MEDIA_MAX_AGE = int(os.environ.get('MEDIA_MAX_AGE', 3600))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -133,6 +254,23 @@ MEDIA_ROOT = BASE_DIR / 'media'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+# Agrégation des métriques entre workers gunicorn (un fichier par processus).
+# Sans valeur, /metrics ne reflète que le processus qui répond.
+METRICS_DIR = os.environ.get('METRICS_DIR')
+# /metrics : réservé aux membres du staff et au collecteur Prometheus, qui envoie
+# `Authorization: Bearer <METRICS_TOKEN>` (sans valeur : staff seulement)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+REST_FRAMEWORK = {
+    'DEFAULT_PERMISSION_CLASSES': [
+        'rest_framework.permissions.IsAuthenticated',
+    ],
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
+}
+
 LOGIN_REDIRECT_URL = 'recipes:recipe_list'
 LOGOUT_REDIRECT_URL = 'recipes:landing_page'
 LOGOUT_REDIRECT_URL = '/'
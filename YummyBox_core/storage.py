@@ -0,0 +1,55 @@
+"""
+Stockage des fichiers statiques (collectstatic) : CSS et JS minifiés dans
+STATIC_ROOT, puis noms hachés selon le contenu (manifeste staticfiles.json,
+url() des CSS réécrites) et versions précompressées .gz / .br (WhiteNoise).
+Le hachage porte sur le fichier minifié, c'est-à-dire sur ce qui est servi.
+
+StaticFilesMiddleware sert ces fichiers depuis gunicorn : noms hachés avec un
+cache de dix ans (immutable), variante .br ou .gz selon Accept-Encoding.
+"""
+import os
+from functools import partial
+
+import rcssmin
+import rjsmin
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+# Les commentaires /*! ... */ (licences) sont conservés
+MINIFIERS = {
+    '.css': partial(rcssmin.cssmin, keep_bang_comments=True),
+    '.js': partial(rjsmin.jsmin, keep_bang_comments=True),
+}
+
+
+class StaticStorage(CompressedManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            for name in paths:
+                self.minify(name)
+            # Le hachage relit les copies minifiées de STATIC_ROOT, pas les sources
+            paths = {name: (self, name) for name in paths}
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def minify(self, name):
+        root, extension = os.path.splitext(name)
+        minifier = MINIFIERS.get(extension)
+        if minifier is None or root.endswith('.min'):
+            return
+        path = self.path(name)
+        try:
+            with open(path, encoding='utf-8') as fh:
+                source = fh.read()
+        except UnicodeDecodeError:
+            return
+        minified = minifier(source)
+        if minified != source:
+            with open(path, 'w', encoding='utf-8') as fh:
+                fh.write(minified)
+
+    def stored_name(self, name):
+        # Sans manifeste (collectstatic pas lancé : développement, tests),
+        # {% static %} renvoie le nom d'origine, servi par les finders
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
@@ -18,14 +18,15 @@ from django.contrib import admin
 from django.urls import path
 from django.urls import include
 from django.conf import settings
-from django.conf.urls.static import static
+from . import media, views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', views.metrics, name='metrics'),  # Format texte Prometheus
     path('accounts/', include('accounts.urls')),   # on créera ce fichier
+    path('api/v1/', include('recipes.api_urls', namespace='api-v1')),  # API JSON en lecture
+    # Images envoyées, en production aussi (ETag, Range, sendfile ou X-Accel-Redirect)
+    path(f"{settings.MEDIA_URL.lstrip('/')}<path:path>", media.serve, name='media'),
     path('', include('recipes.urls')),
     
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
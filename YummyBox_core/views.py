@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from .metrics import render_prometheus
+
+
+def _may_read_metrics(request):
+    # Latences par vue, volumes et taux de cache : rien de public
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    expected = settings.METRICS_TOKEN
+    return bool(expected) and scheme.lower() == 'bearer' and constant_time_compare(token, expected)
+
+
+def metrics(request):
+    if not _may_read_metrics(request):
+        return HttpResponseForbidden("Métriques réservées au staff et au collecteur.")
+    return HttpResponse(render_prometheus(),
+                        content_type='text/plain; version=0.0.4; charset=utf-8')
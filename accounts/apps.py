@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def invalidate_roles_after_migrate(sender, **kwargs):
+    # Les migrations de données (RunPython) modifient les rôles sans signal
+    from .roles import invalidate_all_roles
+    invalidate_all_roles()
 
 
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        post_migrate.connect(invalidate_roles_after_migrate, sender=self)
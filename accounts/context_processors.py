@@ -0,0 +1,8 @@
+from django.utils.functional import SimpleLazyObject
+
+from .roles import is_chef
+
+
+def role(request):
+    # Évalué seulement si un template teste is_chef
+    return {'is_chef': SimpleLazyObject(lambda: is_chef(request.user))}
@@ -1,8 +1,25 @@
 from django.contrib.auth.models import User
-from django.db import models
-from django.db.models.signals import post_save
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from .roles import invalidate_role
+
+
+class ProfileQuerySet(models.QuerySet):
+    # update() n'émet pas de signal : on invalide nous-mêmes les rôles en cache
+    def update(self, **kwargs):
+        if 'role' not in kwargs:
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            user_ids = list(self.values_list('user_id', flat=True))
+            rows = super().update(**kwargs)
+            invalidate_role(*user_ids)
+            # ...et après commit, au cas où une autre requête l'aurait relu entre-temps
+            transaction.on_commit(lambda: invalidate_role(*user_ids), using=self.db)
+        return rows
+
+
 class Profile(models.Model):
     USER_ROLES = (
         ('user', 'Utilisateur'),
@@ -11,6 +28,8 @@ class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     role = models.CharField(max_length=10, choices=USER_ROLES, default='user')
 
+    objects = ProfileQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.user.username} - {self.role}"
 
@@ -19,3 +38,14 @@ class Profile(models.Model):
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
         Profile.objects.create(user=instance)
+
+
+# Le rôle en cache ne doit jamais survivre à une modification du profil
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_profile_role(sender, instance, **kwargs):
+    user_id = instance.user_id
+    invalidate_role(user_id)
+    transaction.on_commit(lambda: invalidate_role(user_id))
+    if sender._meta.get_field('user').is_cached(instance):
+        instance.user.__dict__.pop('_cached_role', None)
@@ -0,0 +1,70 @@
+"""
+Rôle de l'utilisateur (user / chef) pour les contrôles de permission.
+
+Le rôle est lu dans cet ordre : mémo sur l'instance, profil déjà joint à
+l'utilisateur (voir backends.ProfileModelBackend), cache partagé, puis base
+de données. Toute modification de Profile.role invalide le cache.
+"""
+import time
+
+from django.core.cache import cache
+
+ROLE_CACHE_TIMEOUT = 60 * 60 * 24
+GENERATION_KEY = 'user-role:generation'
+
+
+def _generation():
+    # Changer de génération invalide tous les rôles d'un coup (migration de données)
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, _fresh_generation(), timeout=None)
+        generation = cache.get(GENERATION_KEY) or _fresh_generation()
+    return generation
+
+
+def _fresh_generation():
+    # Horodatage : une clé évincée ne fait jamais revenir une ancienne génération
+    return int(time.time() * 1000)
+
+
+def role_cache_key(user_id, generation=None):
+    return f"user-role:{generation or _generation()}:{user_id}"
+
+
+def get_role(user):
+    """Rôle de l'utilisateur, sans requête SQL quand il est en cache ; None si anonyme."""
+    if user is None or not user.is_authenticated:
+        return None
+    if hasattr(user, '_cached_role'):
+        return user._cached_role
+
+    relation = user._meta.get_field('profile')
+    if relation.is_cached(user):
+        profile = relation.get_cached_value(user)
+        role = profile.role if profile is not None else None
+    else:
+        key = role_cache_key(user.pk)
+        role = cache.get(key)
+        if role is None:
+            from .models import Profile
+            role = Profile.objects.filter(user_id=user.pk).values_list('role', flat=True).first()
+            if role is not None:
+                cache.set(key, role, ROLE_CACHE_TIMEOUT)
+    user._cached_role = role
+    return role
+
+
+def is_chef(user):
+    return get_role(user) == 'chef'
+
+
+def invalidate_role(*user_ids):
+    generation = _generation()
+    cache.delete_many([role_cache_key(user_id, generation) for user_id in user_ids])
+
+
+def invalidate_all_roles():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:  # clé absente ou évincée
+        cache.set(GENERATION_KEY, _fresh_generation(), timeout=None)
@@ -0,0 +1,71 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Animation pour les inputs au focus
+    const inputs = document.querySelectorAll('.form-input');
+
+    inputs.forEach(input => {
+        input.addEventListener('focus', function() {
+            this.parentElement.style.transform = 'translateY(-2px)';
+        });
+
+        input.addEventListener('blur', function() {
+            this.parentElement.style.transform = 'translateY(0)';
+        });
+    });
+
+    // Animation pour le bouton
+    const authBtn = document.querySelector('.auth-btn');
+    if (authBtn) {
+        authBtn.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateY(-3px)';
+        });
+
+        authBtn.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateY(0)';
+        });
+    }
+
+    // Validation en temps réel
+    const form = document.querySelector('.auth-form');
+    if (form) {
+        form.addEventListener('submit', function(e) {
+            let valid = true;
+
+            // Validation basique
+            inputs.forEach(input => {
+                if (!input.value.trim()) {
+                    input.classList.add('error');
+                    valid = false;
+                }
+            });
+
+            if (!valid) {
+                e.preventDefault();
+                // Animation d'erreur
+                form.style.animation = 'shake 0.5s';
+                setTimeout(() => {
+                    form.style.animation = '';
+                }, 500);
+            }
+        });
+
+        // Supprimer l'erreur quand l'utilisateur commence à taper
+        inputs.forEach(input => {
+            input.addEventListener('input', function() {
+                if (this.value.trim()) {
+                    this.classList.remove('error');
+                }
+            });
+        });
+    }
+
+    // Ajouter le CSS pour l'animation shake
+    const style = document.createElement('style');
+    style.textContent = `
+        @keyframes shake {
+            0%, 100% { transform: translateX(0); }
+            10%, 30%, 50%, 70%, 90% { transform: translateX(-5px); }
+            20%, 40%, 60%, 80% { transform: translateX(5px); }
+        }
+    `;
+    document.head.appendChild(style);
+});
@@ -0,0 +1,186 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Vérification de la force du mot de passe
+    const passwordInput = document.getElementById('password1');
+    const strengthBar = document.getElementById('strengthBar');
+    const strengthText = document.getElementById('strengthText');
+    const confirmPasswordInput = document.getElementById('password2');
+    const submitBtn = document.getElementById('submitBtn');
+    const termsCheckbox = document.getElementById('terms');
+
+    if (passwordInput) {
+        passwordInput.addEventListener('input', function() {
+            const password = this.value;
+            let strength = 0;
+
+            // Longueur minimale
+            if (password.length >= 8) strength++;
+
+            // Contient des lettres minuscules et majuscules
+            if (/[a-z]/.test(password) && /[A-Z]/.test(password)) strength++;
+
+            // Contient des chiffres
+            if (/[0-9]/.test(password)) strength++;
+
+            // Contient des caractères spéciaux
+            if (/[^A-Za-z0-9]/.test(password)) strength++;
+
+            // Mise à jour de l'affichage
+            updatePasswordStrength(strength);
+
+            // Vérification de la correspondance des mots de passe
+            checkPasswordMatch();
+        });
+    }
+
+    if (confirmPasswordInput) {
+        confirmPasswordInput.addEventListener('input', checkPasswordMatch);
+    }
+
+    function updatePasswordStrength(strength) {
+        if (!strengthBar || !strengthText) return;
+
+        // Reset des classes
+        strengthBar.className = 'strength-bar';
+
+        if (strength === 0) {
+            strengthBar.style.width = '0%';
+            strengthText.textContent = 'Faible';
+        } else if (strength === 1) {
+            strengthBar.classList.add('weak');
+            strengthText.textContent = 'Faible';
+        } else if (strength === 2) {
+            strengthBar.classList.add('medium');
+            strengthText.textContent = 'Moyen';
+        } else if (strength >= 3) {
+            strengthBar.classList.add('strong');
+            strengthText.textContent = 'Fort';
+        }
+    }
+
+    function checkPasswordMatch() {
+        if (!passwordInput || !confirmPasswordInput) return;
+
+        const password = passwordInput.value;
+        const confirmPassword = confirmPasswordInput.value;
+
+        if (confirmPassword === '') {
+            confirmPasswordInput.style.borderColor = '#e1e5eb';
+            return;
+        }
+
+        if (password === confirmPassword) {
+            confirmPasswordInput.style.borderColor = '#28a745';
+            confirmPasswordInput.style.boxShadow = '0 0 0 3px rgba(40, 167, 69, 0.1)';
+        } else {
+            confirmPasswordInput.style.borderColor = '#dc3545';
+            confirmPasswordInput.style.boxShadow = '0 0 0 3px rgba(220, 53, 69, 0.1)';
+        }
+    }
+
+    // Validation du formulaire
+    const form = document.getElementById('signupForm');
+    if (form) {
+        form.addEventListener('submit', function(e) {
+            let valid = true;
+
+            // Vérifier les champs requis
+            const requiredInputs = form.querySelectorAll('input[required]');
+            requiredInputs.forEach(input => {
+                if (!input.value.trim()) {
+                    input.classList.add('error');
+                    valid = false;
+                }
+            });
+
+            // Vérifier la correspondance des mots de passe
+            if (passwordInput && confirmPasswordInput && 
+                passwordInput.value !== confirmPasswordInput.value) {
+                confirmPasswordInput.classList.add('error');
+                valid = false;
+
+                // Afficher un message d'erreur
+                let errorDiv = confirmPasswordInput.parentElement.querySelector('.match-error');
+                if (!errorDiv) {
+                    errorDiv = document.createElement('div');
+                    errorDiv.className = 'error-message';
+                    errorDiv.innerHTML = '<i class="fas fa-exclamation-circle error-icon"></i> Les mots de passe ne correspondent pas';
+                    errorDiv.classList.add('match-error');
+                    confirmPasswordInput.parentElement.appendChild(errorDiv);
+                }
+            }
+
+            // Vérifier les conditions d'utilisation
+            if (termsCheckbox && !termsCheckbox.checked) {
+                termsCheckbox.parentElement.style.outline = '2px solid #dc3545';
+                termsCheckbox.parentElement.style.borderRadius = '10px';
+                valid = false;
+            }
+
+            if (!valid) {
+                e.preventDefault();
+                // Animation d'erreur
+                form.style.animation = 'shake 0.5s';
+                setTimeout(() => {
+                    form.style.animation = '';
+                }, 500);
+            }
+        });
+
+        // Supprimer les erreurs quand l'utilisateur commence à taper
+        const inputs = form.querySelectorAll('.form-input');
+        inputs.forEach(input => {
+            input.addEventListener('input', function() {
+                this.classList.remove('error');
+
+                // Supprimer le message d'erreur de correspondance
+                const matchError = this.parentElement.querySelector('.match-error');
+                if (matchError) {
+                    matchError.remove();
+                }
+            });
+        });
+
+        if (termsCheckbox) {
+            termsCheckbox.addEventListener('change', function() {
+                this.parentElement.style.outline = '';
+            });
+        }
+    }
+
+    // Animation au focus
+    const inputs = document.querySelectorAll('.form-input');
+    inputs.forEach(input => {
+        input.addEventListener('focus', function() {
+            this.parentElement.style.transform = 'translateY(-2px)';
+        });
+
+        input.addEventListener('blur', function() {
+            this.parentElement.style.transform = 'translateY(0)';
+        });
+    });
+
+    // Animation pour les options de rôle
+    const roleLabels = document.querySelectorAll('.role-label');
+    roleLabels.forEach(label => {
+        label.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateY(-3px)';
+        });
+
+        label.addEventListener('mouseleave', function() {
+            if (!this.previousElementSibling.checked) {
+                this.style.transform = 'translateY(0)';
+            }
+        });
+    });
+
+    // Ajouter le CSS pour l'animation shake
+    const style = document.createElement('style');
+    style.textContent = `
+        @keyframes shake {
+            0%, 100% { transform: translateX(0); }
+            10%, 30%, 50%, 70%, 90% { transform: translateX(-5px); }
+            20%, 40%, 60%, 80% { transform: translateX(5px); }
+        }
+    `;
+    document.head.appendChild(style);
+});
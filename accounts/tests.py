@@ -1,3 +1,98 @@
-from django.test import TestCase
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import QuerySet
+from django.urls import reverse
 
-# Create your tests here.
+from accounts import roles
+from accounts.apps import invalidate_roles_after_migrate
+from accounts.models import Profile
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def chef(django_user_model):
+    user = django_user_model.objects.create_user(username='chef', password='pass123')
+    Profile.objects.filter(user=user).update(role='chef')
+    return user
+
+
+@pytest.mark.django_db
+def test_session_user_is_loaded_with_profile(client, chef, django_assert_num_queries):
+    client.force_login(chef)
+    response = client.get(reverse('recipes:recipe_list'))
+    user = response.wsgi_request.user
+    # Profil joint par le backend : aucun accès supplémentaire pour le rôle
+    with django_assert_num_queries(0):
+        assert roles.is_chef(user)
+        assert user.profile.role == 'chef'
+    assert reverse('recipes:recipe_add') in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_role_is_cached_between_requests(chef, django_assert_num_queries):
+    user = User.objects.get(pk=chef.pk)
+    with django_assert_num_queries(1):
+        assert roles.get_role(user) == 'chef'
+    # Nouvelle instance (autre requête) : le cache partagé répond
+    fresh = User.objects.get(pk=chef.pk)
+    with django_assert_num_queries(0):
+        assert roles.get_role(fresh) == 'chef'
+        assert roles.get_role(fresh) == 'chef'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('change', ['save', 'update'])
+def test_role_change_invalidates_cache(chef, change):
+    assert roles.is_chef(User.objects.get(pk=chef.pk))
+    if change == 'save':
+        profile = Profile.objects.get(user=chef)
+        profile.role = 'user'
+        profile.save()
+    else:
+        Profile.objects.filter(user=chef).update(role='user')
+    assert not roles.is_chef(User.objects.get(pk=chef.pk))
+
+
+@pytest.mark.django_db
+def test_post_migrate_invalidates_every_role(chef):
+    assert roles.is_chef(User.objects.get(pk=chef.pk))
+    # Migration de données : historique des modèles, aucun signal ni update() surchargé
+    QuerySet.update(Profile.objects.filter(user=chef), role='user')
+    assert roles.is_chef(User.objects.get(pk=chef.pk))  # encore en cache
+    invalidate_roles_after_migrate(sender=None)
+    assert not roles.is_chef(User.objects.get(pk=chef.pk))
+
+
+@pytest.mark.django_db
+def test_anonymous_has_no_role(client):
+    response = client.get(reverse('recipes:recipe_list'))
+    assert roles.get_role(response.wsgi_request.user) is None
+
+
+@pytest.mark.parametrize('backend, redis_url, ok', [
+    ('db', '', True),
+    ('cache', '', False),
+    ('cached_db', '', False),
+    ('cached_db', 'redis://localhost:6379/0', True),
+])
+def test_cache_sessions_require_shared_redis(backend, redis_url, ok):
+    # Réglages relus dans un processus neuf : ils sont figés à l'import
+    import os
+    import subprocess
+    import sys
+    from django.conf import settings
+
+    env = {**os.environ, 'SESSION_BACKEND': backend, 'REDIS_URL': redis_url,
+           'DJANGO_SETTINGS_MODULE': 'YummyBox_core.settings'}
+    result = subprocess.run([sys.executable, '-c', 'import django; django.setup()'],
+                            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+    assert (result.returncode == 0) == ok, result.stderr
+    if not ok:
+        assert 'exige REDIS_URL' in result.stderr
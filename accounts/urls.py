@@ -2,7 +2,7 @@ from django.urls import path
 from . import views
 from django.contrib.auth import views as auth_views
 
-APP_NAME = 'accounts'
+app_name = 'accounts'
 
 urlpatterns = [
     path('signup/', views.signup, name='signup'),
@@ -0,0 +1,39 @@
+{{/*
+Base SQLite sur le volume persistant, partagée par le Deployment et les CronJobs.
+*/}}
+{{- define "yummybox.dbEnv" -}}
+- name: SQLITE_PATH
+  value: "{{ .Values.persistence.mountPath }}/db.sqlite3"
+{{- end }}
+
+{{/*
+Images envoyées (MEDIA_ROOT) sur le même volume : lues par build_image_renditions.
+*/}}
+{{- define "yummybox.mediaEnv" -}}
+- name: MEDIA_ROOT
+  value: "{{ .Values.persistence.mountPath }}/media"
+{{- end }}
+
+{{- define "yummybox.dbVolumeMount" -}}
+- name: data
+  mountPath: {{ .Values.persistence.mountPath }}
+{{- end }}
+
+{{- define "yummybox.dbVolume" -}}
+- name: data
+  persistentVolumeClaim:
+    claimName: {{ .Release.Name }}-data
+{{- end }}
+
+{{/*
+Volume ReadWriteOnce : les tâches sont planifiées sur le nœud du pod Django.
+*/}}
+{{- define "yummybox.onDjangoNode" -}}
+affinity:
+  podAffinity:
+    requiredDuringSchedulingIgnoredDuringExecution:
+      - labelSelector:
+          matchLabels:
+            app: {{ .Release.Name }}-django
+        topologyKey: kubernetes.io/hostname
+{{- end }}
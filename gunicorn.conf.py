@@ -0,0 +1,22 @@
+# Configuration gunicorn (Dockerfile : gunicorn -c gunicorn.conf.py)
+#   SERVER_MODE=wsgi : workers synchrones sur YummyBox_core.wsgi (défaut)
+#   SERVER_MODE=asgi : workers uvicorn sur YummyBox_core.asgi, vues async activées
+#                      (MEDIA_ACCEL requis : les images passent par le proxy)
+import os
+
+server_mode = os.environ.get('SERVER_MODE', 'wsgi')
+if server_mode not in ('wsgi', 'asgi'):
+    raise RuntimeError(f"SERVER_MODE={server_mode!r} inconnu (wsgi ou asgi)")
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+# Un seul worker par défaut (comme avant) ; WEB_CONCURRENCY pour en ajouter
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG')
+
+if server_mode == 'asgi':
+    wsgi_app = 'YummyBox_core.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'YummyBox_core.wsgi:application'
+    worker_class = 'sync'
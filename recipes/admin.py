@@ -1,5 +1,7 @@
 from django.contrib import admin
+from django.db.models.expressions import RawSQL
 from .models import Category, Recipe, Review
+from . import search
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -11,6 +13,16 @@ class RecipeAdmin(admin.ModelAdmin):
     list_filter = ('category', 'created_at')
     search_fields = ('title', 'description')
 
+    def get_search_results(self, request, queryset, search_term):
+        # Passe par l'index FTS5 plutôt que par des LIKE '%x%' sur toute la table
+        match = search.build_match_query(search_term)
+        if not match or not search.is_available():
+            return super().get_search_results(request, queryset, search_term)
+        matches = RawSQL(
+            f"SELECT rowid FROM {search.FTS_TABLE} WHERE {search.FTS_TABLE} MATCH %s", [match]
+        )
+        return queryset.filter(pk__in=matches), False
+
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
     list_display = ('recipe', 'user', 'rating', 'created_at')
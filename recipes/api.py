@@ -0,0 +1,122 @@
+from django.contrib.auth import get_user_model
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from .models import Category, Recipe, Review
+from .serializers import CategorySerializer, RecipeSerializer, ReviewSerializer, ReviewUpsertSerializer
+from .utils import parse_id
+
+BATCH_MAX_IDS = 100
+BULK_MAX_REVIEWS = 1000
+
+
+class NewestFirstCursorPagination(CursorPagination):
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class ByNameCursorPagination(NewestFirstCursorPagination):
+    ordering = ('name',)
+
+
+class SparseReadOnlyViewSet(viewsets.ReadOnlyModelViewSet):
+    # Colonnes toujours chargées (tri de la pagination)
+    ordering_columns = ()
+
+    def get_queryset(self):
+        columns = set(self.get_serializer_class().columns_for(self.request))
+        columns.update(self.ordering_columns)
+        # Jointures uniquement pour les relations demandées, sinon colonnes inutiles
+        relations = {column.split('__')[0] for column in columns if '__' in column}
+        return self.queryset.select_related(*relations).only(*columns)
+
+    def filter_by_ids(self, queryset, *params):
+        # ?<param>=<id> : filtre sur la clé étrangère, 400 si l'identifiant est invalide
+        for param in params:
+            value = self.request.query_params.get(param)
+            if not value:
+                continue
+            try:
+                queryset = queryset.filter(**{f'{param}_id': parse_id(value)})
+            except ValueError:
+                raise ValidationError({param: "Identifiant entier attendu."})
+        return queryset
+
+
+class CategoryViewSet(SparseReadOnlyViewSet):
+    queryset = Category.objects.all()
+    serializer_class = CategorySerializer
+    pagination_class = ByNameCursorPagination
+    ordering_columns = ('name',)
+
+
+class RecipeViewSet(SparseReadOnlyViewSet):
+    queryset = Recipe.objects.all()
+    serializer_class = RecipeSerializer
+    pagination_class = NewestFirstCursorPagination
+    ordering_columns = ('created_at',)
+
+    def get_queryset(self):
+        return self.filter_by_ids(super().get_queryset(), 'category')
+
+    @action(detail=False, methods=['get'])
+    def batch(self, request):
+        # GET /recipes/batch/?ids=3,1,2 : une requête, résultats dans l'ordre demandé
+        try:
+            ids = [parse_id(i) for i in request.query_params.get('ids', '').split(',') if i.strip()]
+        except ValueError:
+            raise ValidationError({'ids': "Liste d'identifiants entiers attendue."})
+        if len(ids) > BATCH_MAX_IDS:
+            raise ValidationError({'ids': f"{BATCH_MAX_IDS} identifiants maximum."})
+        found = self.get_queryset().in_bulk(ids)
+        recipes = [found[pk] for pk in dict.fromkeys(ids) if pk in found]
+        return Response(self.get_serializer(recipes, many=True).data)
+
+
+class ReviewViewSet(SparseReadOnlyViewSet):
+    queryset = Review.objects.all()
+    serializer_class = ReviewSerializer
+    pagination_class = NewestFirstCursorPagination
+    ordering_columns = ('created_at',)
+
+    def get_queryset(self):
+        return self.filter_by_ids(super().get_queryset(), 'recipe', 'user')
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def bulk(self, request):
+        """
+        POST /reviews/bulk/ (administrateurs, synchronisation partenaires) :
+        liste de {recipe, user, rating, comment}, appliquée en INSERT ... ON
+        CONFLICT DO UPDATE par lots ; le dernier avis d'un même couple l'emporte.
+        """
+        if not isinstance(request.data, list):
+            raise ValidationError({'non_field_errors': "Liste d'avis attendue."})
+        if len(request.data) > BULK_MAX_REVIEWS:
+            raise ValidationError({'non_field_errors': f"{BULK_MAX_REVIEWS} avis maximum par appel."})
+        serializer = ReviewUpsertSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data
+
+        # Existence des recettes et utilisateurs : deux requêtes pour tout le lot
+        recipe_ids = {item['recipe'] for item in items}
+        errors = {}
+        for field, model in (('recipe', Recipe), ('user', get_user_model())):
+            wanted = {item[field] for item in items}
+            missing = wanted - set(model.objects.filter(pk__in=wanted).values_list('pk', flat=True))
+            if missing:
+                errors[field] = f"Identifiants inconnus : {sorted(missing)}"
+        if errors:
+            raise ValidationError(errors)
+
+        latest = {(item['recipe'], item['user']): item for item in items}
+        Review.objects.bulk_upsert([
+            Review(recipe_id=recipe, user_id=user, rating=item['rating'], comment=item['comment'])
+            for (recipe, user), item in latest.items()
+        ], batch_size=500)
+        return Response({'received': len(items), 'applied': len(latest), 'recipes': len(recipe_ids)})
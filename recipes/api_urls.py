@@ -0,0 +1,12 @@
+from rest_framework.routers import DefaultRouter
+
+from . import api
+
+router = DefaultRouter()
+router.register('recipes', api.RecipeViewSet, basename='recipe')
+router.register('categories', api.CategoryViewSet, basename='category')
+router.register('reviews', api.ReviewViewSet, basename='review')
+
+app_name = 'api'
+
+urlpatterns = router.urls
@@ -0,0 +1,64 @@
+"""
+Versions async de la liste, du détail et de l'ajout d'avis, pour un
+déploiement ASGI (SERVER_MODE=asgi, voir gunicorn.conf.py).
+
+La pagination passe par l'ORM async. Le rendu des templates, les
+validateurs HTTP, l'enregistrement d'un avis (transaction) et la
+reconstruction d'une entrée du cache (détail, catégories), synchrones,
+s'exécutent dans le thread dédié de la requête ; une lecture du LRU local
+reste sur la boucle d'événements.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, HttpResponseBadRequest
+from django.shortcuts import redirect
+
+from . import conditional, views
+from .forms import ReviewForm
+from .models import Recipe, Review
+from .pagination import InvalidCursor, apaginate_keyset
+
+
+@login_required
+@conditional.async_condition(etag_func=conditional.recipe_list_etag,
+                             last_modified_func=conditional.recipe_list_last_modified)
+async def recipe_list(request):
+    try:
+        page = await apaginate_keyset(views.list_queryset(), request.GET.get('cursor'),
+                                      views.RECIPES_PER_PAGE)
+    except InvalidCursor:
+        return HttpResponseBadRequest("Curseur de pagination invalide.")
+    # Version déjà lue par async_condition (mémorisée sur la requête)
+    categories = await views.CATEGORIES_CACHE.aget_or_set(
+        conditional.catalogue_version(request), views.category_list
+    )
+    return await sync_to_async(views.render_list_page)(request, page, categories)
+
+
+@conditional.async_condition(etag_func=conditional.recipe_detail_etag,
+                             last_modified_func=conditional.recipe_detail_last_modified)
+async def recipe_detail(request, id):
+    version = conditional.recipe_detail_version(request, id)
+    if version is None:
+        raise Http404("Recette introuvable.")
+
+    recipe, reviews = await views.RECIPE_DETAIL_CACHE.aget_or_set(
+        f'{id}:{version}', lambda: views.detail_data(id)
+    )
+    return await sync_to_async(views.render_detail_page)(request, recipe, reviews)
+
+
+@login_required
+async def recipe_review(request, id):
+    if request.method == "POST":
+        form = ReviewForm(request.POST)
+        if await sync_to_async(form.is_valid)():
+            user = await request.auser()
+            try:
+                await sync_to_async(Review.objects.upsert)(
+                    id, user.pk, form.cleaned_data['rating'], form.cleaned_data['comment']
+                )
+            except Recipe.DoesNotExist:
+                raise Http404("Recette introuvable.")
+    # Si pas POST ou form invalide, on retourne quand même vers la page de détail
+    return redirect('recipes:recipe_detail', id=id)
@@ -0,0 +1,381 @@
+import gc
+import os
+import random
+import statistics
+import time
+import tempfile
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.db import DatabaseError, connection, transaction
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, override_settings
+from django.test.utils import (
+    CaptureQueriesContext, setup_databases, setup_test_environment, teardown_databases,
+    teardown_test_environment,
+)
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Profile
+
+from . import search
+from .models import Catalogue, Category, Recipe, Review
+
+User = get_user_model()
+
+BENCH_PASSWORD = 'bench-password'
+
+# Volumes de données par palier : (utilisateurs, recettes, avis)
+DATA_SIZES = {
+    'small': (200, 1_000, 10_000),
+    'medium': (2_000, 20_000, 200_000),
+    'large': (20_000, 200_000, 2_000_000),
+}
+
+CATEGORY_NAMES = [
+    'Entrées', 'Plats', 'Desserts', 'Soupes', 'Salades', 'Pâtisseries',
+    'Boissons', 'Végétarien', 'Poissons', 'Viandes', 'Pâtes', 'Street food',
+]
+
+WORDS = (
+    "tomate oignon ail citron menthe agneau poulet semoule miel amande pistache "
+    "chocolat vanille beurre farine épices cumin safran harissa olive courgette "
+    "aubergine poivron carotte pomme poire crème fromage basilic coriandre riz"
+).split()
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    # Le jeu de données fixe lui-même created_at / updated_at (dates étalées)
+    fields = [f for m in models for f in m._meta.fields if getattr(f, 'auto_now', False)
+              or getattr(f, 'auto_now_add', False)]
+    saved = [(f, f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, auto_now, auto_now_add in saved:
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+def _zipf_cum_weights(n, exponent=1.1):
+    # Popularité très inégale : quelques recettes concentrent la plupart des avis
+    return list(accumulate(1 / (rank ** exponent) for rank in range(1, n + 1)))
+
+
+def _text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+@contextmanager
+def benchmark_database():
+    """Base de test sur fichier (comme en production), jamais la base de dev."""
+    db_file = os.path.join(tempfile.mkdtemp(prefix='yummybox-bench-'), 'bench.sqlite3')
+    settings.DATABASES['default'].setdefault('TEST', {})['NAME'] = db_file
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield db_file
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def seed_database(users, recipes, reviews, seed=42, batch_size=5_000, chef_ratio=0.1, stdout=None):
+    """
+    Remplit la base avec un jeu de données reproductible (graine fixe).
+
+    Les avis suivent une loi de Zipf sur les recettes, comme en production où
+    quelques recettes populaires reçoivent l'essentiel des avis.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    password = make_password(BENCH_PASSWORD)
+
+    def log(message):
+        if stdout:
+            stdout.write(message)
+
+    with transaction.atomic():
+        categories = Category.objects.bulk_create(
+            [Category(name=name) for name in CATEGORY_NAMES], ignore_conflicts=True
+        )
+        category_ids = list(Category.objects.values_list('pk', flat=True))
+
+        start = User.objects.count()
+        User.objects.bulk_create(
+            [User(username=f'bench{start + i}', password=password) for i in range(users)],
+            batch_size=batch_size,
+        )
+        user_ids = list(User.objects.filter(username__startswith='bench')
+                        .order_by('pk').values_list('pk', flat=True))
+        Profile.objects.bulk_create(
+            [Profile(user_id=pk, role='chef' if rng.random() < chef_ratio else 'user') for pk in user_ids],
+            batch_size=batch_size, ignore_conflicts=True,
+        )
+        chef_ids = list(Profile.objects.filter(user_id__in=user_ids, role='chef')
+                        .values_list('user_id', flat=True)) or user_ids[:1]
+        log(f"{len(user_ids)} utilisateurs, {len(categories)} catégories")
+
+    with explicit_timestamps(Recipe, Review):
+        for offset in range(0, recipes, batch_size):
+            with transaction.atomic():
+                batch = []
+                for _ in range(min(batch_size, recipes - offset)):
+                    created = now - timedelta(minutes=rng.randrange(0, 3 * 365 * 24 * 60))
+                    batch.append(Recipe(
+                        title=_text(rng, rng.randint(2, 5)).capitalize(),
+                        description=_text(rng, rng.randint(40, 200)),
+                        category_id=rng.choice(category_ids),
+                        created_by_id=rng.choice(chef_ids),
+                        created_at=created, updated_at=created,
+                    ))
+                Recipe.objects.bulk_create(batch)
+        log(f"{recipes} recettes")
+
+        recipe_ids = list(Recipe.objects.order_by('pk').values_list('pk', flat=True))
+        rng.shuffle(recipe_ids)  # le rang de popularité est indépendant de l'ancienneté
+        cum_weights = _zipf_cum_weights(len(recipe_ids))
+        for offset in range(0, reviews, batch_size):
+            with transaction.atomic():
+                size = min(batch_size, reviews - offset)
+                chosen = rng.choices(recipe_ids, cum_weights=cum_weights, k=size)
+                batch = []
+                for recipe_id in chosen:
+                    created = now - timedelta(minutes=rng.randrange(0, 365 * 24 * 60))
+                    batch.append(Review(
+                        recipe_id=recipe_id, user_id=rng.choice(user_ids),
+                        rating=rng.choices((1, 2, 3, 4, 5), weights=(5, 7, 15, 33, 40))[0],
+                        comment=_text(rng, rng.randint(0, 30)),
+                        created_at=created, updated_at=created,
+                    ))
+                # Les doublons (recette, utilisateur) tirés au hasard sont ignorés
+                Review.objects.bulk_create(batch, ignore_conflicts=True)
+        log(f"{Review.objects.count()} avis")
+
+    if search.is_available():
+        search.rebuild_index()
+    Catalogue.bump()
+
+
+def percentile(values, pct):
+    """Centile `pct` (0 à 100) d'une série, au rang le plus proche."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(request_fn, iterations=30, warmup=3, repeats=5):
+    """
+    Latences (ms), nombre de requêtes SQL et pic mémoire Python (Ko) d'un appel de vue.
+
+    Les centiles sont calculés sur chacune des `repeats` séries de `iterations`
+    appels, puis on garde leur médiane : une pause du GC ou du système pendant
+    une série ne déplace pas le résultat.
+    """
+    for _ in range(warmup):
+        request_fn()
+
+    runs, query_counts, status = [], [], None
+    for _ in range(repeats):
+        latencies = []
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = request_fn()
+                latencies.append((time.perf_counter() - started) * 1000)
+            query_counts.append(len(queries))
+            status = response.status_code
+        runs.append(latencies)
+
+    # Pic mémoire mesuré à part : tracemalloc fausserait les latences
+    gc.collect()
+    tracemalloc.start()
+    request_fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    def median_of(pct):
+        return round(statistics.median(percentile(run, pct) for run in runs), 3)
+
+    return {
+        'status': status,
+        'iterations': iterations,
+        'repeats': repeats,
+        'p50_ms': median_of(50),
+        'p95_ms': median_of(95),
+        'p99_ms': median_of(99),
+        'queries': max(query_counts),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def logged_in_clients(count, prefix):
+    """`count` clients de test connectés (utilisateurs et sessions préparés hors mesure)."""
+    password = make_password(BENCH_PASSWORD)
+    users = User.objects.bulk_create(
+        [User(username=f'{prefix}{time.time_ns()}-{i}', password=password) for i in range(count)]
+    )
+    Profile.objects.bulk_create([Profile(user=user) for user in users])
+    clients = []
+    for user in users:
+        client = Client()
+        client.force_login(user)
+        clients.append(client)
+    return clients
+
+
+def view_scenarios(calls):
+    """
+    Scénarios couvrant les vues de recipes et accounts.
+
+    Chaque entrée associe un nom à une fonction sans argument qui exécute une
+    requête ; `calls` est le nombre total d'appels prévus (préchauffage inclus).
+    """
+    from .pagination import encode_cursor
+
+    popular_id = Recipe.objects.order_by('-rating_count', 'pk').values_list('pk', flat=True).first()
+    deep = Recipe.objects.order_by('created_at', 'id').values_list('created_at', 'id')[:1000]
+    deep_cursor = encode_cursor(*list(deep)[-1]) if deep else None
+
+    list_url = reverse('recipes:recipe_list')
+    detail_url = reverse('recipes:recipe_detail', args=[popular_id])
+    review_url = reverse('recipes:recipe_review', args=[popular_id])
+    signup_url = reverse('accounts:signup')
+    reader = logged_in_clients(1, 'reader')[0]
+
+    def recipe_review():
+        # Un utilisateur distinct par appel : chaque POST crée un nouvel avis
+        clients = iter(logged_in_clients(calls, 'reviewer'))
+        return lambda: next(clients).post(review_url, {'rating': 4, 'comment': 'Très bon'})
+
+    def signup():
+        client = Client()
+
+        def post():
+            username = f'signup{time.time_ns()}'
+            return client.post(signup_url, {
+                'username': username, 'email': f'{username}@example.com',
+                'password1': 'Bench-Passw0rd!', 'password2': 'Bench-Passw0rd!', 'role': 'user',
+            })
+        return post
+
+    return {
+        'recipe_list': lambda: lambda: reader.get(list_url),
+        'recipe_list_deep': lambda: lambda: reader.get(list_url, {'cursor': deep_cursor} if deep_cursor else {}),
+        'recipe_detail': lambda: lambda: reader.get(detail_url),
+        'recipe_review': recipe_review,
+        'signup': signup,
+    }
+
+
+def _session_handler(write):
+    # Pile réduite aux middlewares de session : seul leur coût est mesuré
+    def view(request):
+        user_id = request.user.pk
+        if write:
+            request.session['last_seen'] = time.time_ns()
+        return HttpResponse(str(user_id))
+    return SessionMiddleware(AuthenticationMiddleware(view))
+
+
+def measure_session_engine(engine, users=50, concurrency=8, requests=400, write=False):
+    """
+    Coût par requête d'un moteur de session sous charge concurrente : latences
+    (ms), débit, requêtes SQL par requête et erreurs (base verrouillée…).
+    """
+    with override_settings(SESSION_ENGINE=engine):
+        cookie_name = settings.SESSION_COOKIE_NAME
+        cookies = [client.cookies[cookie_name].value for client in logged_in_clients(users, 'session')]
+        handler = _session_handler(write)
+        factory = RequestFactory()
+        lock = threading.Lock()
+        latencies, query_counts = [], []
+        counters = {'errors': 0, 'anonymous': 0}
+
+        def worker(index):
+            local_latencies, local_queries, local_errors, local_anonymous = [], [], 0, 0
+            queries = [0]
+
+            def count_queries(execute, sql, params, many, context):
+                queries[0] += 1
+                return execute(sql, params, many, context)
+
+            try:
+                with connection.execute_wrapper(count_queries):
+                    for n in range(index, requests, concurrency):
+                        request = factory.get('/')
+                        request.COOKIES[cookie_name] = cookies[n % len(cookies)]
+                        queries[0] = 0
+                        started = time.perf_counter()
+                        try:
+                            response = handler(request)
+                        except DatabaseError:
+                            local_errors += 1
+                            continue
+                        local_latencies.append((time.perf_counter() - started) * 1000)
+                        local_queries.append(queries[0])
+                        local_anonymous += response.content == b'None'
+            finally:
+                connection.close()
+            with lock:
+                latencies.extend(local_latencies)
+                query_counts.extend(local_queries)
+                counters['errors'] += local_errors
+                counters['anonymous'] += local_anonymous
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(worker, range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    if not latencies:
+        return {'requests': 0, **counters}
+    return {
+        'requests': len(latencies),
+        **counters,
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(statistics.median(latencies), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'queries_per_request': round(sum(query_counts) / len(query_counts), 2),
+    }
+
+
+# Écarts absolus en dessous desquels une hausse relative n'est pas une régression :
+# quelques millisecondes sur une vue de 5 ms sont du bruit de mesure
+MIN_DELTAS = {'p95_ms': 3.0, 'peak_kb': 64.0}
+
+
+def compare(results, baseline, tolerance=0.25, min_deltas=MIN_DELTAS):
+    """
+    Liste des régressions par rapport à une référence (mêmes paliers / scénarios) :
+    toute requête SQL en plus, ou une hausse de p95 / mémoire qui dépasse à la
+    fois `tolerance` (relative) et le plancher absolu de `min_deltas`.
+    """
+    regressions = []
+    for size, scenarios in results.items():
+        for name, current in scenarios.items():
+            reference = baseline.get(size, {}).get(name)
+            if not reference:
+                continue
+            if current['queries'] > reference['queries']:
+                regressions.append(f"{size}/{name} : {reference['queries']} -> {current['queries']} requêtes SQL")
+            for metric in ('p95_ms', 'peak_kb'):
+                delta = current[metric] - reference[metric]
+                if delta > reference[metric] * tolerance and delta > min_deltas.get(metric, 0):
+                    regressions.append(
+                        f"{size}/{name} : {metric} {reference[metric]} -> {current[metric]}"
+                    )
+    return regressions
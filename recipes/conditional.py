@@ -0,0 +1,139 @@
+import hashlib
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.messages import get_messages
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from accounts.roles import get_role
+
+from .models import Catalogue, Recipe, Review
+
+# Validateurs calculés une seule fois par requête, avant toute requête lourde
+# ou rendu de template (voir le décorateur `condition` sur les vues).
+
+
+def _make_etag(*parts):
+    return hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+
+
+def _viewer(request):
+    # Le HTML dépend de l'utilisateur (menu, formulaire d'avis, boutons d'édition)
+    user = request.user
+    if not user.is_authenticated:
+        return (None, None)
+    return (user.pk, get_role(user))
+
+
+def _has_pending_messages(request):
+    return len(get_messages(request)) > 0
+
+
+def detail_validators_queryset(id):
+    last_review = (
+        Review.objects.filter(recipe=OuterRef('pk'))
+        .order_by('-updated_at').values('updated_at')[:1]
+    )
+    return (
+        Recipe.objects.filter(pk=id)
+        .annotate(last_review=Subquery(last_review))
+        .values_list('updated_at', 'last_review', 'rating_sum', 'rating_count')
+    )
+
+
+def _detail_validators(request, id):
+    if not hasattr(request, '_recipe_detail_validators'):
+        request._recipe_detail_validators = detail_validators_queryset(id).first()
+    return request._recipe_detail_validators
+
+
+def recipe_detail_version(request, id):
+    # Version du contenu de la page détail (None : recette inexistante)
+    validators = _detail_validators(request, id)
+    return _make_etag('detail', validators) if validators is not None else None
+
+
+def recipe_detail_etag(request, id):
+    validators = _detail_validators(request, id)
+    if validators is None or _has_pending_messages(request):
+        return None
+    # Le jour entre dans l'ETag : le nombre d'avis récents glisse avec la date.
+    # Le secret CSRF aussi : la page contient le formulaire d'avis, un 304 après
+    # rotation du jeton (nouvelle connexion) ferait échouer le POST suivant.
+    return _make_etag('detail', validators, _viewer(request), timezone.localdate(),
+                      request.META.get('CSRF_COOKIE'))
+
+
+def recipe_reviews_etag(request, id):
+    # Fragment identique pour tous les visiteurs : ni rôle ni messages
+    validators = _detail_validators(request, id)
+    if validators is None:
+        return None
+    return _make_etag('reviews', validators, request.get_full_path())
+
+
+def recipe_detail_last_modified(request, id):
+    validators = _detail_validators(request, id)
+    if validators is None:
+        return None
+    updated_at, last_review = validators[:2]
+    return max(filter(None, (updated_at, last_review)))
+
+
+def _list_validators(request):
+    if not hasattr(request, '_recipe_list_validators'):
+        request._recipe_list_validators = Catalogue.current()
+    return request._recipe_list_validators
+
+
+def recipe_list_etag(request):
+    catalogue = _list_validators(request)
+    if catalogue is None or _has_pending_messages(request):
+        return None
+    return _make_etag('list', catalogue[0], request.get_full_path(), _viewer(request))
+
+
+def catalogue_version(request):
+    catalogue = _list_validators(request)
+    return catalogue[0] if catalogue else 0
+
+
+def recipe_list_last_modified(request):
+    catalogue = _list_validators(request)
+    return catalogue[1] if catalogue else None
+
+
+def revalidate(request, response):
+    # Toujours revalider ; un cache partagé ne doit garder que les pages anonymes
+    patch_cache_control(response, no_cache=True, max_age=0,
+                        private=request.user.is_authenticated,
+                        public=not request.user.is_authenticated)
+    return response
+
+
+def async_condition(etag_func=None, last_modified_func=None):
+    """
+    condition() pour une vue async : les validateurs (ORM synchrone, session,
+    rôle) sont calculés dans un thread, puis relus par le décorateur.
+    """
+    def precomputed(name):
+        return lambda request, *args, **kwargs: request._async_validators[name]
+
+    def decorator(view):
+        guarded = condition(etag_func=precomputed('etag') if etag_func else None,
+                            last_modified_func=precomputed('last_modified') if last_modified_func else None)(view)
+
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            def compute():
+                return {
+                    'etag': etag_func(request, *args, **kwargs) if etag_func else None,
+                    'last_modified': last_modified_func(request, *args, **kwargs) if last_modified_func else None,
+                }
+            request._async_validators = await sync_to_async(compute)()
+            return await guarded(request, *args, **kwargs)
+        return inner
+    return decorator
@@ -0,0 +1,172 @@
+"""
+Détection des recettes quasi identiques (MinHash + LSH).
+
+Le titre et la description sont normalisés (minuscules, sans accents) puis
+découpés en triplets de mots ; la signature MinHash garde, pour chacune des
+NUM_PERM fonctions de hachage, la plus petite valeur sur les triplets. La part
+de valeurs égales entre deux signatures estime leur similarité de Jaccard.
+Les NUM_PERM fonctions sont les tranches de 32 bits d'un seul condensat
+SHAKE-128 par triplet ; le minimum colonne par colonne se fait en C (zip/min).
+
+La signature est découpée en BANDS bandes de ROWS valeurs ; chaque bande
+donne une clé de l'index RecipeLSHBucket. Deux recettes partageant une clé
+sont candidates (probabilité 1 - (1 - s^ROWS)^BANDS pour une similarité s :
+99 % à 0,7, 12 % à 0,3), puis vérifiées sur leur signature complète : une
+recherche lit BANDS entrées d'index au lieu de comparer le texte à tout le
+catalogue.
+"""
+import hashlib
+import re
+import unicodedata
+from array import array
+
+from django.db import transaction
+
+from .models import RecipeFingerprint, RecipeLSHBucket
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+# Similarité estimée à partir de laquelle une recette est signalée comme doublon
+THRESHOLD = 0.7
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _hashes(shingle):
+    # NUM_PERM valeurs de hachage indépendantes de 32 bits
+    return memoryview(hashlib.shake_128(shingle.encode()).digest(4 * NUM_PERM)).cast('I')
+
+
+def shingles(title, description=''):
+    text = unicodedata.normalize('NFKD', f'{title} {description}'.lower())
+    words = _WORD_RE.findall(''.join(c for c in text if not unicodedata.combining(c)))
+    if len(words) < SHINGLE_SIZE:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def signature(title, description=''):
+    """Signature MinHash (NUM_PERM entiers) ; None pour un texte vide."""
+    hashes = [_hashes(shingle) for shingle in shingles(title, description)]
+    if not hashes:
+        return None
+    return list(map(min, zip(*hashes)))
+
+
+def band_keys(sig):
+    # Clé signée sur 64 bits (BigIntegerField) ; le numéro de bande en fait partie
+    keys = []
+    for band in range(BANDS):
+        values = sig[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(repr((band, values)).encode(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'little', signed=True))
+    return keys
+
+
+def similarity(sig, other):
+    return sum(1 for x, y in zip(sig, other) if x == y) / NUM_PERM
+
+
+def _pack(sig):
+    return array('I', sig).tobytes()
+
+
+def _unpack(data):
+    sig = array('I')
+    sig.frombytes(bytes(data))
+    return sig
+
+
+def find_duplicates(title, description='', exclude=None, threshold=THRESHOLD):
+    """
+    Recettes probablement identiques au texte donné : [(id de recette,
+    similarité estimée)], de la plus proche à la moins proche. Une seule
+    requête (clés LSH, puis signatures des candidates).
+    """
+    sig = signature(title, description)
+    if sig is None:
+        return []
+    candidates = RecipeFingerprint.objects.filter(
+        recipe__in=RecipeLSHBucket.objects.filter(key__in=band_keys(sig)).values('recipe')
+    )
+    if exclude is not None:
+        candidates = candidates.exclude(recipe_id=exclude)
+    found = []
+    for recipe_id, data in candidates.values_list('recipe_id', 'signature'):
+        score = similarity(sig, _unpack(data))
+        if score >= threshold:
+            found.append((recipe_id, score))
+    return sorted(found, key=lambda item: (-item[1], item[0]))
+
+
+def index_recipes(recipes):
+    """(Ré)écrit empreinte et clés LSH des recettes données (titre et description chargés)."""
+    fingerprints, buckets = [], []
+    for recipe in recipes:
+        sig = signature(recipe.title, recipe.description)
+        if sig is None:
+            continue
+        fingerprints.append(RecipeFingerprint(recipe_id=recipe.pk, signature=_pack(sig)))
+        buckets.extend(RecipeLSHBucket(key=key, recipe_id=recipe.pk) for key in band_keys(sig))
+    recipe_ids = [recipe.pk for recipe in recipes]
+    with transaction.atomic(savepoint=False):
+        RecipeLSHBucket.objects.filter(recipe_id__in=recipe_ids).delete()
+        RecipeFingerprint.objects.filter(recipe_id__in=recipe_ids).exclude(
+            recipe_id__in=[f.recipe_id for f in fingerprints]
+        ).delete()
+        RecipeFingerprint.objects.bulk_create(
+            fingerprints, batch_size=500, update_conflicts=True,
+            unique_fields=['recipe'], update_fields=['signature'],
+        )
+        RecipeLSHBucket.objects.bulk_create(buckets, batch_size=1000)
+
+
+def find_clusters(threshold=THRESHOLD, max_bucket=1000):
+    """
+    Groupes de doublons du catalogue : parcours de l'index LSH trié par clé,
+    vérification des paires candidates sur les signatures, puis composantes
+    connexes (union-find). Les seaux de plus de `max_bucket` recettes (texte
+    type répété partout) sont ignorés. Renvoie une liste de listes d'ids.
+    """
+    pairs = set()
+    members, current = [], None
+    rows = RecipeLSHBucket.objects.order_by('key', 'recipe_id').values_list('key', 'recipe_id')
+    for key, recipe_id in rows.iterator(chunk_size=10_000):
+        if key != current:
+            _add_pairs(pairs, members, max_bucket)
+            members, current = [], key
+        members.append(recipe_id)
+    _add_pairs(pairs, members, max_bucket)
+
+    parent = {}
+
+    def root(node):
+        while parent.setdefault(node, node) != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    candidates = sorted({recipe_id for pair in pairs for recipe_id in pair})
+    signatures = {}
+    for start in range(0, len(candidates), 500):
+        batch = candidates[start:start + 500]
+        signatures.update(
+            (recipe_id, _unpack(data))
+            for recipe_id, data in RecipeFingerprint.objects.filter(recipe_id__in=batch)
+            .values_list('recipe_id', 'signature')
+        )
+    for left, right in pairs:
+        if left in signatures and right in signatures and similarity(signatures[left], signatures[right]) >= threshold:
+            parent[root(left)] = root(right)
+
+    clusters = {}
+    for node in parent:
+        clusters.setdefault(root(node), []).append(node)
+    return sorted((sorted(ids) for ids in clusters.values() if len(ids) > 1), key=lambda ids: ids[0])
+
+
+def _add_pairs(pairs, members, max_bucket):
+    if 1 < len(members) <= max_bucket:
+        pairs.update((a, b) for i, a in enumerate(members) for b in members[i + 1:])
@@ -0,0 +1,121 @@
+import csv
+import json
+import zlib
+from datetime import datetime, time
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Recipe, Review
+
+EXPORTS = {
+    'recipes': (Recipe, [
+        'id', 'title', 'description', 'category_id', 'category__name', 'created_by_id',
+        'created_at', 'updated_at', 'rating_sum', 'rating_count',
+    ]),
+    'reviews': (Review, [
+        'id', 'recipe_id', 'user_id', 'rating', 'comment', 'created_at', 'updated_at',
+    ]),
+}
+
+FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+}
+
+CHUNK_SIZE = 2000
+# Taille visée des blocs émis : évite un write() (ou un paquet HTTP) par ligne
+BUFFER_SIZE = 64 * 1024
+
+
+def parse_since(value):
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Date invalide : {value!r}")
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def iter_rows(kind, since=None):
+    # Curseur côté serveur lu par blocs : la mémoire ne dépend pas du volume exporté
+    model, fields = EXPORTS[kind]
+    queryset = model.objects.order_by('pk').values_list(*fields)
+    if since is not None:
+        queryset = queryset.filter(created_at__gte=since)
+    return fields, queryset.iterator(chunk_size=CHUNK_SIZE)
+
+
+def _ndjson_lines(fields, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(fields, row))) + '\n'
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _csv_lines(fields, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _buffered(lines):
+    buffer, size = [], 0
+    for line in lines:
+        data = line.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= BUFFER_SIZE:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def _gzipped(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(kind, fmt='ndjson', since=None, compress=False):
+    """Itérateur de blocs d'octets (NDJSON ou CSV, gzip optionnel), ligne à ligne."""
+    fields, rows = iter_rows(kind, since)
+    lines = _csv_lines(fields, rows) if fmt == 'csv' else _ndjson_lines(fields, rows)
+    chunks = _buffered(lines)
+    return _gzipped(chunks) if compress else chunks
+
+
+async def aexport_stream(kind, fmt='ndjson', since=None, compress=False):
+    """
+    export_stream pour un serveur ASGI : Django lirait un itérateur synchrone
+    en entier avant d'envoyer la réponse. Chaque bloc est produit dans le
+    thread de la requête (curseur ORM synchrone), un aller-retour par bloc.
+    """
+    chunks = export_stream(kind, fmt, since, compress)
+    next_chunk = sync_to_async(next)
+    try:
+        while (chunk := await next_chunk(chunks, None)) is not None:
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close)()
+
+
+def export_filename(kind, fmt, compress):
+    name = f"{kind}.{FORMATS[fmt][1]}"
+    return f"{name}.gz" if compress else name
@@ -1,11 +1,40 @@
 from django import forms
+from . import dedup
 from .models import Recipe, Review
 
 class RecipeForm(forms.ModelForm):
+    # Affiché seulement quand des doublons probables ont été trouvés
+    confirm_duplicate = forms.BooleanField(
+        required=False, widget=forms.HiddenInput, label="Publier quand même",
+    )
+
     class Meta:
         model = Recipe
         fields = ['title', 'description', 'category', 'image']
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.duplicates = []
+
+    def clean(self):
+        cleaned_data = super().clean()
+        title = cleaned_data.get('title')
+        if title is None or self.has_error('description'):
+            return cleaned_data
+        # Recherche LSH : quelques lectures d'index, pas de comparaison au catalogue entier
+        found = dedup.find_duplicates(title, cleaned_data.get('description', ''), exclude=self.instance.pk)
+        if found and not cleaned_data.get('confirm_duplicate'):
+            titles = dict(Recipe.objects.filter(pk__in=[pk for pk, _ in found]).values_list('pk', 'title'))
+            self.duplicates = [(pk, titles[pk], score) for pk, score in found if pk in titles]
+            self.fields['confirm_duplicate'].widget = forms.CheckboxInput()
+            raise forms.ValidationError(
+                "Cette recette ressemble beaucoup à une recette existante : %(titles)s. "
+                "Cochez « Publier quand même » pour confirmer.",
+                code='duplicate',
+                params={'titles': ', '.join(f'« {title} »' for _, title, _ in self.duplicates)},
+            )
+        return cleaned_data
+
 
 class ReviewForm(forms.ModelForm):
     class Meta:
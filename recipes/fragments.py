@@ -0,0 +1,43 @@
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from YummyBox_core.metrics import registry
+
+CARD_TEMPLATE = 'recipes/_recipe_card.html'
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+CARD_NAMESPACE = 'recipe-card'
+
+
+def card_version(recipe):
+    # updated_at change à chaque sauvegarde de la recette, renommage de sa
+    # catégorie ou nouvelle déclinaison d'image : une ancienne carte n'est
+    # jamais relue, aucune purge explicite n'est nécessaire.
+    return int(recipe.updated_at.timestamp() * 1_000_000)
+
+
+def card_key(recipe):
+    return f"recipe-card:{recipe.pk}:{card_version(recipe)}"
+
+
+def _count(result, amount):
+    # Compteurs du processus (comme le cache à deux niveaux) : aucun aller-retour
+    # de plus vers le cache partagé, en dehors du get_many() de la page
+    if amount:
+        registry.record_cache(CARD_NAMESPACE, result, amount)
+
+
+def render_recipe_cards(recipes):
+    """Rend les cartes d'une page, en relisant toutes les cartes en cache d'un seul get_many()."""
+    keyed = [(card_key(recipe), recipe) for recipe in recipes]
+    cached = cache.get_many([key for key, _ in keyed])
+    missing = {
+        key: render_to_string(CARD_TEMPLATE, {'recipe': recipe})
+        for key, recipe in keyed if key not in cached
+    }
+    if missing:
+        cache.set_many(missing, timeout=CARD_CACHE_TIMEOUT)
+    _count('hit', len(cached))
+    _count('miss', len(missing))
+    return [mark_safe(cached.get(key) or missing[key]) for key, _ in keyed]
+
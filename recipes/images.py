@@ -0,0 +1,128 @@
+import hashlib
+import logging
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+# Largeurs (px) générées pour chaque image de recette
+RENDITION_WIDTHS = (320, 640, 1024)
+
+# (clé, format Pillow, extension, options d'encodage)
+RENDITION_FORMATS = (
+    ('webp', 'WEBP', 'webp', {'quality': 80, 'method': 4}),
+    ('jpeg', 'JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+RENDITIONS_DIR = 'recipes/renditions'
+
+logger = logging.getLogger(__name__)
+
+
+def _load_source(image_name, storage):
+    with storage.open(image_name, 'rb') as source:
+        image = Image.open(source)
+        # Applique l'orientation EXIF avant que les métadonnées soient supprimées
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    if image.mode not in ('RGB', 'L'):
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        rgba = image.convert('RGBA')
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        image = background
+    return image.convert('RGB')
+
+
+def _encode(image, pil_format, options):
+    buffer = BytesIO()
+    # Image neuve sans `info` : ni EXIF, ni profil, ni commentaire ne sont réécrits
+    clean = Image.new(image.mode, image.size)
+    clean.paste(image)
+    clean.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def generate_renditions(image_name, storage=None):
+    """
+    Produit les déclinaisons redimensionnées d'une image source.
+
+    Les noms de fichiers contiennent une empreinte du contenu : ils ne changent
+    que si l'image change et peuvent être mis en cache indéfiniment.
+    """
+    storage = storage or default_storage
+    image = _load_source(image_name, storage)
+    stem = posixpath.splitext(posixpath.basename(image_name))[0]
+
+    widths = [w for w in RENDITION_WIDTHS if w <= image.width]
+    if image.width < RENDITION_WIDTHS[-1] and image.width not in widths:
+        widths.append(image.width)  # pas d'agrandissement : la taille d'origine sert de plus grande
+
+    renditions = {
+        'source': image_name,
+        'width': image.width,
+        'height': image.height,
+    }
+    for key, pil_format, extension, options in RENDITION_FORMATS:
+        renditions[key] = []
+        for width in widths:
+            resized = image.copy()
+            resized.thumbnail((width, image.height), Image.LANCZOS)
+            data = _encode(resized, pil_format, options)
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            name = f"{RENDITIONS_DIR}/{stem}.{resized.width}w.{digest}.{extension}"
+            if not storage.exists(name):
+                name = storage.save(name, ContentFile(data))
+            renditions[key].append([resized.width, name])
+    return renditions
+
+
+def rendition_names(renditions):
+    return {name for key, *_ in RENDITION_FORMATS for _, name in renditions.get(key, [])}
+
+
+def delete_stale_renditions(old, new, storage=None):
+    storage = storage or default_storage
+    for name in rendition_names(old or {}) - rendition_names(new or {}):
+        storage.delete(name)
+
+
+def failed_renditions(image_name, exc):
+    # Image illisible : notée comme traitée (pas de nouvel essai à chaque passage,
+    # sauf --force), les pages gardent l'image d'origine
+    logger.warning("Déclinaisons de %s impossibles : %s", image_name, exc)
+    return {'source': image_name, 'error': str(exc)[:200]}
+
+
+def process_recipe_image(recipe_id):
+    from .models import Recipe
+
+    recipe = Recipe.objects.only('image', 'image_renditions').get(pk=recipe_id)
+    old = recipe.image_renditions or {}
+    if recipe.image:
+        try:
+            new = generate_renditions(recipe.image.name)
+        except (OSError, ValueError, Image.DecompressionBombError) as exc:
+            new = failed_renditions(recipe.image.name, exc)
+    else:
+        new = {}
+    store_renditions(recipe_id, new)
+    delete_stale_renditions(old, new)
+    return new
+
+
+def store_renditions(recipe_id, renditions):
+    from .models import Catalogue, Recipe
+
+    # updated_at suit le changement : le HTML qui référence les images est revalidé
+    Recipe.objects.filter(pk=recipe_id).update(image_renditions=renditions, updated_at=timezone.now())
+    Catalogue.bump()
+
+
+def needs_processing(recipe):
+    renditions = recipe.image_renditions or {}
+    if recipe.image:
+        return renditions.get('source') != recipe.image.name
+    return bool(renditions)
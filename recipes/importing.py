@@ -0,0 +1,217 @@
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+
+from django.contrib.auth import get_user_model
+
+from .models import Category, Recipe, Review
+from .utils import parse_id, parse_int
+
+User = get_user_model()
+
+
+class RowError(ValueError):
+    pass
+
+
+def open_source(path, fmt=None):
+    """Ouvre un fichier (éventuellement .gz) ou stdin (`-`) et itère sur des dicts."""
+    if path == '-':
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+    elif path.endswith('.gz'):
+        stream = gzip.open(path, 'rt', encoding='utf-8', newline='')
+    else:
+        stream = open(path, encoding='utf-8', newline='')
+    fmt = fmt or guess_format(path)
+    if fmt == 'csv':
+        return stream, csv.DictReader(stream)
+    return stream, (parse_json_line(line) for line in stream if line.strip())
+
+
+def parse_json_line(line):
+    # Ligne illisible : RowError à la place de la ligne, rejetée par l'importeur
+    try:
+        row = json.loads(line)
+    except json.JSONDecodeError as exc:
+        return RowError(f"JSON invalide : {exc}")
+    if not isinstance(row, dict):
+        return RowError("objet JSON attendu")
+    return row
+
+
+def guess_format(path):
+    name = path[:-3] if path.endswith('.gz') else path
+    return 'csv' if name.endswith('.csv') else 'jsonl'
+
+
+def split_rows(rows):
+    # Écarte les lignes déjà rejetées par open_source
+    valid, errors = [], []
+    for row in rows:
+        if isinstance(row, RowError):
+            errors.append(str(row))
+        else:
+            valid.append(row)
+    return valid, errors
+
+
+def text(row, field):
+    # Champ texte facultatif ; une autre valeur JSON (nombre, liste...) est rejetée
+    value = row.get(field)
+    if value is None:
+        return ''
+    if not isinstance(value, str):
+        raise RowError(f"{field} : texte attendu")
+    return value
+
+
+def text_keys(rows, field):
+    return {row[field] for row in rows if isinstance(row.get(field), str) and row[field]}
+
+
+class LookupCache:
+    """
+    Dictionnaire clé -> id borné en taille, complété par lots (une requête par lot).
+    """
+
+    def __init__(self, queryset, key_field, max_size=200_000):
+        self.queryset = queryset
+        self.key_field = key_field
+        self.max_size = max_size
+        self.ids = {}
+
+    def resolve(self, keys):
+        missing = {key for key in keys if key not in self.ids}
+        if missing:
+            if len(self.ids) + len(missing) > self.max_size:
+                # Le lot entier est relu : ses clés déjà connues partent avec le reste
+                self.ids.clear()
+                missing = set(keys)
+            found = self.queryset.filter(**{f'{self.key_field}__in': missing})
+            self.ids.update(found.values_list(self.key_field, 'pk'))
+        return self.ids
+
+    def add(self, mapping):
+        self.ids.update(mapping)
+
+
+class Checkpoint:
+    # Nombre de lignes déjà importées et validées, écrit après chaque lot
+    def __init__(self, path, source, kind):
+        self.path = path
+        self.source = source
+        self.kind = kind
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        with open(self.path, encoding='utf-8') as fh:
+            state = json.load(fh)
+        if state.get('source') != self.source or state.get('kind') != self.kind:
+            return 0
+        return int(state.get('rows', 0))
+
+    def save(self, rows):
+        if not self.path:
+            return
+        tmp = f'{self.path}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump({'source': self.source, 'kind': self.kind, 'rows': rows}, fh)
+        os.replace(tmp, self.path)
+
+
+class RecipeImporter:
+    def __init__(self):
+        self.categories = LookupCache(Category.objects.all(), 'name')
+        self.users = LookupCache(User.objects.all(), 'username')
+
+    def _ensure_categories(self, names):
+        known = self.categories.resolve(names)
+        new = [Category(name=name) for name in names if name not in known]
+        if new:
+            Category.objects.bulk_create(new, ignore_conflicts=True)
+            self.categories.add(
+                Category.objects.filter(name__in=[c.name for c in new]).values_list('name', 'pk')
+            )
+        return self.categories.ids
+
+    def build(self, rows):
+        rows, errors = split_rows(rows)
+        categories = self._ensure_categories(text_keys(rows, 'category'))
+        users = self.users.resolve(text_keys(rows, 'created_by'))
+        objs = []
+        for row in rows:
+            try:
+                title, created_by = text(row, 'title'), text(row, 'created_by')
+                if not title:
+                    raise RowError("titre manquant")
+                if created_by not in users:
+                    raise RowError(f"utilisateur inconnu : {created_by!r}")
+                objs.append(Recipe(
+                    title=title[:200],
+                    description=text(row, 'description'),
+                    category_id=categories.get(text(row, 'category')),
+                    image=text(row, 'image') or None,
+                    created_by_id=users[created_by],
+                ))
+            except RowError as exc:
+                errors.append(str(exc))
+        return objs, errors
+
+    def write(self, objs, on_conflict):
+        Recipe.objects.bulk_create(objs)
+
+
+class ReviewImporter:
+    def __init__(self):
+        self.users = LookupCache(User.objects.all(), 'username')
+        self.recipes = LookupCache(Recipe.objects.all(), 'pk')
+
+    def build(self, rows):
+        rows, errors = split_rows(rows)
+        users = self.users.resolve(text_keys(rows, 'user'))
+        recipe_ids = set()
+        for row in rows:
+            try:
+                recipe_ids.add(parse_id(row.get('recipe')))
+            except (TypeError, ValueError, OverflowError):
+                pass
+        recipes = self.recipes.resolve(recipe_ids)
+        objs = {}
+        for row in rows:
+            try:
+                try:
+                    recipe_id, rating = parse_id(row.get('recipe')), parse_int(row.get('rating'))
+                except (TypeError, ValueError, OverflowError):
+                    raise RowError("recette ou note non numérique")
+                if recipe_id not in recipes:
+                    raise RowError(f"recette inconnue : {recipe_id}")
+                user = text(row, 'user')
+                if user not in users:
+                    raise RowError(f"utilisateur inconnu : {user!r}")
+                if not 1 <= rating <= 5:
+                    raise RowError(f"note hors bornes : {rating}")
+                key = (recipe_id, users[user])
+                objs[key] = Review(
+                    recipe_id=recipe_id, user_id=key[1],
+                    rating=rating, comment=text(row, 'comment'),
+                )
+            except RowError as exc:
+                errors.append(str(exc))
+        # Un seul avis par (recette, utilisateur) dans un même INSERT : le dernier gagne
+        return list(objs.values()), errors
+
+    def write(self, objs, on_conflict):
+        if on_conflict == 'update':
+            Review.objects.bulk_upsert(objs)
+        else:
+            Review.objects.bulk_create(objs, ignore_conflicts=True)
+
+
+IMPORTERS = {
+    'recipes': RecipeImporter,
+    'reviews': ReviewImporter,
+}
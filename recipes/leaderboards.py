@@ -0,0 +1,219 @@
+"""
+Classements « mieux notées » et « tendances », stockés dans RecipeScore.
+
+- mieux notées : moyenne bayésienne, (somme + C × m) / (nombre + C), où m est
+  la moyenne globale figée par la dernière reconstruction (LeaderboardState)
+  et C = PRIOR_WEIGHT avis fictifs : une recette à un seul 5 ★ ne passe pas
+  devant une recette à cent avis à 4,8 ★.
+- tendances : somme des poids des avis (0 pour 1 ★, 1 pour 5 ★), chacun
+  divisé par deux toutes les HALF_LIFE. Les poids sont exprimés à une date de
+  référence (LeaderboardState.trending_epoch) : un avis récent pèse
+  2^(écart / demi-vie) de plus qu'un ancien, le facteur commun de décroissance
+  ne change pas l'ordre, et un nouvel avis n'ajoute qu'un terme au score de sa
+  recette. Les poids croissent avec l'écart (un flottant déborde après environ
+  9,8 ans, la précision baisse bien avant) : `rebuild_leaderboards` avance la
+  date de référence à chaque passage (rebase_trending).
+
+Mise à jour incrémentale à chaque avis (recipes.signals, ReviewQuerySet),
+reconstruction exacte par `manage.py rebuild_leaderboards`. Une page de
+classement est un parcours d'index (global ou par catégorie), sans tri.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import (
+    Case, Count, DateTimeField, F, FloatField, Func, OuterRef, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Cast, Coalesce, Power
+from django.utils import timezone
+
+from .models import LeaderboardState, Recipe, RecipeScore, Review
+
+PRIOR_WEIGHT = 10
+DEFAULT_PRIOR_MEAN = 3.0
+HALF_LIFE = timedelta(days=3.5)
+DEFAULT_TRENDING_EPOCH = LeaderboardState._meta.get_field('trending_epoch').default
+
+# Classement -> colonne de RecipeScore
+BOARDS = {'top': 'bayesian', 'trending': 'trending'}
+
+
+def review_weight(rating):
+    return (rating - 1) / 4
+
+
+def decay_factor(moment, epoch):
+    # Poids relatif d'un avis daté `moment` par rapport à la date de référence
+    return 2 ** ((moment - epoch) / HALF_LIFE)
+
+
+def trending_epoch():
+    value = (
+        LeaderboardState.objects.filter(pk=LeaderboardState.SINGLETON_ID)
+        .values_list('trending_epoch', flat=True).first()
+    )
+    return DEFAULT_TRENDING_EPOCH if value is None else value
+
+
+def trending_now(score, now=None):
+    """Score de tendance ramené à la date `now` (somme des poids décrus)."""
+    return score / decay_factor(now or timezone.now(), trending_epoch())
+
+
+def bayesian_average(rating_sum, rating_count, prior_mean):
+    if not rating_count:
+        return None
+    return (rating_sum + PRIOR_WEIGHT * prior_mean) / (rating_count + PRIOR_WEIGHT)
+
+
+def prior_mean():
+    value = (
+        LeaderboardState.objects.filter(pk=LeaderboardState.SINGLETON_ID)
+        .values_list('prior_mean', flat=True).first()
+    )
+    return DEFAULT_PRIOR_MEAN if value is None else value
+
+
+def _bayesian_from_recipe():
+    # Moyenne bayésienne recalculée en SQL depuis les agrégats de la recette
+    prior = Coalesce(
+        Subquery(LeaderboardState.objects.filter(pk=LeaderboardState.SINGLETON_ID).values('prior_mean')[:1]),
+        Value(DEFAULT_PRIOR_MEAN),
+    )
+    average = Recipe.objects.filter(pk=OuterRef('pk')).annotate(average=Case(
+        When(rating_count=0, then=None),
+        default=(Cast('rating_sum', FloatField()) + PRIOR_WEIGHT * prior) / (F('rating_count') + PRIOR_WEIGHT),
+        output_field=FloatField(),
+    ))
+    return Subquery(average.values('average')[:1])
+
+
+def _julianday(expression):
+    return Func(expression, function='julianday', output_field=FloatField())
+
+
+def _decay_sql(moment):
+    # decay_factor() en SQL, date de référence lue dans le même UPDATE
+    epoch = Coalesce(
+        Subquery(LeaderboardState.objects.filter(pk=LeaderboardState.SINGLETON_ID).values('trending_epoch')[:1]),
+        Value(DEFAULT_TRENDING_EPOCH, output_field=DateTimeField()),
+    )
+    age = _julianday(Value(moment, output_field=DateTimeField())) - _julianday(epoch)
+    return Power(2.0, age / (HALF_LIFE / timedelta(days=1)))
+
+
+def _apply(recipe_id, trending_delta, adding):
+    # Un seul UPDATE : moyenne depuis les agrégats (déjà à jour), tendance par delta
+    updated = RecipeScore.objects.filter(pk=recipe_id).update(
+        bayesian=_bayesian_from_recipe(), trending=F('trending') + trending_delta,
+    )
+    if not updated and adding:
+        # Pas encore classée : calcul complet, qui inclut déjà cet avis
+        rebuild([recipe_id])
+
+
+def review_added(review):
+    moment = review.created_at or timezone.now()
+    _apply(review.recipe_id, review_weight(review.rating) * _decay_sql(moment), True)
+
+
+def review_removed(review, recipe_id, rating):
+    moment = review.created_at or timezone.now()
+    _apply(recipe_id, -review_weight(rating) * _decay_sql(moment), False)
+
+
+def rating_changed(recipe_id, created_at, old_rating, new_rating):
+    if old_rating != new_rating:
+        delta = (review_weight(new_rating) - review_weight(old_rating)) * _decay_sql(created_at)
+        _apply(recipe_id, delta, True)
+
+
+def category_changed(recipe):
+    RecipeScore.objects.filter(pk=recipe.pk).update(category_id=recipe.category_id)
+
+
+def _trending_expression(epoch):
+    # Somme des poids en SQL (SQLite : julianday), même formule que decay_factor()
+    age = _julianday(F('created_at')) - _julianday(Value(epoch, output_field=DateTimeField()))
+    return Sum(
+        (F('rating') - 1) / 4.0 * Power(2.0, age / (HALF_LIFE / timedelta(days=1))),
+        output_field=FloatField(),
+    )
+
+
+def rebuild(recipe_ids=None, prior=None, batch_size=500):
+    """
+    Recalcule les scores des recettes données (toutes si None) depuis les avis :
+    une requête GROUP BY, puis INSERT ... ON CONFLICT DO UPDATE. Renvoie le
+    nombre de recettes.
+    """
+    if prior is None:
+        prior = prior_mean()
+    recipes = Recipe.objects.order_by()
+    reviews = Review.objects.order_by()
+    if recipe_ids is not None:
+        recipe_ids = list(recipe_ids)
+        recipes = recipes.filter(pk__in=recipe_ids)
+        reviews = reviews.filter(recipe_id__in=recipe_ids)
+
+    with transaction.atomic(savepoint=False):
+        rows = {
+            pk: RecipeScore(recipe_id=pk, category_id=category_id)
+            for pk, category_id in recipes.values_list('pk', 'category_id')
+        }
+        totals = reviews.values('recipe').annotate(
+            total=Sum('rating'), count=Count('pk'), trending=_trending_expression(trending_epoch()),
+        )
+        for row in totals:
+            score = rows.get(row['recipe'])
+            if score is not None:
+                score.bayesian = bayesian_average(row['total'], row['count'], prior)
+                score.trending = row['trending'] or 0.0
+        RecipeScore.objects.bulk_create(
+            rows.values(), batch_size=batch_size, update_conflicts=True, unique_fields=['recipe'],
+            update_fields=['category', 'bayesian', 'trending'],
+        )
+    return len(rows)
+
+
+def refresh_prior():
+    """Fige la moyenne globale actuelle comme a priori ; la renvoie."""
+    mean = Review.objects.aggregate(total=Sum('rating'), count=Count('pk'))
+    prior = mean['total'] / mean['count'] if mean['count'] else DEFAULT_PRIOR_MEAN
+    LeaderboardState.objects.update_or_create(
+        pk=LeaderboardState.SINGLETON_ID, defaults={'prior_mean': prior, 'rebuilt_at': timezone.now()},
+    )
+    return prior
+
+
+def rebase_trending(now=None):
+    """
+    Avance la date de référence des tendances à `now` et multiplie tous les
+    scores par 2^-(écart / demi-vie), dans une même transaction : l'ordre et
+    les scores ramenés à une date restent les mêmes, les poids restent proches
+    de 1. Renvoie la nouvelle date de référence.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        state, _ = LeaderboardState.objects.select_for_update().get_or_create(pk=LeaderboardState.SINGLETON_ID)
+        # decay_factor(ancienne référence, nouvelle) : tend vers 0 sans déborder
+        factor = decay_factor(state.trending_epoch, now)
+        RecipeScore.objects.exclude(trending=0).update(trending=F('trending') * factor)
+        state.trending_epoch = now
+        state.save(update_fields=['trending_epoch'])
+    return now
+
+
+def board_queryset(board, category_id=None):
+    """Recettes classées (lignes RecipeScore, recette jointe), colonnes des cartes seulement."""
+    field = BOARDS[board]
+    queryset = (
+        RecipeScore.objects.select_related('recipe__category')
+        .only(field, 'recipe__id', 'recipe__title', 'recipe__image', 'recipe__image_renditions',
+              'recipe__created_at', 'recipe__updated_at', 'recipe__category__name')
+    )
+    if category_id is not None:
+        queryset = queryset.filter(category_id=category_id)
+    if board == 'top':
+        return queryset.filter(bayesian__isnull=False)
+    return queryset.filter(trending__gt=0)
@@ -0,0 +1,180 @@
+import http.client
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.utils import timezone
+
+from recipes.benchmarking import (
+    DATA_SIZES, benchmark_database, logged_in_clients, percentile, seed_database,
+)
+from recipes.models import Recipe
+
+MODES = ('wsgi', 'asgi')
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare le débit du déploiement WSGI (workers sync) et ASGI (workers uvicorn, vues "
+        "async) : lance gunicorn dans chaque mode sur une base remplie et envoie des requêtes "
+        "concurrentes sur la liste et le détail."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', default=','.join(MODES))
+        parser.add_argument('--size', default='small', choices=list(DATA_SIZES))
+        parser.add_argument('--workers', type=int, default=2, help="Workers gunicorn par mode.")
+        parser.add_argument('--concurrency', default='8,64,256',
+                            help="Clients simultanés, séparés par des virgules.")
+        parser.add_argument('--duration', type=float, default=10.0, help="Secondes par mesure.")
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--output', default='benchmarks/servers.json')
+
+    def handle(self, *args, **options):
+        modes = [m.strip() for m in options['modes'].split(',') if m.strip()]
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f"Mode inconnu : {', '.join(sorted(unknown))}")
+        levels = [int(c) for c in options['concurrency'].split(',') if c.strip()]
+
+        results = {}
+        with benchmark_database() as db_file:
+            users, recipes, reviews = DATA_SIZES[options['size']]
+            self.stdout.write(f"[{options['size']}] {users} utilisateurs, {recipes} recettes, {reviews} avis…")
+            seed_database(users, recipes, reviews)
+            popular_id = Recipe.objects.order_by('-rating_count', 'pk').values_list('pk', flat=True).first()
+            client = logged_in_clients(1, 'server')[0]
+            cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+            paths = {'recipe_list': '/recipes/', 'recipe_detail': f'/{popular_id}/'}
+
+            for mode in modes:
+                results[mode] = {}
+                with self._server(mode, db_file, options):
+                    for name, path in paths.items():
+                        for concurrency in levels:
+                            stats = self._load(options['port'], path, cookie, concurrency,
+                                               options['duration'])
+                            results[mode][f'{name}@{concurrency}'] = stats
+                            self.stdout.write(
+                                f"  {mode} {name:<14} c={concurrency:<4} débit={stats['rps']:>8.1f}/s "
+                                f"p50={stats['p50_ms']:>8.1f}ms p99={stats['p99_ms']:>8.1f}ms "
+                                f"erreurs={stats['errors']}"
+                            )
+
+        report = {
+            'meta': {
+                'date': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'cpus': os.cpu_count(),
+                'workers': options['workers'],
+                'duration_s': options['duration'],
+                'size': options['size'],
+            },
+            'results': results,
+        }
+        directory = os.path.dirname(options['output'])
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(options['output'], 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2, ensure_ascii=False)
+            fh.write('\n')
+        self.stdout.write(self.style.SUCCESS(f"Résultats écrits : {options['output']}"))
+
+    def _server(self, mode, db_file, options):
+        command = self
+
+        class Server:
+            def __enter__(self):
+                env = {
+                    **os.environ,
+                    'SERVER_MODE': mode,
+                    'WEB_CONCURRENCY': str(options['workers']),
+                    'GUNICORN_BIND': f"127.0.0.1:{options['port']}",
+                    'SQLITE_PATH': db_file,
+                }
+                env.pop('METRICS_DIR', None)
+                if mode == 'asgi':
+                    # Exigé sous ASGI ; le banc ne demande pas d'images
+                    env.setdefault('MEDIA_ACCEL', 'nginx')
+                self.process = subprocess.Popen(
+                    [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+                    cwd=settings.BASE_DIR, env=env,
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                )
+                command._wait_ready(options['port'], self.process)
+                return self
+
+            def __exit__(self, *exc):
+                self.process.terminate()
+                self.process.wait(timeout=30)
+
+        return Server()
+
+    def _wait_ready(self, port, process, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError("gunicorn s'est arrêté au démarrage (uvicorn-worker installé ?)")
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+                conn.request('GET', '/healthz/')
+                if conn.getresponse().status == 200:
+                    return
+            except OSError:
+                pass
+            time.sleep(0.2)
+        process.terminate()
+        raise CommandError(f"Serveur injoignable sur le port {port}")
+
+    def _load(self, port, path, cookie, concurrency, duration):
+        # Une connexion par requête : les workers sync ne gardent pas le keep-alive
+        deadline = time.monotonic() + duration
+        lock = threading.Lock()
+        latencies, errors = [], [0]
+
+        def worker():
+            local, failed = [], 0
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                    conn.request('GET', path, headers={'Cookie': cookie, 'Host': '127.0.0.1'})
+                    response = conn.getresponse()
+                    response.read()
+                    conn.close()
+                    if response.status != 200:
+                        failed += 1
+                        continue
+                except OSError:
+                    failed += 1
+                    continue
+                local.append((time.perf_counter() - started) * 1000)
+            with lock:
+                latencies.extend(local)
+                errors[0] += failed
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(concurrency):
+                pool.submit(worker)
+        elapsed = time.perf_counter() - started
+        if not latencies:
+            return {'requests': 0, 'rps': 0.0, 'p50_ms': 0.0, 'p99_ms': 0.0, 'errors': errors[0]}
+        return {
+            'requests': len(latencies),
+            'rps': round(len(latencies) / elapsed, 1),
+            'p50_ms': round(statistics.median(latencies), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'errors': errors[0],
+        }
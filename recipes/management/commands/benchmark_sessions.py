@@ -0,0 +1,75 @@
+import json
+import os
+import platform
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from recipes.benchmarking import benchmark_database, measure_session_engine
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare le coût par requête de chaque moteur de session (db, cache, cached_db, "
+        "signed_cookies) sous charge concurrente, en lecture seule et avec écriture de session."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--engines', default=','.join(settings.SESSION_ENGINES),
+                            help="Moteurs séparés par des virgules.")
+        parser.add_argument('--concurrency', default='1,8',
+                            help="Nombres de threads clients, séparés par des virgules.")
+        parser.add_argument('--requests', type=int, default=2_000,
+                            help="Requêtes par mesure (toutes concurrences confondues).")
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--output', default='benchmarks/sessions.json')
+
+    def handle(self, *args, **options):
+        engines = [e.strip() for e in options['engines'].split(',') if e.strip()]
+        unknown = set(engines) - set(settings.SESSION_ENGINES)
+        if unknown:
+            raise CommandError(f"Moteur inconnu : {', '.join(sorted(unknown))}")
+        levels = [int(c) for c in options['concurrency'].split(',') if c.strip()]
+
+        cache_backend = settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1]
+        self.stdout.write(f"Cache : {cache_backend}")
+        results = {}
+        with benchmark_database():
+            for engine in engines:
+                results[engine] = {}
+                for write in (False, True):
+                    for concurrency in levels:
+                        name = f"{'write' if write else 'read'}@{concurrency}"
+                        stats = measure_session_engine(
+                            settings.SESSION_ENGINES[engine], users=options['users'],
+                            concurrency=concurrency, requests=options['requests'], write=write,
+                        )
+                        results[engine][name] = stats
+                        if not stats['requests']:
+                            self.stdout.write(f"  {engine:<15} {name:<9} aucune requête aboutie "
+                                              f"({stats['errors']} erreurs)")
+                            continue
+                        self.stdout.write(
+                            f"  {engine:<15} {name:<9} p50={stats['p50_ms']:>7.3f}ms "
+                            f"p95={stats['p95_ms']:>7.3f}ms débit={stats['rps']:>8.1f}/s "
+                            f"SQL/requête={stats['queries_per_request']:>4} erreurs={stats['errors']}"
+                        )
+
+        report = {
+            'meta': {
+                'date': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'cache': cache_backend,
+                'requests': options['requests'],
+            },
+            'results': results,
+        }
+        directory = os.path.dirname(options['output'])
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(options['output'], 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2, ensure_ascii=False)
+            fh.write('\n')
+        self.stdout.write(self.style.SUCCESS(f"Résultats écrits : {options['output']}"))
@@ -0,0 +1,99 @@
+import json
+import os
+import platform
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from recipes.benchmarking import (
+    DATA_SIZES, benchmark_database, compare, measure, seed_database, view_scenarios,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure latences (p50/p95/p99), requêtes SQL et pic mémoire de chaque vue sur une "
+        "base de test remplie à plusieurs volumes, puis compare à une référence."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='small',
+                            help=f"Paliers séparés par des virgules parmi : {', '.join(DATA_SIZES)}.")
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--repeats', type=int, default=5,
+                            help="Séries de mesures par scénario ; centiles médians des séries.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', default='benchmarks/results.json')
+        parser.add_argument('--baseline', default='benchmarks/baseline.json')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help="Dégradation relative tolérée sur p95 et mémoire (0.25 = +25 %%).")
+        parser.add_argument('--write-baseline', action='store_true',
+                            help="Enregistre les résultats comme nouvelle référence.")
+        parser.add_argument('--only', help="Scénarios à exécuter, séparés par des virgules.")
+
+    def handle(self, *args, **options):
+        sizes = [s.strip() for s in options['sizes'].split(',') if s.strip()]
+        unknown = set(sizes) - set(DATA_SIZES)
+        if unknown:
+            raise CommandError(f"Palier inconnu : {', '.join(sorted(unknown))}")
+        only = set(options['only'].split(',')) if options['only'] else None
+
+        results = {}
+        with benchmark_database():
+            for size in sizes:
+                call_command('flush', interactive=False, verbosity=0)
+                users, recipes, reviews = DATA_SIZES[size]
+                self.stdout.write(f"[{size}] {users} utilisateurs, {recipes} recettes, {reviews} avis…")
+                seed_database(users, recipes, reviews, seed=options['seed'])
+
+                calls = options['iterations'] * options['repeats'] + 4
+                results[size] = {}
+                for name, make_request in view_scenarios(calls).items():
+                    if only and name not in only:
+                        continue
+                    stats = measure(make_request(), iterations=options['iterations'],
+                                    repeats=options['repeats'])
+                    results[size][name] = stats
+                    self.stdout.write(
+                        f"  {name:<18} p50={stats['p50_ms']:>8.2f}ms p95={stats['p95_ms']:>8.2f}ms "
+                        f"requêtes={stats['queries']:>3} mémoire={stats['peak_kb']:>8.1f}Ko "
+                        f"[{stats['status']}]"
+                    )
+
+        report = {
+            'meta': {
+                'date': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'iterations': options['iterations'],
+                'repeats': options['repeats'],
+                'seed': options['seed'],
+            },
+            'results': results,
+        }
+        self._write(options['output'], report)
+        if options['write_baseline']:
+            self._write(options['baseline'], report)
+            self.stdout.write(self.style.SUCCESS(f"Référence écrite : {options['baseline']}"))
+            return
+
+        if not os.path.exists(options['baseline']):
+            self.stdout.write(f"Pas de référence ({options['baseline']}) : comparaison ignorée.")
+            return
+        with open(options['baseline'], encoding='utf-8') as fh:
+            baseline = json.load(fh)['results']
+        regressions = compare(results, baseline, options['tolerance'])
+        if regressions:
+            for line in regressions:
+                self.stderr.write(f"RÉGRESSION {line}")
+            raise CommandError(f"{len(regressions)} régression(s) par rapport à la référence.")
+        self.stdout.write(self.style.SUCCESS("Aucune régression par rapport à la référence."))
+
+    def _write(self, path, report):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2, ensure_ascii=False)
+            fh.write('\n')
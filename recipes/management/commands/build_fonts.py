@@ -0,0 +1,177 @@
+import importlib
+import json
+import re
+from importlib.metadata import version
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Polices de texte (licence OFL), fichiers de google/fonts distribués par les paquets
+# fontpkg-* (versions épinglées dans requirements.txt) :
+# (famille, graisse(s) CSS, paquet, fichier source, fichier produit)
+TEXT_FONTS = [
+    ('Poppins', '300', 'fontpkg_poppins', 'Poppins-Light.ttf', 'poppins-300.woff2'),
+    ('Poppins', '400', 'fontpkg_poppins', 'Poppins-Regular.ttf', 'poppins-400.woff2'),
+    ('Poppins', '500', 'fontpkg_poppins', 'Poppins-Medium.ttf', 'poppins-500.woff2'),
+    ('Poppins', '600', 'fontpkg_poppins', 'Poppins-SemiBold.ttf', 'poppins-600.woff2'),
+    ('Poppins', '700', 'fontpkg_poppins', 'Poppins-Bold.ttf', 'poppins-700.woff2'),
+    ('Dancing Script', '600 700', 'fontpkg_dancing_script', 'DancingScript[wght].ttf', 'dancing-script.woff2'),
+]
+# Sous-ensemble « latin » de Google Fonts : français complet, ponctuation typographique, €
+LATIN_RANGE = (
+    'U+0000-00FF, U+0131, U+0152-0153, U+02BB-02BC, U+02C6, U+02DA, U+02DC, U+0304, U+0308, '
+    'U+0329, U+2000-206F, U+20AC, U+2122, U+2191, U+2193, U+2212, U+2215, U+FEFF, U+FFFD'
+)
+
+# Font Awesome Free (paquet fontawesomefree) : style -> (famille, graisse, fichier)
+ICON_FONTS = {
+    'solid': ('Font Awesome 6 Free', 900, 'fa-solid-900'),
+    'regular': ('Font Awesome 6 Free', 400, 'fa-regular-400'),
+    'brands': ('Font Awesome 6 Brands', 400, 'fa-brands-400'),
+}
+ICON_BASE_CSS = """\
+.fa,.fas,.far,.fab,.fa-solid,.fa-regular,.fa-brands{-moz-osx-font-smoothing:grayscale;\
+-webkit-font-smoothing:antialiased;display:inline-block;font-style:normal;font-variant:normal;\
+line-height:1;text-rendering:auto}
+.fa,.fas,.fa-solid{font-family:"Font Awesome 6 Free";font-weight:900}
+.far,.fa-regular{font-family:"Font Awesome 6 Free";font-weight:400}
+.fab,.fa-brands{font-family:"Font Awesome 6 Brands";font-weight:400}
+"""
+ICON_CLASS_RE = re.compile(r'\bfa-([a-z0-9]+(?:-[a-z0-9]+)*)')
+REGULAR_STYLE_RE = re.compile(r'\b(?:far|fa-regular)\b')
+
+
+def parse_range(text):
+    codepoints = set()
+    for part in text.split(','):
+        start, _, end = part.strip()[2:].partition('-')
+        codepoints.update(range(int(start, 16), int(end or start, 16) + 1))
+    return codepoints
+
+
+def subset(source, target, unicodes):
+    from fontTools import subset as ft_subset
+
+    options = ft_subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = ['*']
+    options.name_IDs = ['*']
+    options.notdef_outline = True
+    font = ft_subset.load_font(str(source), options)
+    subsetter = ft_subset.Subsetter(options)
+    subsetter.populate(unicodes=unicodes)
+    subsetter.subset(font)
+    ft_subset.save_font(font, str(target), options)
+    return target.stat().st_size
+
+
+def font_face(family, weight, filename, display, unicode_range=None):
+    rule = (
+        f'@font-face{{font-family:"{family}";font-style:normal;font-weight:{weight};'
+        f'font-display:{display};src:url("{filename}") format("woff2")'
+    )
+    if unicode_range:
+        rule += f';unicode-range:{unicode_range}'
+    return rule + '}\n'
+
+
+def project_sources():
+    # Templates et scripts des applications du projet (pas celles des dépendances)
+    base_dir = Path(settings.BASE_DIR).resolve()
+    for app in apps.get_app_configs():
+        app_dir = Path(app.path).resolve()
+        if base_dir not in app_dir.parents:
+            continue
+        yield from (app_dir / 'templates').rglob('*.html')
+        yield from (app_dir / 'static').rglob('*.js')
+
+
+class Command(BaseCommand):
+    help = (
+        "Génère static/fonts/ (versionné) : polices de texte et icônes Font Awesome réduites aux "
+        "caractères et icônes utilisés (woff2), et fonts.css avec les @font-face et "
+        "les classes d'icônes du projet."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=str(Path(settings.BASE_DIR) / 'static' / 'fonts'))
+
+    def handle(self, *args, **options):
+        try:
+            import fontawesomefree
+            import fontTools  # noqa: F401
+        except ImportError:
+            raise CommandError("fonttools et fontawesomefree sont requis : pip install fonttools fontawesomefree")
+        output = Path(options['output'])
+        output.mkdir(parents=True, exist_ok=True)
+        css = ['/* Généré par `manage.py build_fonts` : ne pas modifier. */\n']
+
+        latin = parse_range(LATIN_RANGE)
+        notices = set()
+        for family, weight, package, filename, target in TEXT_FONTS:
+            try:
+                root = Path(importlib.import_module(package).__file__).parent
+            except ImportError:
+                raise CommandError(f"{package} est requis : pip install {package.replace('_', '-')}")
+            metadata = json.loads((root / 'metadata.json').read_text(encoding='utf-8'))
+            if family not in notices:
+                notices.add(family)
+                css.append(f"/*! {family} {metadata['version']} - {metadata['copyright']} "
+                           f"(SIL OFL 1.1, https://openfontlicense.org) */\n")
+            size = subset(root / 'files' / filename, output / target, latin)
+            css.append(font_face(family, weight, target, 'swap', LATIN_RANGE))
+            self.stdout.write(f"{target} : {size / 1024:.1f} Kio")
+
+        css.append(self.build_icons(Path(fontawesomefree.__file__).parent / 'static' / 'fontawesomefree', output))
+        (output / 'fonts.css').write_text(''.join(css), encoding='utf-8')
+        self.stdout.write(self.style.SUCCESS(f"Polices écrites dans {output}."))
+
+    def build_icons(self, fa_dir, output):
+        metadata = json.loads((fa_dir / 'metadata' / 'icons.json').read_text(encoding='utf-8'))
+        icons = {}
+        for name, icon in metadata.items():
+            entry = (int(icon['unicode'], 16), icon['styles'])
+            icons[name] = entry
+            for alias in icon.get('aliases', {}).get('names', []):
+                icons.setdefault(alias, entry)
+
+        used, regular = set(), False
+        for path in project_sources():
+            text = path.read_text(encoding='utf-8')
+            used.update(ICON_CLASS_RE.findall(text))
+            regular = regular or bool(REGULAR_STYLE_RE.search(text))
+        unknown = used - set(icons) - set(ICON_FONTS)
+        if unknown:
+            self.stderr.write(f"Icônes absentes de Font Awesome Free, ignorées : {', '.join(sorted(unknown))}")
+        used &= set(icons)
+
+        # Style -> codes ; le style regular seulement si une page l'emploie
+        codepoints = {style: set() for style in ICON_FONTS}
+        for name in used:
+            unicode, styles = icons[name]
+            for style in styles:
+                if style in codepoints and (style != 'regular' or regular):
+                    codepoints[style].add(unicode)
+
+        css = [
+            f"/*! Font Awesome Free {version('fontawesomefree')} - https://fontawesome.com "
+            f"License - https://fontawesome.com/license/free (Fonts: SIL OFL 1.1, Code: MIT) */\n"
+        ]
+        for style, (family, weight, filename) in ICON_FONTS.items():
+            if not codepoints[style]:
+                continue
+            target = output / f'{filename}.woff2'
+            size = subset(fa_dir / 'webfonts' / f'{filename}.ttf', target, codepoints[style])
+            css.append(font_face(family, weight, target.name, 'block'))
+            self.stdout.write(f"{target.name} : {len(codepoints[style])} icônes, {size / 1024:.1f} Kio")
+        css.append(ICON_BASE_CSS)
+
+        by_code = {}
+        for name in sorted(used):
+            by_code.setdefault(icons[name][0], []).append(name)
+        for unicode, names in sorted(by_code.items()):
+            selectors = ','.join(f'.fa-{name}::before' for name in names)
+            css.append(f'{selectors}{{content:"\\{unicode:x}"}}\n')
+        return ''.join(css)
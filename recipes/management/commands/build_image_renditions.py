@@ -0,0 +1,71 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from recipes import images
+from recipes.models import Recipe
+
+
+def _init_worker():
+    # Nécessaire quand les processus sont lancés en mode "spawn" (macOS, Windows)
+    django.setup()
+
+
+def _render(recipe_id, image_name):
+    return recipe_id, images.generate_renditions(image_name)
+
+
+class Command(BaseCommand):
+    help = (
+        "Génère les déclinaisons (tailles, WebP/JPEG) des images de recettes nouvelles "
+        "ou modifiées (CronJob) ; les images illisibles sont notées et ignorées."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="Nombre de processus (défaut : nombre de cœurs).")
+        parser.add_argument('--force', action='store_true',
+                            help="Retraite aussi les images déjà déclinées.")
+
+    def handle(self, *args, **options):
+        pending = []
+        recipes = (
+            Recipe.objects.exclude(image='').exclude(image__isnull=True)
+            .only('image', 'image_renditions').order_by('pk')
+        )
+        for recipe in recipes.iterator(chunk_size=2000):
+            if options['force'] or images.needs_processing(recipe):
+                pending.append((recipe.pk, recipe.image.name, recipe.image_renditions))
+        if not pending:
+            self.stdout.write("Aucune image à traiter.")
+            return
+
+        previous = {pk: old for pk, _, old in pending}
+        names = {pk: name for pk, name, _ in pending}
+        # Les workers n'accèdent pas à la base : on ne partage pas les connexions ouvertes
+        connections.close_all()
+        started = time.monotonic()
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as pool:
+            futures = {pool.submit(_render, pk, name): pk for pk, name, _ in pending}
+            for future in as_completed(futures):
+                recipe_id = futures[future]
+                try:
+                    _, renditions = future.result()
+                    done += 1
+                except Exception as exc:  # image illisible, fichier manquant…
+                    failed += 1
+                    self.stderr.write(f"Recette {recipe_id} : {exc}")
+                    renditions = images.failed_renditions(names[recipe_id], exc)
+                images.store_renditions(recipe_id, renditions)
+                images.delete_stale_renditions(previous[recipe_id], renditions)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{done} images traitées ({failed} échecs) en {elapsed:.1f}s "
+            f"avec {options['workers']} processus."
+        ))
@@ -0,0 +1,34 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.exporting import EXPORTS, FORMATS, export_stream, parse_since
+
+
+class Command(BaseCommand):
+    help = "Exporte recettes ou avis en NDJSON/CSV, en flux (mémoire constante), gzip optionnel."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--format', choices=sorted(FORMATS), default='ndjson')
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument('--since', help="Uniquement les lignes créées depuis (date ou datetime ISO).")
+        parser.add_argument('--output', '-o', default='-', help="Fichier de sortie ('-' : stdout).")
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_since(options['since'])
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        chunks = export_stream(options['kind'], options['format'], since, options['gzip'])
+        if options['output'] == '-':
+            out = sys.stdout.buffer
+            for chunk in chunks:
+                out.write(chunk)
+            out.flush()
+            return
+        with open(options['output'], 'wb') as out:
+            for chunk in chunks:
+                out.write(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Export écrit dans {options['output']}."))
@@ -0,0 +1,54 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from recipes import dedup
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = (
+        "Regroupe les recettes quasi identiques du catalogue à partir de l'index LSH "
+        "(signatures MinHash du titre et de la description)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=float, default=dedup.THRESHOLD,
+                            help="Similarité de Jaccard estimée minimale.")
+        parser.add_argument('--reindex', action='store_true',
+                            help="Recalcule d'abord les empreintes de toutes les recettes.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--output', help="Écrit les groupes dans un fichier JSON.")
+
+    def handle(self, *args, **options):
+        if options['reindex']:
+            self._reindex(options['batch_size'])
+
+        clusters = dedup.find_clusters(threshold=options['threshold'])
+        titles = {}
+        for start in range(0, sum(len(ids) for ids in clusters), options['batch_size']):
+            ids = [pk for cluster in clusters for pk in cluster][start:start + options['batch_size']]
+            titles.update(Recipe.objects.filter(pk__in=ids).values_list('pk', 'title'))
+        for cluster in clusters:
+            self.stdout.write(' | '.join(f"#{pk} {titles.get(pk, '?')}" for pk in cluster))
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                json.dump([[{'id': pk, 'title': titles.get(pk)} for pk in cluster] for cluster in clusters],
+                          fh, indent=2, ensure_ascii=False)
+                fh.write('\n')
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(clusters)} groupes de doublons, {sum(len(ids) for ids in clusters)} recettes."
+        ))
+
+    def _reindex(self, batch_size):
+        last_pk = 0
+        while True:
+            recipes = list(
+                Recipe.objects.filter(pk__gt=last_pk).order_by('pk')
+                .only('id', 'title', 'description')[:batch_size]
+            )
+            if not recipes:
+                break
+            dedup.index_recipes(recipes)
+            last_pk = recipes[-1].pk
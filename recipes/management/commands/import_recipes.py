@@ -0,0 +1,76 @@
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from recipes.importing import IMPORTERS, Checkpoint, open_source
+
+
+class Command(BaseCommand):
+    help = (
+        "Importe des recettes ou des avis depuis un fichier JSONL/CSV (ou `-` pour stdin), "
+        "par lots bulk_create transactionnels, avec reprise sur point de contrôle."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help="Chemin du fichier (.jsonl, .csv, éventuellement .gz) ou '-'.")
+        parser.add_argument('--kind', choices=sorted(IMPORTERS), default='recipes')
+        parser.add_argument('--format', choices=['jsonl', 'csv'],
+                            help="Format des lignes (déduit de l'extension par défaut).")
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--checkpoint', help="Fichier de reprise (lignes déjà importées).")
+        parser.add_argument('--on-conflict', choices=['ignore', 'update'], default='ignore',
+                            help="Avis déjà existants pour (recette, utilisateur).")
+        parser.add_argument('--max-errors', type=int, default=100,
+                            help="Nombre de lignes rejetées affichées au maximum.")
+
+    def handle(self, *args, **options):
+        source = options['source']
+        if source == '-' and not options['format']:
+            raise CommandError("--format est obligatoire pour lire depuis stdin.")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size doit être positif.")
+
+        importer = IMPORTERS[options['kind']]()
+        checkpoint = Checkpoint(options['checkpoint'], source, options['kind'])
+        done = checkpoint.load()
+
+        try:
+            stream, rows = open_source(source, options['format'])
+        except OSError as exc:
+            raise CommandError(exc)
+
+        with stream:
+            if done:
+                self.stdout.write(f"Reprise après {done} lignes déjà importées.")
+                for _ in islice(rows, done):
+                    pass
+
+            started = time.monotonic()
+            imported = rejected = 0
+            while True:
+                batch = list(islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                with transaction.atomic():
+                    objs, errors = importer.build(batch)
+                    importer.write(objs, options['on_conflict'])
+                done += len(batch)
+                checkpoint.save(done)
+
+                imported += len(objs)
+                for error in errors:
+                    if rejected < options['max_errors']:
+                        self.stderr.write(f"Ligne rejetée : {error}")
+                    rejected += 1
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"{done} lignes lues, {imported} importées, {rejected} rejetées "
+                    f"({imported / elapsed if elapsed else 0:.0f} lignes/s)"
+                )
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Import terminé : {imported} {options['kind']} en {elapsed:.1f}s, {rejected} rejetées."
+        ))
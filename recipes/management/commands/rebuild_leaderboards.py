@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from recipes import leaderboards
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule exactement les scores des classements (moyenne bayésienne, tendances) "
+        "à partir des avis, après avoir figé la moyenne globale actuelle et avancé la date "
+        "de référence des tendances. À planifier périodiquement (voir le CronJob du chart Helm)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        prior = leaderboards.refresh_prior()
+        # Scores de tendance exprimés à la date du jour : pas de débordement à long terme
+        leaderboards.rebase_trending()
+        batch_size = options['batch_size']
+        last_pk = 0
+        total = 0
+        while True:
+            ids = list(
+                Recipe.objects.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            total += leaderboards.rebuild(ids, prior=prior)
+            last_pk = ids[-1]
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} recettes reclassées (moyenne globale {prior:.3f})."
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = "Recalcule rating_sum / rating_count de toutes les recettes à partir des avis."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        total = 0
+        while True:
+            ids = list(
+                Recipe.objects.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                total += Recipe.objects.filter(pk__in=ids).refresh_rating_aggregates()
+            last_pk = ids[-1]
+        self.stdout.write(self.style.SUCCESS(f"{total} recettes recalculées."))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from recipes import stats
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule les statistiques d'avis (répartition des notes, avis récents) de toutes "
+        "les recettes, par lots, en requêtes ensemblistes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        total = 0
+        while True:
+            ids = list(
+                Recipe.objects.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            total += stats.rebuild(ids)
+            last_pk = ids[-1]
+        self.stdout.write(self.style.SUCCESS(f"{total} recettes recalculées."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from recipes import search
+
+
+class Command(BaseCommand):
+    help = "Reconstruit entièrement l'index plein texte (FTS5) des recettes."
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError("L'index de recherche FTS5 nécessite SQLite.")
+        with transaction.atomic():
+            total = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"{total} recettes indexées."))
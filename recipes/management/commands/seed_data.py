@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.benchmarking import DATA_SIZES, seed_database
+
+
+class Command(BaseCommand):
+    help = "Remplit la base avec un jeu de données réaliste et reproductible (graine fixe)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', choices=sorted(DATA_SIZES),
+                            help="Palier prédéfini (remplace --users/--recipes/--reviews).")
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--recipes', type=int, default=1_000)
+        parser.add_argument('--reviews', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['size']:
+            users, recipes, reviews = DATA_SIZES[options['size']]
+        else:
+            users, recipes, reviews = options['users'], options['recipes'], options['reviews']
+        if min(users, recipes) < 1 or reviews < 0:
+            raise CommandError("Il faut au moins un utilisateur et une recette.")
+        seed_database(users, recipes, reviews, seed=options['seed'], stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS("Jeu de données créé."))
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:50
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_rating_aggregates(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Review = apps.get_model('recipes', 'Review')
+    reviews = Review.objects.filter(recipe=OuterRef('pk')).order_by().values('recipe')
+    Recipe.objects.update(
+        rating_sum=Coalesce(Subquery(reviews.annotate(total=Sum('rating')).values('total')), 0),
+        rating_count=Coalesce(Subquery(reviews.annotate(total=Count('pk')).values('total')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS recipes_recipe_fts USING fts5("
+        "title, description, category, category_id UNINDEXED, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    schema_editor.execute(
+        "INSERT INTO recipes_recipe_fts (rowid, title, description, category, category_id) "
+        "SELECT r.id, r.title, r.description, COALESCE(c.name, ''), r.category_id "
+        "FROM recipes_recipe r LEFT JOIN recipes_category c ON c.id = r.category_id"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS recipes_recipe_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0002_recipe_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:32
+
+import datetime
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+RECENT_DAYS = 30
+
+
+def fill_recipe_stats(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Review = apps.get_model('recipes', 'Review')
+    RecipeStats = apps.get_model('recipes', 'RecipeStats')
+    today = timezone.localdate()
+    since = timezone.make_aware(
+        datetime.datetime.combine(today - datetime.timedelta(days=RECENT_DAYS - 1), datetime.time.min)
+    )
+    rows = {
+        pk: RecipeStats(recipe_id=pk, daily=[0] * RECENT_DAYS, window_end=today)
+        for pk in Recipe.objects.values_list('pk', flat=True)
+    }
+    counts = Review.objects.order_by().values('recipe').annotate(
+        **{f'stars_{n}': Count('pk', filter=Q(rating=n)) for n in range(1, 6)}
+    )
+    for row in counts:
+        stats = rows[row.pop('recipe')]
+        for field, value in row.items():
+            setattr(stats, field, value)
+    recent = (
+        Review.objects.order_by().filter(created_at__gte=since).annotate(day=TruncDate('created_at'))
+        .values('recipe', 'day').annotate(n=Count('pk'))
+    )
+    for row in recent:
+        index = RECENT_DAYS - 1 - (today - row['day']).days
+        if 0 <= index < RECENT_DAYS:
+            rows[row['recipe']].daily[index] = row['n']
+    RecipeStats.objects.bulk_create(rows.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeStats',
+            fields=[
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='recipes.recipe')),
+                ('stars_1', models.PositiveIntegerField(default=0)),
+                ('stars_2', models.PositiveIntegerField(default=0)),
+                ('stars_3', models.PositiveIntegerField(default=0)),
+                ('stars_4', models.PositiveIntegerField(default=0)),
+                ('stars_5', models.PositiveIntegerField(default=0)),
+                ('daily', models.JSONField(default=list)),
+                ('window_end', models.DateField(default=django.utils.timezone.localdate)),
+            ],
+            options={
+                'verbose_name_plural': 'Recipe stats',
+            },
+        ),
+        migrations.RunPython(fill_recipe_stats, migrations.RunPython.noop),
+    ]
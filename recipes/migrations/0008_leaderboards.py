@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:38
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, FloatField, Func, Sum, Value
+from django.db.models.functions import Power
+from django.utils import timezone
+
+PRIOR_WEIGHT = 10
+HALF_LIFE_DAYS = 3.5
+TRENDING_EPOCH = '2026-01-01T00:00:00+00:00'
+
+
+def fill_recipe_scores(apps, schema_editor):
+    # Même calcul que recipes.leaderboards.refresh_prior() puis rebuild()
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Review = apps.get_model('recipes', 'Review')
+    LeaderboardState = apps.get_model('recipes', 'LeaderboardState')
+    RecipeScore = apps.get_model('recipes', 'RecipeScore')
+    mean = Review.objects.aggregate(total=Sum('rating'), count=Count('pk'))
+    prior = mean['total'] / mean['count'] if mean['count'] else 3.0
+    LeaderboardState.objects.create(pk=1, prior_mean=prior, rebuilt_at=timezone.now())
+
+    rows = {
+        pk: RecipeScore(recipe_id=pk, category_id=category_id)
+        for pk, category_id in Recipe.objects.values_list('pk', 'category_id')
+    }
+    age = (
+        Func(F('created_at'), function='julianday', output_field=FloatField())
+        - Func(Value(TRENDING_EPOCH), function='julianday', output_field=FloatField())
+    )
+    totals = Review.objects.order_by().values('recipe').annotate(
+        total=Sum('rating'), count=Count('pk'),
+        trending=Sum((F('rating') - 1) / 4.0 * Power(2.0, age / HALF_LIFE_DAYS), output_field=FloatField()),
+    )
+    for row in totals:
+        score = rows[row['recipe']]
+        score.bayesian = (row['total'] + PRIOR_WEIGHT * prior) / (row['count'] + PRIOR_WEIGHT)
+        score.trending = row['trending'] or 0.0
+    RecipeScore.objects.bulk_create(rows.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipe_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prior_mean', models.FloatField(default=3.0)),
+                ('rebuilt_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RecipeScore',
+            fields=[
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score', serialize=False, to='recipes.recipe')),
+                ('bayesian', models.FloatField(null=True)),
+                ('trending', models.FloatField(default=0)),
+                ('category', models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='recipes.category')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-bayesian', '-recipe'], name='score_bayesian_idx'), models.Index(fields=['category', '-bayesian', '-recipe'], name='score_category_bayesian_idx'), models.Index(fields=['-trending', '-recipe'], name='score_trending_idx'), models.Index(fields=['category', '-trending', '-recipe'], name='score_category_trending_idx')],
+            },
+        ),
+        migrations.RunPython(fill_recipe_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_leaderboards'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarityRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RecipeSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('recipe', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='similarities', to='recipes.recipe')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='recipes.recipe')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['recipe', '-score'], name='similarity_recipe_score_idx')],
+                'constraints': [models.UniqueConstraint(fields=('recipe', 'similar'), name='unique_recipe_similarity')],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:48
+
+import django.db.models.deletion
+from array import array
+
+from django.db import migrations, models
+
+
+def fill_fingerprints(apps, schema_editor):
+    # Fonctions pures de recipes.dedup (texte -> signature -> clés), modèles historiques
+    from recipes.dedup import band_keys, signature
+
+    Recipe = apps.get_model('recipes', 'Recipe')
+    RecipeFingerprint = apps.get_model('recipes', 'RecipeFingerprint')
+    RecipeLSHBucket = apps.get_model('recipes', 'RecipeLSHBucket')
+    fingerprints, buckets = [], []
+    for pk, title, description in Recipe.objects.values_list('pk', 'title', 'description').iterator():
+        sig = signature(title, description)
+        if sig is None:
+            continue
+        fingerprints.append(RecipeFingerprint(recipe_id=pk, signature=array('I', sig).tobytes()))
+        buckets.extend(RecipeLSHBucket(key=key, recipe_id=pk) for key in band_keys(sig))
+    RecipeFingerprint.objects.bulk_create(fingerprints, batch_size=500)
+    RecipeLSHBucket.objects.bulk_create(buckets, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_recipe_similarity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeFingerprint',
+            fields=[
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fingerprint', serialize=False, to='recipes.recipe')),
+                ('signature', models.BinaryField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RecipeLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField()),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='recipes.recipe')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['key', 'recipe'], name='lsh_bucket_key_idx')],
+            },
+        ),
+        migrations.RunPython(fill_fingerprints, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:34
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_recipe_fingerprints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leaderboardstate',
+            name='trending_epoch',
+            field=models.DateTimeField(default=datetime.datetime(2026, 1, 1, 0, 0, tzinfo=datetime.timezone.utc)),
+        ),
+    ]
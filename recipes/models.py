@@ -1,6 +1,11 @@
-from django.db import models
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import models, router, transaction
+from django.db.models import Case, Count, F, FloatField, OuterRef, Subquery, Sum, When
+from django.db.models.functions import Cast, Coalesce
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -13,38 +18,359 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+
+class Catalogue(models.Model):
+    # Ligne unique dont la version change à chaque modification visible dans la
+    # liste des recettes (ajout, édition, suppression, catégorie, image).
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    SINGLETON_ID = 1
+
+    @classmethod
+    def bump(cls):
+        updated = cls.objects.filter(pk=cls.SINGLETON_ID).update(
+            version=F('version') + 1, updated_at=timezone.now()
+        )
+        if not updated:
+            cls.objects.get_or_create(pk=cls.SINGLETON_ID)
+
+    @classmethod
+    def current(cls):
+        # (version, updated_at) ou None si la ligne n'existe pas encore
+        return cls.objects.filter(pk=cls.SINGLETON_ID).values_list('version', 'updated_at').first()
+
+
+class RecipeQuerySet(models.QuerySet):
+    def with_average_rating(self):
+        # Moyenne calculée en SQL à partir des agrégats stockés (tri / filtre possibles)
+        return self.annotate(avg_rating=Case(
+            When(rating_count=0, then=None),
+            default=Cast('rating_sum', FloatField()) / F('rating_count'),
+            output_field=FloatField(),
+        ))
+
+    def apply_rating_delta(self, sum_delta, count_delta):
+        # updated_at avance aussi : la page affiche les avis, son Last-Modified
+        # ne doit jamais reculer (avis le plus récent supprimé)
+        return self.update(
+            rating_sum=F('rating_sum') + sum_delta,
+            rating_count=F('rating_count') + count_delta,
+            updated_at=timezone.now(),
+        )
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # Sans signaux en bulk : index plein texte, empreintes anti-doublons et
+        # version du catalogue à la main
+        from . import dedup, search
+
+        with transaction.atomic(using=self.db, savepoint=False):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            if search.is_available():
+                search.index_recipes([obj.pk for obj in objs if obj.pk is not None])
+            dedup.index_recipes([obj for obj in objs if obj.pk is not None])
+            Catalogue.bump()
+        return objs
+
+    def refresh_rating_aggregates(self):
+        # Recalcule somme et nombre d'avis en une seule requête ensembliste
+        reviews = Review.objects.filter(recipe=OuterRef('pk')).order_by().values('recipe')
+        return self.update(
+            rating_sum=Coalesce(Subquery(reviews.annotate(total=Sum('rating')).values('total')), 0),
+            rating_count=Coalesce(Subquery(reviews.annotate(total=Count('pk')).values('total')), 0),
+        )
+
+
 class Recipe(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
-    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, related_name='recipes')
+    # Pas d'index simple : couvert par recipe_category_created_idx
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, related_name='recipes',
+                                 db_index=False)
     image = models.ImageField(upload_to='recipes/', blank=True, null=True)
+    # Déclinaisons redimensionnées de `image` (voir recipes.images)
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='recipes')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Agrégats des avis, tenus à jour par recipes.signals (voir aussi ReviewQuerySet)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = RecipeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Liste paginée par curseur (created_at, id)
+            models.Index(fields=['-created_at', '-id'], name='recipe_created_idx'),
+            # Liste filtrée par catégorie, même ordre
+            models.Index(fields=['category', '-created_at', '-id'], name='recipe_category_created_idx'),
+        ]
 
     def average_rating(self):
-        reviews = self.reviews.all()
-        if reviews.exists():
-            return round(sum(r.rating for r in reviews) / reviews.count(), 2)
+        if self.rating_count:
+            return round(self.rating_sum / self.rating_count, 2)
         return None
 
     def __str__(self):
         return self.title
 
+
+class ReviewQuerySet(models.QuerySet):
+    # Les chemins "bulk" ne déclenchent pas les signaux : on recalcule les agrégats
+    # et les statistiques des recettes touchées dans la même transaction.
+
+    def _touch_recipes(self, recipe_ids):
+        # update() ne touche pas updated_at (auto_now) : on fait avancer celui des
+        # recettes, que le Last-Modified de leurs pages suit
+        Recipe.objects.filter(pk__in=recipe_ids).update(updated_at=timezone.now())
+
+    def _refresh_recipes(self, recipe_ids):
+        from . import leaderboards, stats
+
+        Recipe.objects.filter(pk__in=recipe_ids).refresh_rating_aggregates()
+        self._touch_recipes(recipe_ids)
+        stats.rebuild(recipe_ids)
+        leaderboards.rebuild(recipe_ids)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic(using=self.db, savepoint=False):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            self._refresh_recipes({obj.recipe_id for obj in objs})
+        return objs
+
+    def bulk_upsert(self, objs, batch_size=None):
+        # Insère ou remplace les avis (recette, utilisateur) en INSERT ... ON CONFLICT
+        return self.bulk_create(
+            objs, batch_size=batch_size, update_conflicts=True,
+            unique_fields=['recipe', 'user'], update_fields=['rating', 'comment', 'updated_at'],
+        )
+
+    def upsert(self, recipe_id, user_id, rating, comment=''):
+        """
+        Crée ou remplace l'avis d'un utilisateur sur une recette, sans course
+        possible (double clic, second avis) : verrou sur la recette, un seul
+        INSERT ... ON CONFLICT DO UPDATE, puis delta appliqué aux agrégats.
+
+        Renvoie (avis, créé) ; lève Recipe.DoesNotExist si la recette n'existe pas.
+        """
+        from . import leaderboards, stats
+
+        with transaction.atomic(using=self.db):
+            # Une écriture d'abord, avant de lire l'avis précédent : elle prend le
+            # verrou (SQLite : verrou d'écriture, quel que soit transaction_mode ;
+            # ailleurs : verrou de la ligne) et sérialise les avis d'une recette.
+            # Un SELECT ... FOR UPDATE n'a pas d'effet sous SQLite.
+            if not Recipe.objects.using(self.db).filter(pk=recipe_id).update(updated_at=timezone.now()):
+                raise Recipe.DoesNotExist(f"Recette {recipe_id} introuvable.")
+            previous, created_at = (
+                self.filter(recipe_id=recipe_id, user_id=user_id)
+                .values_list('rating', 'created_at').first() or (None, None)
+            )
+            review = self.model(recipe_id=recipe_id, user_id=user_id, rating=rating, comment=comment)
+            # bulk_create parent : agrégats ajustés par delta, pas recalculés
+            super().bulk_create(
+                [review], update_conflicts=True, unique_fields=['recipe', 'user'],
+                update_fields=['rating', 'comment', 'updated_at'],
+            )
+            created = previous is None
+            delta = (rating, 1) if created else (rating - previous, 0)
+            if delta != (0, 0):
+                Recipe.objects.using(self.db).filter(pk=recipe_id).apply_rating_delta(*delta)
+            if created:
+                stats.review_added(review)
+                leaderboards.review_added(review)
+            else:
+                stats.rating_changed(recipe_id, previous, rating)
+                leaderboards.rating_changed(recipe_id, created_at, previous, rating)
+        review._stored_rating = (recipe_id, rating)
+        return review, created
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        objs = list(objs)
+        with transaction.atomic(using=self.db, savepoint=False):
+            recipe_ids = set(
+                self.filter(pk__in=[obj.pk for obj in objs]).values_list('recipe_id', flat=True)
+            )
+            rows = super().bulk_update(objs, fields, batch_size=batch_size)
+            recipe_ids.update(obj.recipe_id for obj in objs)
+            if {'rating', 'recipe', 'recipe_id'} & set(fields):
+                self._refresh_recipes(recipe_ids)
+            else:
+                self._touch_recipes(recipe_ids)
+        return rows
+
+    def update(self, **kwargs):
+        with transaction.atomic(using=self.db, savepoint=False):
+            recipe_ids = set(self.order_by().values_list('recipe_id', flat=True).distinct())
+            rows = super().update(**kwargs)
+            new_recipe = kwargs.get('recipe', kwargs.get('recipe_id'))
+            if new_recipe is not None:
+                recipe_ids.add(getattr(new_recipe, 'pk', new_recipe))
+            if {'rating', 'recipe', 'recipe_id'} & set(kwargs):
+                self._refresh_recipes(recipe_ids)
+            else:
+                self._touch_recipes(recipe_ids)
+        return rows
+
+
 class Review(models.Model):
-    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='reviews')
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reviews')
+    # Index simples remplacés par les index composites de Meta
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='reviews', db_index=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reviews', db_index=False)
     rating = models.PositiveSmallIntegerField(default=1)  # 1 à 5
     comment = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ReviewQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']
         unique_together = ('recipe', 'user')  # empêche double review par le même user
+        indexes = [
+            # Avis d'une recette, du plus récent au plus ancien (page détail)
+            models.Index(fields=['recipe', '-created_at', '-id'], name='review_recipe_created_idx'),
+            # Dernière modification d'avis d'une recette (validateurs ETag)
+            models.Index(fields=['recipe', '-updated_at'], name='review_recipe_updated_idx'),
+            # Avis d'un utilisateur
+            models.Index(fields=['user', '-created_at', '-id'], name='review_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.rating} ★ — {self.user}"
-    
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # État persisté, pour calculer le delta des agrégats lors d'une modification
+        instance._stored_rating = (instance.__dict__.get('recipe_id'), instance.__dict__.get('rating'))
+        return instance
+
+    def save(self, **kwargs):
+        # Avis et agrégats de la recette sont écrits dans la même transaction
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(**kwargs)
+        self._stored_rating = (self.recipe_id, self.rating)
+
     def clean(self):
         super().clean()
         if not (1 <= self.rating <= 5):
             raise ValidationError('Rating must be between 1 and 5')
+
+
+class RecipeStats(models.Model):
+    # Statistiques d'avis précalculées, une ligne par recette : lecture en O(1)
+    # sans GROUP BY. Tenues à jour par recipes.signals / ReviewQuerySet,
+    # reconstruites par `manage.py rebuild_recipe_stats` (voir recipes.stats).
+    recipe = models.OneToOneField(Recipe, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    stars_1 = models.PositiveIntegerField(default=0)
+    stars_2 = models.PositiveIntegerField(default=0)
+    stars_3 = models.PositiveIntegerField(default=0)
+    stars_4 = models.PositiveIntegerField(default=0)
+    stars_5 = models.PositiveIntegerField(default=0)
+    # Avis créés par jour sur la fenêtre glissante ; le dernier élément est `window_end`
+    daily = models.JSONField(default=list)
+    window_end = models.DateField(default=timezone.localdate)
+
+    class Meta:
+        verbose_name_plural = "Recipe stats"
+
+    def __str__(self):
+        return f"Stats — {self.recipe_id}"
+
+    @property
+    def histogram(self):
+        return [self.stars_1, self.stars_2, self.stars_3, self.stars_4, self.stars_5]
+
+    @property
+    def total(self):
+        return sum(self.histogram)
+
+
+class LeaderboardState(models.Model):
+    # Ligne unique : moyenne globale des notes (a priori de la moyenne bayésienne),
+    # figée à chaque reconstruction des classements (voir recipes.leaderboards)
+    prior_mean = models.FloatField(default=3.0)
+    rebuilt_at = models.DateTimeField(null=True, blank=True)
+    # Date de référence des scores de tendance, avancée à chaque reconstruction
+    trending_epoch = models.DateTimeField(default=datetime(2026, 1, 1, tzinfo=dt_timezone.utc))
+
+    SINGLETON_ID = 1
+
+
+class RecipeScore(models.Model):
+    # Scores de classement précalculés, mis à jour à chaque avis (recipes.leaderboards)
+    recipe = models.OneToOneField(Recipe, on_delete=models.CASCADE, primary_key=True, related_name='score')
+    # Copie de Recipe.category : classement par catégorie sur un seul index
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, related_name='+',
+                                 db_index=False)
+    # Moyenne bayésienne ; NULL tant que la recette n'a pas d'avis
+    bayesian = models.FloatField(null=True)
+    # Somme des poids des avis décroissant avec leur âge, exprimée à la date
+    # LeaderboardState.trending_epoch : l'ordre reste juste sans tout réécrire
+    trending = models.FloatField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-bayesian', '-recipe'], name='score_bayesian_idx'),
+            models.Index(fields=['category', '-bayesian', '-recipe'], name='score_category_bayesian_idx'),
+            models.Index(fields=['-trending', '-recipe'], name='score_trending_idx'),
+            models.Index(fields=['category', '-trending', '-recipe'], name='score_category_trending_idx'),
+        ]
+
+    def __str__(self):
+        return f"Score — {self.recipe_id}"
+
+
+class SimilarityRun(models.Model):
+    # Ligne unique : dernière exécution du calcul des recommandations
+    # (voir recipes.recommendations), point de départ du mode incrémental
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    SINGLETON_ID = 1
+
+
+class RecipeSimilarity(models.Model):
+    # k plus proches voisins d'une recette (« ont aussi aimé »), calculés hors ligne
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='similarities', db_index=False)
+    similar = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['recipe', 'similar'], name='unique_recipe_similarity'),
+        ]
+        indexes = [
+            # Voisins d'une recette, du plus proche au moins proche (page détail)
+            models.Index(fields=['recipe', '-score'], name='similarity_recipe_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.recipe_id} → {self.similar_id} ({self.score:.3f})"
+
+
+class RecipeFingerprint(models.Model):
+    # Signature MinHash du titre et de la description (recipes.dedup)
+    recipe = models.OneToOneField(Recipe, on_delete=models.CASCADE, primary_key=True, related_name='fingerprint')
+    signature = models.BinaryField()
+
+    def __str__(self):
+        return f"Empreinte — {self.recipe_id}"
+
+
+class RecipeLSHBucket(models.Model):
+    # Index LSH : une ligne par bande de la signature ; deux recettes qui partagent
+    # une clé sont candidates au doublon
+    key = models.BigIntegerField()
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['key', 'recipe'], name='lsh_bucket_key_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} — {self.recipe_id}"
@@ -0,0 +1,116 @@
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, pk):
+    payload = json.dumps([created_at.isoformat(), pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, TypeError, json.JSONDecodeError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def _keyset_slice(queryset, cursor, page_size):
+    queryset = queryset.order_by('-created_at', '-id')
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        # Équivalent de (created_at, id) < (c, pk) ; la borne created_at <= c
+        # garde un parcours d'index par intervalle malgré le OR.
+        queryset = queryset.filter(
+            Q(created_at__lte=created_at),
+            Q(created_at__lt=created_at) | Q(id__lt=pk),
+        )
+    return queryset[:page_size + 1]
+
+
+def _keyset_page(rows, page_size):
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.pk)
+    return KeysetPage(rows, next_cursor)
+
+
+def paginate_keyset(queryset, cursor=None, page_size=24):
+    """
+    Pagination par curseur sur (created_at, id), du plus récent au plus ancien.
+
+    Le coût d'une page ne dépend pas de sa profondeur : pas d'OFFSET, la page
+    suivante reprend strictement après le dernier élément servi.
+    """
+    return _keyset_page(list(_keyset_slice(queryset, cursor, page_size)), page_size)
+
+
+async def apaginate_keyset(queryset, cursor=None, page_size=24):
+    """Version async de paginate_keyset (ORM async)."""
+    rows = [row async for row in _keyset_slice(queryset, cursor, page_size)]
+    return _keyset_page(rows, page_size)
+
+
+def encode_score_cursor(score, pk):
+    payload = json.dumps([score, pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_score_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        score, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(score), int(pk)
+    except (ValueError, TypeError, json.JSONDecodeError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+
+def _ranked_slice(queryset, field, cursor, page_size):
+    queryset = queryset.order_by(f'-{field}', '-pk')
+    if cursor:
+        score, pk = decode_score_cursor(cursor)
+        queryset = queryset.filter(
+            Q(**{f'{field}__lte': score}),
+            Q(**{f'{field}__lt': score}) | Q(pk__lt=pk),
+        )
+    return queryset[:page_size + 1]
+
+
+def paginate_ranked(queryset, field, cursor=None, page_size=24):
+    """
+    Pagination par curseur sur (field, pk), du plus grand score au plus petit
+    (classements) ; même principe que paginate_keyset.
+    """
+    rows = list(_ranked_slice(queryset, field, cursor, page_size))
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_score_cursor(getattr(last, field), last.pk)
+    return KeysetPage(rows, next_cursor)
@@ -0,0 +1,167 @@
+"""
+Recommandations « ceux qui ont aimé cette recette ont aussi aimé », calculées
+hors ligne (`manage.py build_recommendations`) et stockées dans
+RecipeSimilarity ; la page détail les relit en une requête indexée.
+
+Similarité cosinus ajustée entre recettes : matrice creuse utilisateurs ×
+recettes des notes centrées sur la moyenne de chaque utilisateur, colonnes
+normalisées, puis produits matriciels par blocs de recettes (taille bornée
+par `memory_mb`). Seuls les couples notés par au moins `min_support`
+utilisateurs communs sont retenus.
+
+NumPy et SciPy ne sont nécessaires qu'au calcul (voir is_available()).
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import RecipeSimilarity, Review, SimilarityRun
+
+TOP_K = 20
+MIN_SUPPORT = 2
+MEMORY_MB = 256
+FETCH_SIZE = 100_000
+# Voisins affichés sur la page détail
+SHOWN = 6
+
+
+def is_available():
+    try:
+        import numpy  # noqa: F401
+        import scipy.sparse  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def similar_recipes(recipe_id, limit=SHOWN):
+    """Recettes les plus proches, de la plus similaire à la moins similaire."""
+    rows = (
+        RecipeSimilarity.objects.filter(recipe_id=recipe_id).select_related('similar')
+        .only('recipe_id', 'similar__id', 'similar__title', 'similar__image',
+              'similar__image_renditions')
+        .order_by('-score')[:limit]
+    )
+    return [row.similar for row in rows]
+
+
+def load_ratings(fetch_size=FETCH_SIZE):
+    """Avis sous forme de trois tableaux NumPy (utilisateurs, recettes, notes), lus par paquets."""
+    import numpy as np
+
+    users, recipes, ratings = [], [], []
+    sql, params = Review.objects.order_by().values_list('user_id', 'recipe_id', 'rating').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        while rows := cursor.fetchmany(fetch_size):
+            block = np.array(rows, dtype=np.int64)
+            users.append(block[:, 0])
+            recipes.append(block[:, 1])
+            ratings.append(block[:, 2].astype(np.float32))
+    if not users:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0, dtype=np.float32)
+    return np.concatenate(users), np.concatenate(recipes), np.concatenate(ratings)
+
+
+def build_matrices(users, recipes, ratings):
+    """
+    Renvoie (identifiants des recettes par colonne, notes centrées et
+    normalisées, présence 0/1), matrices creuses CSC utilisateurs × recettes.
+    """
+    import numpy as np
+    from scipy import sparse
+
+    user_ids, user_index = np.unique(users, return_inverse=True)
+    recipe_ids, recipe_index = np.unique(recipes, return_inverse=True)
+    shape = (len(user_ids), len(recipe_ids))
+
+    means = np.bincount(user_index, weights=ratings) / np.bincount(user_index)
+    centered = (ratings - means[user_index]).astype(np.float32)
+    matrix = sparse.csc_matrix((centered, (user_index, recipe_index)), shape=shape)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    norms[norms == 0] = 1.0
+    normalized = (matrix @ sparse.diags((1.0 / norms).astype(np.float32))).tocsc()
+    rated = sparse.csc_matrix((np.ones_like(centered), (user_index, recipe_index)), shape=shape)
+    return recipe_ids, normalized, rated
+
+
+def top_neighbours(normalized, rated, targets, k=TOP_K, min_support=MIN_SUPPORT, memory_mb=MEMORY_MB):
+    """
+    Pour les colonnes `targets`, par blocs : (colonnes du bloc, indices des k
+    voisins, similarités), triés par similarité décroissante.
+    """
+    import numpy as np
+
+    n_items = normalized.shape[1]
+    k = min(k, n_items - 1)
+    if k <= 0:
+        return
+    # Par élément du bloc dense : similarité (float32) puis, au plus, utilisateurs
+    # communs (float32) ou indices d'argpartition (int64), soit 12 octets
+    block_size = max(1, (memory_mb * 1024 * 1024) // (n_items * 12))
+    normalized_t = normalized.T.tocsr()
+    rated_t = rated.T.tocsr()
+    for start in range(0, len(targets), block_size):
+        block = targets[start:start + block_size]
+        scores = (normalized_t[block] @ normalized).toarray()
+        scores[(rated_t[block] @ rated).toarray() < min_support] = 0.0
+        scores[np.arange(len(block)), block] = 0.0
+        np.negative(scores, out=scores)
+        top = np.argpartition(scores, k - 1, axis=1)[:, :k]
+        top_scores = -np.take_along_axis(scores, top, axis=1)
+        del scores
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        yield block, np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+def _store(recipe_ids, block, neighbours, scores):
+    rows = [
+        RecipeSimilarity(recipe_id=int(recipe_ids[column]), similar_id=int(recipe_ids[neighbour]),
+                         score=float(score))
+        for column, row_neighbours, row_scores in zip(block, neighbours, scores)
+        for neighbour, score in zip(row_neighbours, row_scores)
+        if score > 0
+    ]
+    with transaction.atomic():
+        RecipeSimilarity.objects.filter(recipe_id__in=[int(recipe_ids[c]) for c in block]).delete()
+        RecipeSimilarity.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def build(full=False, k=TOP_K, min_support=MIN_SUPPORT, memory_mb=MEMORY_MB):
+    """
+    Recalcule les voisins : de toutes les recettes (full, ou première
+    exécution) ou seulement de celles dont un avis a été créé ou modifié
+    depuis le début de l'exécution précédente. Les suppressions d'avis, et
+    les listes des autres recettes où apparaît une recette modifiée, sont
+    rattrapées par l'exécution complète suivante.
+
+    Renvoie (recettes recalculées, voisins enregistrés).
+    """
+    import numpy as np
+
+    started_at = timezone.now()
+    state, _ = SimilarityRun.objects.get_or_create(pk=SimilarityRun.SINGLETON_ID)
+    since = None if full or state.finished_at is None else state.started_at
+
+    recipe_ids, normalized, rated = build_matrices(*load_ratings())
+    if since is None:
+        targets = np.arange(len(recipe_ids))
+        # Recettes sans avis : plus aucun voisin
+        RecipeSimilarity.objects.exclude(recipe__reviews__isnull=False).delete()
+    else:
+        changed = np.fromiter(
+            Review.objects.filter(updated_at__gte=since).order_by()
+            .values_list('recipe_id', flat=True).distinct(),
+            dtype=np.int64,
+        )
+        targets = np.flatnonzero(np.isin(recipe_ids, changed))
+
+    stored = 0
+    for block, neighbours, scores in top_neighbours(normalized, rated, targets, k, min_support, memory_mb):
+        stored += _store(recipe_ids, block, neighbours, scores)
+
+    state.started_at = started_at
+    state.finished_at = timezone.now()
+    state.save()
+    return len(targets), stored
@@ -0,0 +1,148 @@
+import re
+
+from django.core.files.storage import default_storage
+from django.db import connection
+
+FTS_TABLE = 'recipes_recipe_fts'
+
+# Poids BM25 par colonne : titre, description, catégorie
+BM25_WEIGHTS = (10.0, 1.0, 4.0)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+_SELECT_RECIPES = """
+    SELECT r.id, r.title, r.description, COALESCE(c.name, ''), r.category_id
+    FROM recipes_recipe r
+    LEFT JOIN recipes_category c ON c.id = r.category_id
+"""
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(text):
+    # Chaque mot devient un préfixe entre guillemets : aucune syntaxe FTS5 n'est
+    # interprétée depuis la saisie utilisateur.
+    tokens = _TOKEN_RE.findall(text or '')
+    return ' '.join(f'"{token}"*' for token in tokens[:16])
+
+
+def index_recipes(recipe_ids):
+    recipe_ids = list(recipe_ids)
+    if not recipe_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(recipe_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", recipe_ids)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, description, category, category_id) "
+            f"{_SELECT_RECIPES} WHERE r.id IN ({placeholders})",
+            recipe_ids,
+        )
+
+
+def remove_recipe(recipe_id):
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [recipe_id])
+
+
+def rename_category(category_id, name):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {FTS_TABLE} SET category = %s WHERE category_id = %s",
+            [name, category_id],
+        )
+
+
+def detach_category(category_id):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {FTS_TABLE} SET category = '', category_id = NULL WHERE category_id = %s",
+            [category_id],
+        )
+
+
+def rebuild_index():
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, description, category, category_id) "
+            f"{_SELECT_RECIPES}"
+        )
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+        cursor.execute(f"SELECT COUNT(*) FROM {FTS_TABLE}")
+        return cursor.fetchone()[0]
+
+
+class SearchResults:
+    def __init__(self, hits, facets, page, page_size, category_id=None):
+        self.hits = hits
+        self.facets = facets
+        self.page = page
+        self.page_size = page_size
+        self.category_id = category_id
+        self.total = sum(facet['count'] for facet in facets)
+
+    @property
+    def has_previous(self):
+        return self.page > 1
+
+    @property
+    def has_next(self):
+        return self.page * self.page_size < self.matched
+
+    @property
+    def matched(self):
+        # Nombre de résultats après filtre éventuel par catégorie
+        if self.category_id is None:
+            return self.total
+        return next((f['count'] for f in self.facets if f['id'] == self.category_id), 0)
+
+
+def search_recipes(text, category_id=None, page=1, page_size=20):
+    """
+    Recherche plein texte classée par BM25.
+
+    Les résultats de la page et les facettes par catégorie sont calculés sur le
+    même ensemble de correspondances, en une seule requête SQL.
+    """
+    match = build_match_query(text)
+    if not match:
+        return SearchResults([], [], page, page_size, category_id)
+
+    weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+    sql = f"""
+        WITH matches AS (
+            SELECT rowid AS id, category_id, bm25({FTS_TABLE}, {weights}) AS score
+            FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s
+        )
+        SELECT * FROM (
+            SELECT 'hit', m.id, m.score, r.title, r.image, c.name, m.category_id
+            FROM matches m
+            JOIN recipes_recipe r ON r.id = m.id
+            LEFT JOIN recipes_category c ON c.id = m.category_id
+            WHERE %s IS NULL OR m.category_id = %s
+            ORDER BY m.score, m.id
+            LIMIT %s OFFSET %s
+        )
+        UNION ALL
+        SELECT 'facet', f.category_id, f.n, NULL, NULL, c.name, f.category_id
+        FROM (SELECT category_id, COUNT(*) AS n FROM matches GROUP BY category_id) f
+        LEFT JOIN recipes_category c ON c.id = f.category_id
+    """
+    params = [match, category_id, category_id, page_size, (page - 1) * page_size]
+    hits, facets = [], []
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        for kind, pk, score, title, image, category, cat_id in cursor.fetchall():
+            if kind == 'hit':
+                hits.append({
+                    'id': pk, 'title': title,
+                    'image_url': default_storage.url(image) if image else None,
+                    'category': category, 'score': -score,
+                })
+            else:
+                facets.append({'id': cat_id, 'name': category, 'count': int(score)})
+    facets.sort(key=lambda f: (-f['count'], f['name'] or ''))
+    return SearchResults(hits, facets, page, page_size, category_id)
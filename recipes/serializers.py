@@ -0,0 +1,112 @@
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+from . import stats
+from .models import Category, Recipe, Review
+
+
+class SparseFieldsMixin:
+    """
+    Champs partiels via `?fields=a,b,c`.
+
+    `Meta.field_columns` associe chaque champ exposé aux colonnes SQL nécessaires,
+    pour que la vue ne charge que celles-ci (voir `columns_for`).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        wanted = self.requested_fields(self.context.get('request'))
+        if wanted:
+            for name in set(self.fields) - wanted:
+                self.fields.pop(name)
+
+    @classmethod
+    def requested_fields(cls, request):
+        if request is None or not request.query_params.get('fields'):
+            return None
+        wanted = {f.strip() for f in request.query_params['fields'].split(',') if f.strip()}
+        return (wanted & set(cls.Meta.fields)) or None
+
+    @classmethod
+    def columns_for(cls, request):
+        wanted = cls.requested_fields(request) or cls.Meta.fields
+        columns = {'id'}
+        for name in wanted:
+            columns.update(cls.Meta.field_columns.get(name, (name,)))
+        return sorted(columns)
+
+
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Category
+        fields = ['id', 'name']
+        field_columns = {}
+
+
+class RecipeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    category = CategorySerializer(read_only=True)
+    created_by = serializers.CharField(source='created_by.username', read_only=True)
+    image = serializers.SerializerMethodField()
+    images = serializers.SerializerMethodField()
+    average_rating = serializers.SerializerMethodField()
+    rating_histogram = serializers.SerializerMethodField()
+    recent_reviews = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Recipe
+        fields = [
+            'id', 'title', 'description', 'category', 'image', 'images',
+            'created_by', 'created_at', 'updated_at', 'average_rating', 'rating_count',
+            'rating_histogram', 'recent_reviews',
+        ]
+        field_columns = {
+            'category': ('category__name',),
+            'created_by': ('created_by__username',),
+            'images': ('image', 'image_renditions'),
+            'average_rating': ('rating_sum', 'rating_count'),
+            'rating_histogram': tuple(f'stats__stars_{n}' for n in stats.STARS),
+            'recent_reviews': ('stats__daily', 'stats__window_end'),
+        }
+
+    def get_image(self, obj):
+        return obj.image.url if obj.image else None
+
+    def get_images(self, obj):
+        renditions = obj.image_renditions or {}
+        if not obj.image or renditions.get('source') != obj.image.name:
+            return {}
+        return {
+            fmt: [{'width': width, 'url': default_storage.url(name)} for width, name in renditions[fmt]]
+            for fmt in ('webp', 'jpeg') if fmt in renditions
+        }
+
+    def get_average_rating(self, obj):
+        # Lu depuis les agrégats stockés : aucune requête sur les avis
+        return obj.average_rating()
+
+    def get_rating_histogram(self, obj):
+        # Statistiques précalculées jointes (recipes.stats) : nombre d'avis par note
+        return stats.summary(stats.for_recipe(obj))['histogram']
+
+    def get_recent_reviews(self, obj):
+        return stats.recent_count(stats.for_recipe(obj))
+
+
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    user = serializers.CharField(source='user.username', read_only=True)
+
+    class Meta:
+        model = Review
+        fields = ['id', 'recipe', 'user', 'rating', 'comment', 'created_at', 'updated_at']
+        field_columns = {
+            'recipe': ('recipe',),
+            'user': ('user__username',),
+        }
+
+
+class ReviewUpsertSerializer(serializers.Serializer):
+    # Élément de POST /reviews/bulk/ : identifiants bruts, existence vérifiée en lot par la vue
+    recipe = serializers.IntegerField(min_value=1)
+    user = serializers.IntegerField(min_value=1)
+    rating = serializers.IntegerField(min_value=1, max_value=5)
+    comment = serializers.CharField(allow_blank=True, required=False, default='')
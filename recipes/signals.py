@@ -0,0 +1,153 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import dedup, images, leaderboards, search, stats
+from .models import Catalogue, Category, Recipe, Review
+
+
+def _apply_delta(review, recipe_id, sum_delta, count_delta):
+    Recipe.objects.filter(pk=recipe_id).apply_rating_delta(sum_delta, count_delta)
+    # Garde la recette déjà chargée en mémoire cohérente avec la base
+    recipe_field = Review._meta.get_field('recipe')
+    if recipe_field.is_cached(review):
+        recipe = recipe_field.get_cached_value(review)
+        if recipe is not None and recipe.pk == recipe_id:
+            recipe.rating_sum += sum_delta
+            recipe.rating_count += count_delta
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        # loaddata : agrégats, statistiques et classements se reconstruisent avec
+        # `manage.py rebuild_ratings`, `rebuild_recipe_stats` et `rebuild_leaderboards`
+        return
+    if created:
+        _apply_delta(instance, instance.recipe_id, instance.rating, 1)
+        stats.review_added(instance)
+        leaderboards.review_added(instance)
+        return
+
+    old_recipe_id, old_rating = getattr(instance, '_stored_rating', (None, None))
+    if old_recipe_id is None or old_rating is None:
+        # Avis sauvegardé sans avoir été chargé depuis la base : on recalcule
+        Recipe.objects.filter(pk=instance.recipe_id).refresh_rating_aggregates()
+        stats.rebuild([instance.recipe_id])
+        leaderboards.rebuild([instance.recipe_id])
+    elif old_recipe_id == instance.recipe_id:
+        if old_rating != instance.rating:
+            _apply_delta(instance, instance.recipe_id, instance.rating - old_rating, 0)
+            stats.rating_changed(instance.recipe_id, old_rating, instance.rating)
+            leaderboards.rating_changed(instance.recipe_id, instance.created_at, old_rating, instance.rating)
+    else:
+        _apply_delta(instance, old_recipe_id, -old_rating, -1)
+        _apply_delta(instance, instance.recipe_id, instance.rating, 1)
+        stats.review_removed(instance, old_recipe_id, old_rating)
+        stats.review_added(instance)
+        leaderboards.review_removed(instance, old_recipe_id, old_rating)
+        leaderboards.review_added(instance)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    # Couvre aussi les suppressions en cascade (recette ou utilisateur supprimé)
+    recipe_id, rating = getattr(instance, '_stored_rating', (None, None))
+    if recipe_id is None or rating is None:
+        recipe_id, rating = instance.recipe_id, instance.rating
+    _apply_delta(instance, recipe_id, -rating, -1)
+    stats.review_removed(instance, recipe_id, rating)
+    leaderboards.review_removed(instance, recipe_id, rating)
+
+
+# --- Index plein texte (FTS5) ---
+
+@receiver(post_save, sender=Recipe)
+def index_recipe(sender, instance, raw, **kwargs):
+    if not raw and search.is_available():
+        search.index_recipes([instance.pk])
+
+
+@receiver(post_delete, sender=Recipe)
+def unindex_recipe(sender, instance, **kwargs):
+    if search.is_available():
+        search.remove_recipe(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+def reindex_category(sender, instance, created, raw, **kwargs):
+    if not created and not raw and search.is_available():
+        search.rename_category(instance.pk, instance.name)
+
+
+@receiver(post_delete, sender=Category)
+def unindex_category(sender, instance, **kwargs):
+    # Les recettes passent à category=NULL (SET_NULL) sans signal propre
+    if search.is_available():
+        search.detach_category(instance.pk)
+
+
+# --- Détection des doublons (MinHash / LSH) ---
+
+@receiver(post_save, sender=Recipe)
+def fingerprint_recipe(sender, instance, raw, update_fields=None, **kwargs):
+    if raw or (update_fields and not {'title', 'description'} & set(update_fields)):
+        return
+    dedup.index_recipes([instance])
+
+
+# --- Classements ---
+
+@receiver(post_save, sender=Recipe)
+def update_score_category(sender, instance, created, raw, **kwargs):
+    # Classement par catégorie : la copie de la catégorie suit la recette
+    if not created and not raw:
+        leaderboards.category_changed(instance)
+
+
+# --- Déclinaisons d'images ---
+
+@receiver(post_save, sender=Recipe)
+def schedule_image_renditions(sender, instance, raw, **kwargs):
+    # Nouvelle image : redimensionnement et encodage hors requête, par
+    # `manage.py build_image_renditions` (CronJob) ; l'image d'origine est servie
+    # d'ici là. Image retirée : anciennes déclinaisons supprimées après validation.
+    if not raw and not instance.image and images.needs_processing(instance):
+        recipe_id = instance.pk
+        transaction.on_commit(lambda: images.process_recipe_image(recipe_id), robust=True)
+
+
+@receiver(post_delete, sender=Recipe)
+def delete_image_renditions(sender, instance, **kwargs):
+    renditions = instance.image_renditions
+    if renditions:
+        transaction.on_commit(lambda: images.delete_stale_renditions(renditions, {}), robust=True)
+
+
+# --- Validateurs HTTP (ETag / Last-Modified) ---
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def bump_catalogue_on_recipe_change(sender, raw=False, **kwargs):
+    if not raw:
+        Catalogue.bump()
+
+
+@receiver(post_save, sender=Category)
+def touch_recipes_on_category_change(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    if created:
+        # Aucune recette touchée, mais la liste des catégories (en cache) change
+        Catalogue.bump()
+        return
+    # Le nom de catégorie est affiché dans les pages des recettes
+    instance.recipes.update(updated_at=timezone.now())
+    Catalogue.bump()
+
+
+@receiver(pre_delete, sender=Category)
+def touch_recipes_on_category_delete(sender, instance, **kwargs):
+    instance.recipes.update(updated_at=timezone.now())
+    Catalogue.bump()
@@ -0,0 +1,79 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Gestion du header au scroll
+    const landingHeader = document.getElementById('landingHeader');
+
+    if (landingHeader) {
+        window.addEventListener('scroll', function() {
+            if (window.scrollY > 50) {
+                landingHeader.classList.add('scrolled');
+            } else {
+                landingHeader.classList.remove('scrolled');
+            }
+        });
+    }
+
+    // Menu mobile pour landing page
+    const landingMenuBtn = document.getElementById('landingMenuBtn');
+    const landingNav = document.getElementById('landingNav');
+
+    if (landingMenuBtn && landingNav) {
+        landingMenuBtn.addEventListener('click', function() {
+            landingNav.classList.toggle('active');
+            landingMenuBtn.innerHTML = landingNav.classList.contains('active') 
+                ? '<i class="fas fa-times"></i>' 
+                : '<i class="fas fa-bars"></i>';
+        });
+
+        // Fermer le menu en cliquant à l'extérieur
+        document.addEventListener('click', function(event) {
+            if (window.innerWidth <= 768) {
+                if (!landingNav.contains(event.target) && !landingMenuBtn.contains(event.target)) {
+                    landingNav.classList.remove('active');
+                    landingMenuBtn.innerHTML = '<i class="fas fa-bars"></i>';
+                }
+            }
+        });
+    }
+
+    // Animation pour les statistiques
+    const statNumbers = document.querySelectorAll('.stat-number');
+
+    if (statNumbers.length > 0) {
+        statNumbers.forEach(stat => {
+            const target = parseInt(stat.textContent.replace('+', '').replace(',', ''));
+            let current = 0;
+            const increment = target / 50;
+            const timer = setInterval(() => {
+                current += increment;
+                if (current >= target) {
+                    current = target;
+                    clearInterval(timer);
+                }
+                stat.textContent = (stat.textContent.includes('+') ? '+' : '') + Math.floor(current).toLocaleString();
+            }, 30);
+        });
+    }
+
+    // Effet parallaxe léger
+    const landingContainer = document.querySelector('.landing-container');
+    if (landingContainer) {
+        window.addEventListener('scroll', function() {
+            const scrolled = window.pageYOffset;
+            landingContainer.style.backgroundPosition = `0% ${scrolled * 0.05}%`;
+        });
+    }
+
+    // Animation des boutons au survol
+    const buttons = document.querySelectorAll('.btn');
+    if (buttons.length > 0) {
+        buttons.forEach(button => {
+            button.addEventListener('mouseenter', function(e) {
+                const x = e.pageX - this.offsetLeft;
+                const y = e.pageY - this.offsetTop;
+
+                this.style.setProperty('--x', x + 'px');
+                this.style.setProperty('--y', y + 'px');
+            });
+        });
+    }
+});
@@ -0,0 +1,18 @@
+// « Voir plus d'avis » : ajoute la page suivante (fragment HTML) à la liste
+(function() {
+    const list = document.getElementById('reviewList');
+    list && list.addEventListener('click', function(event) {
+        const more = event.target.closest('#moreReviews');
+        if (!more) {
+            return;
+        }
+        event.preventDefault();
+        more.textContent = 'Chargement…';
+        fetch(more.href, {credentials: 'same-origin'})
+            .then(response => response.text())
+            .then(html => {
+                more.remove();
+                list.insertAdjacentHTML('beforeend', html);
+            });
+    });
+})();
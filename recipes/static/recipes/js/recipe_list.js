@@ -0,0 +1,31 @@
+// Défilement infini : charge la page suivante (même URL à curseur) et ajoute ses cartes
+(function() {
+    const grid = document.querySelector('.recipe-grid');
+    let next = document.getElementById('nextPage');
+    if (!grid || !next || !('IntersectionObserver' in window)) {
+        return;
+    }
+    let loading = false;
+    const observer = new IntersectionObserver(function(entries) {
+        if (!entries[0].isIntersecting || loading || !next) {
+            return;
+        }
+        loading = true;
+        fetch(next.href, {credentials: 'same-origin'})
+            .then(response => response.text())
+            .then(html => {
+                const doc = new DOMParser().parseFromString(html, 'text/html');
+                doc.querySelectorAll('.recipe-grid .recipe-card').forEach(card => grid.appendChild(card));
+                const following = doc.getElementById('nextPage');
+                if (following) {
+                    next.href = following.href;
+                } else {
+                    observer.disconnect();
+                    next.parentNode.remove();
+                    next = null;
+                }
+                loading = false;
+            });
+    });
+    observer.observe(next);
+})();
@@ -0,0 +1,151 @@
+"""
+Statistiques d'avis par recette (répartition 1 à 5 étoiles, avis récents),
+stockées dans RecipeStats.
+
+Écriture incrémentale à chaque création, modification ou suppression d'avis
+(recipes.signals, ReviewQuerySet) ; `rebuild()` recalcule un lot de recettes
+en deux agrégats GROUP BY et un INSERT ... ON CONFLICT. La lecture ne fait
+aucune requête : la fenêtre des avis récents est recalée sur la date du jour
+en Python.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Recipe, RecipeStats, Review
+
+RECENT_DAYS = 30
+STARS = range(1, 6)
+
+
+def _aligned(daily, window_end, today):
+    # Fenêtre décalée pour se terminer à `today` (jours écoulés à zéro)
+    daily = list(daily) or [0] * RECENT_DAYS
+    shift = (today - window_end).days
+    if shift <= 0:
+        return daily
+    if shift >= RECENT_DAYS:
+        return [0] * RECENT_DAYS
+    return daily[shift:] + [0] * shift
+
+
+def _review_day(review):
+    return timezone.localdate(review.created_at) if review.created_at else timezone.localdate()
+
+
+def for_recipe(recipe):
+    """Statistiques d'une recette chargée avec select_related('stats') ; vides si absentes."""
+    try:
+        return recipe.stats
+    except RecipeStats.DoesNotExist:
+        return RecipeStats(recipe_id=recipe.pk, daily=[0] * RECENT_DAYS)
+
+
+def recent_count(stats, today=None):
+    """Nombre d'avis créés sur les RECENT_DAYS derniers jours."""
+    return sum(_aligned(stats.daily, stats.window_end, today or timezone.localdate()))
+
+
+def summary(stats, today=None):
+    return {
+        'histogram': dict(zip((str(n) for n in STARS), stats.histogram)),
+        'count': stats.total,
+        'recent': recent_count(stats, today),
+    }
+
+
+def bars(stats):
+    # (étoiles, nombre, pourcentage) de 5 à 1, pour l'histogramme de la page détail
+    total = stats.total
+    return [
+        (n, count, round(100 * count / total) if total else 0)
+        for n, count in reversed(list(zip(STARS, stats.histogram)))
+    ]
+
+
+def record(recipe_id, changes):
+    """
+    Applique des changements [(note, jour de création ou None, +1/-1)] aux
+    statistiques d'une recette ; jour None : la répartition seule change.
+    """
+    with transaction.atomic(savepoint=False):
+        stats = RecipeStats.objects.select_for_update().filter(recipe_id=recipe_id).first()
+        if stats is None:
+            # Jamais calculées (nouvelle recette, fixtures) : recalcul complet,
+            # qui inclut déjà ces changements. Rien à faire pour un retrait
+            # (suppression en cascade de la recette).
+            if any(delta > 0 for _, _, delta in changes):
+                rebuild([recipe_id])
+            return
+        today = timezone.localdate()
+        daily = _aligned(stats.daily, stats.window_end, today)
+        for rating, day, delta in changes:
+            field = f'stars_{rating}'
+            setattr(stats, field, max(getattr(stats, field) + delta, 0))
+            if day is not None:
+                index = RECENT_DAYS - 1 - (today - day).days
+                if 0 <= index < RECENT_DAYS:
+                    daily[index] = max(daily[index] + delta, 0)
+        stats.daily = daily
+        stats.window_end = today
+        stats.save()
+
+
+def review_added(review):
+    record(review.recipe_id, [(review.rating, _review_day(review), 1)])
+
+
+def review_removed(review, recipe_id, rating):
+    record(recipe_id, [(rating, _review_day(review), -1)])
+
+
+def rating_changed(recipe_id, old_rating, new_rating):
+    if old_rating != new_rating:
+        record(recipe_id, [(old_rating, None, -1), (new_rating, None, 1)])
+
+
+def rebuild(recipe_ids=None, batch_size=500):
+    """
+    Recalcule les statistiques des recettes données (toutes si None) :
+    répartition des notes et avis par jour en deux requêtes GROUP BY, puis
+    écriture en INSERT ... ON CONFLICT DO UPDATE. Renvoie le nombre de recettes.
+    """
+    today = timezone.localdate()
+    since = timezone.make_aware(datetime.combine(today - timedelta(days=RECENT_DAYS - 1), time.min))
+    recipes = Recipe.objects.all()
+    reviews = Review.objects.order_by()
+    if recipe_ids is not None:
+        recipe_ids = list(recipe_ids)
+        recipes = recipes.filter(pk__in=recipe_ids)
+        reviews = reviews.filter(recipe_id__in=recipe_ids)
+
+    with transaction.atomic(savepoint=False):
+        rows = {
+            pk: RecipeStats(recipe_id=pk, daily=[0] * RECENT_DAYS, window_end=today)
+            for pk in recipes.values_list('pk', flat=True)
+        }
+        counts = reviews.values('recipe').annotate(
+            **{f'stars_{n}': Count('pk', filter=Q(rating=n)) for n in STARS}
+        )
+        for row in counts:
+            stats = rows.get(row.pop('recipe'))
+            if stats is not None:
+                for field, value in row.items():
+                    setattr(stats, field, value)
+        recent = (
+            reviews.filter(created_at__gte=since).annotate(day=TruncDate('created_at'))
+            .values('recipe', 'day').annotate(n=Count('pk'))
+        )
+        for row in recent:
+            stats = rows.get(row['recipe'])
+            index = RECENT_DAYS - 1 - (today - row['day']).days
+            if stats is not None and 0 <= index < RECENT_DAYS:
+                stats.daily[index] = row['n']
+        RecipeStats.objects.bulk_create(
+            rows.values(), batch_size=batch_size, update_conflicts=True, unique_fields=['recipe'],
+            update_fields=[*(f'stars_{n}' for n in STARS), 'daily', 'window_end'],
+        )
+    return len(rows)
@@ -0,0 +1,37 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+register = template.Library()
+
+
+def _srcset(renditions):
+    return ', '.join(f"{default_storage.url(name)} {width}w" for width, name in renditions)
+
+
+@register.simple_tag
+def recipe_image(recipe, sizes='100vw', css_class='', loading='lazy'):
+    """
+    <picture> WebP + JPEG avec srcset/sizes à partir de recipe.image_renditions.
+
+    Tant que les déclinaisons ne sont pas prêtes, retombe sur l'image d'origine.
+    """
+    renditions = recipe.image_renditions or {}
+    if not recipe.image:
+        return ''
+    if renditions.get('source') != recipe.image.name or not renditions.get('jpeg'):
+        return format_html(
+            '<img class="{}" src="{}" alt="{}" loading="{}" decoding="async">',
+            css_class, recipe.image.url, recipe.title, loading,
+        )
+    fallback = renditions['jpeg'][0][1]
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img class="{}" src="{}" srcset="{}" sizes="{}" width="{}" height="{}" '
+        'alt="{}" loading="{}" decoding="async">'
+        '</picture>',
+        _srcset(renditions['webp']), sizes,
+        css_class, default_storage.url(fallback), _srcset(renditions['jpeg']), sizes,
+        renditions['width'], renditions['height'], recipe.title, loading,
+    )
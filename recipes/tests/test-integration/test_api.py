@@ -0,0 +1,118 @@
+import pytest
+from django.urls import reverse
+from recipes.models import Category, Recipe, Review
+
+
+#-----------------------------------------------------------------------------
+#---Tests de l'API JSON en lecture (/api/v1/)
+#-----------------------------------------------------------------------------
+
+@pytest.fixture
+def catalogue(django_user_model):
+    user = django_user_model.objects.create_user(username='api', password='pass123')
+    reviewers = [django_user_model.objects.create_user(username=f'r{i}') for i in range(3)]
+    category = Category.objects.create(name='Desserts')
+    recipes = [
+        Recipe.objects.create(title=f'Recette {i}', description='Longue description', category=category, created_by=user)
+        for i in range(30)
+    ]
+    for reviewer in reviewers:
+        Review.objects.bulk_create([Review(recipe=r, user=reviewer, rating=4) for r in recipes])
+    return user, recipes
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('page_size', [5, 25])
+def test_api_recipe_list_fixed_query_count(client, catalogue, django_assert_num_queries, page_size):
+    client.login(username='api', password='pass123')
+    url = reverse('api-v1:recipe-list')
+    # session + utilisateur + page de recettes (catégorie et auteur joints)
+    with django_assert_num_queries(3):
+        response = client.get(url, {'page_size': page_size})
+    data = response.json()
+    assert len(data['results']) == page_size
+    assert data['results'][0]['average_rating'] == 4.0
+    assert data['results'][0]['category'] == {'id': catalogue[1][0].category_id, 'name': 'Desserts'}
+    # Statistiques jointes dans la même requête
+    assert data['results'][0]['rating_histogram'] == {'1': 0, '2': 0, '3': 0, '4': 3, '5': 0}
+    assert data['results'][0]['recent_reviews'] == 3
+
+    response = client.get(data['next'])
+    assert len(response.json()['results']) == min(page_size, 30 - page_size)
+
+
+@pytest.mark.django_db
+def test_api_sparse_fields_and_batch(client, catalogue, django_assert_num_queries):
+    _, recipes = catalogue
+    client.login(username='api', password='pass123')
+
+    response = client.get(reverse('api-v1:recipe-list'), {'fields': 'id,title'})
+    assert set(response.json()['results'][0]) == {'id', 'title'}
+
+    ids = f'{recipes[3].id},{recipes[1].id},999999'
+    with django_assert_num_queries(3):
+        response = client.get(reverse('api-v1:recipe-batch'), {'ids': ids, 'fields': 'id'})
+    assert response.json() == [{'id': recipes[3].id}, {'id': recipes[1].id}]
+
+
+@pytest.mark.django_db
+def test_api_reviews_by_recipe(client, catalogue, django_assert_num_queries):
+    _, recipes = catalogue
+    client.login(username='api', password='pass123')
+    with django_assert_num_queries(3):
+        response = client.get(reverse('api-v1:review-list'), {'recipe': recipes[0].id})
+    reviews = response.json()['results']
+    assert len(reviews) == 3
+    assert {r['user'] for r in reviews} == {'r0', 'r1', 'r2'}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name, param', [
+    ('api-v1:recipe-list', 'category'),
+    ('api-v1:review-list', 'recipe'),
+    ('api-v1:review-list', 'user'),
+    ('api-v1:recipe-batch', 'ids'),
+])
+@pytest.mark.parametrize('value', ['abc', '9' * 20, '0'])
+def test_api_rejects_invalid_id_filters(client, catalogue, url_name, param, value):
+    client.login(username='api', password='pass123')
+    response = client.get(reverse(url_name), {param: value})
+    assert response.status_code == 400
+    assert param in response.json()
+
+
+@pytest.mark.django_db
+def test_api_requires_authentication(client):
+    assert client.get(reverse('api-v1:category-list')).status_code == 403
+
+
+@pytest.mark.django_db
+def test_api_bulk_review_upsert(client, catalogue, django_user_model):
+    admin = django_user_model.objects.create_superuser('admin', 'admin@example.com', 'pass123')
+    reader, recipes = catalogue
+    recipe = recipes[0]
+    url = reverse('api-v1:review-bulk')
+    payload = [
+        {'recipe': recipe.pk, 'user': admin.pk, 'rating': 2},
+        {'recipe': recipe.pk, 'user': admin.pk, 'rating': 5, 'comment': 'Finalement top'},
+        {'recipe': recipe.pk, 'user': reader.pk, 'rating': 1},
+    ]
+
+    client.force_login(reader)
+    assert client.post(url, payload, content_type='application/json').status_code == 403
+
+    client.force_login(admin)
+    response = client.post(url, payload, content_type='application/json')
+    assert response.status_code == 200
+    assert response.json() == {'received': 3, 'applied': 2, 'recipes': 1}
+    assert Review.objects.get(recipe=recipe, user=admin).comment == 'Finalement top'
+
+    # Rejouer le lot met à jour sans dupliquer ; agrégats recalculés
+    client.post(url, payload[:1], content_type='application/json')
+    recipe.refresh_from_db()
+    expected = Review.objects.filter(recipe=recipe)
+    assert recipe.rating_count == expected.count()
+    assert recipe.rating_sum == sum(expected.values_list('rating', flat=True))
+
+    bad = [{'recipe': recipe.pk, 'user': 999_999, 'rating': 3}]
+    assert client.post(url, bad, content_type='application/json').status_code == 400
@@ -0,0 +1,68 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.http import Http404
+from django.test import AsyncRequestFactory
+from recipes import async_views
+from recipes.models import Recipe, Review
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(username='user', password='pass123')
+
+
+def call(view, request, user, **kwargs):
+    async def auser():
+        return user
+    request.user = user
+    request.auser = auser
+    return async_to_sync(view)(request, **kwargs)
+
+
+@pytest.mark.django_db
+def test_async_recipe_list_and_conditional_get(user):
+    Recipe.objects.create(title='Tarte async', description='x', created_by=user)
+    factory = AsyncRequestFactory()
+
+    response = call(async_views.recipe_list, factory.get('/recipes/'), user)
+    assert response.status_code == 200
+    assert 'Tarte async' in response.content.decode()
+
+    again = factory.get('/recipes/', headers={'if-none-match': response['ETag']})
+    assert call(async_views.recipe_list, again, user).status_code == 304
+
+    bad = factory.get('/recipes/', {'cursor': 'nope'})
+    assert call(async_views.recipe_list, bad, user).status_code == 400
+
+
+@pytest.mark.django_db
+def test_async_recipe_detail(user):
+    recipe = Recipe.objects.create(title='Soupe', description='x', created_by=user)
+    Review.objects.create(recipe=recipe, user=user, rating=4, comment='Réconfortante')
+    factory = AsyncRequestFactory()
+
+    response = call(async_views.recipe_detail, factory.get('/'), user, id=recipe.id)
+    assert response.status_code == 200
+    assert 'Réconfortante' in response.content.decode()
+
+    with pytest.raises(Http404):
+        call(async_views.recipe_detail, factory.get('/'), user, id=recipe.id + 1)
+
+
+@pytest.mark.django_db
+def test_async_recipe_review(user):
+    recipe = Recipe.objects.create(title='Gratin', description='x', created_by=user)
+    request = AsyncRequestFactory().post('/', {'rating': 5, 'comment': 'Parfait'})
+
+    response = call(async_views.recipe_review, request, user, id=recipe.id)
+    assert response.status_code == 302
+    recipe.refresh_from_db()
+    assert (recipe.rating_count, recipe.rating_sum) == (1, 5)
@@ -0,0 +1,249 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from recipes.models import Category, Recipe, RecipeFingerprint, Review
+from recipes import search
+
+
+#-----------------------------------------------------------------------------
+#---Import en masse (commande import_recipes)
+#-----------------------------------------------------------------------------
+
+@pytest.mark.django_db
+def test_import_recipes_and_reviews(tmp_path, django_user_model):
+    django_user_model.objects.create_user(username='chef')
+    django_user_model.objects.create_user(username='fan')
+
+    recipes_file = tmp_path / 'recipes.jsonl'
+    recipes_file.write_text('\n'.join(json.dumps(row) for row in [
+        {'title': 'Couscous', 'description': 'Semoule', 'category': 'Plats', 'created_by': 'chef'},
+        {'title': 'Baklava', 'description': 'Miel', 'category': 'Desserts', 'created_by': 'chef'},
+        {'title': 'Orpheline', 'description': '', 'category': 'Plats', 'created_by': 'inconnu'},
+    ]), encoding='utf-8')
+    call_command('import_recipes', str(recipes_file), batch_size=2)
+
+    assert set(Recipe.objects.values_list('title', flat=True)) == {'Couscous', 'Baklava'}
+    assert set(Category.objects.values_list('name', flat=True)) == {'Plats', 'Desserts'}
+    assert [hit['title'] for hit in search.search_recipes('couscous').hits] == ['Couscous']
+
+    couscous = Recipe.objects.get(title='Couscous')
+    reviews_file = tmp_path / 'reviews.csv'
+    reviews_file.write_text(
+        'recipe,user,rating,comment\n'
+        f'{couscous.id},fan,5,"Parfait, vraiment"\n'
+        f'{couscous.id},chef,3,\n'
+        f'{couscous.id},fan,9,hors bornes\n',
+        encoding='utf-8',
+    )
+    call_command('import_recipes', str(reviews_file), kind='reviews')
+    couscous.refresh_from_db()
+    assert (couscous.rating_sum, couscous.rating_count) == (8, 2)
+    assert Review.objects.get(user__username='fan').comment == 'Parfait, vraiment'
+
+
+@pytest.mark.django_db
+def test_import_resumes_from_checkpoint(tmp_path, django_user_model):
+    django_user_model.objects.create_user(username='chef')
+    source = tmp_path / 'recipes.jsonl'
+    source.write_text('\n'.join(
+        json.dumps({'title': f'Recette {i}', 'created_by': 'chef'}) for i in range(5)
+    ), encoding='utf-8')
+    checkpoint = tmp_path / 'import.checkpoint'
+    checkpoint.write_text(json.dumps({'source': str(source), 'kind': 'recipes', 'rows': 3}))
+
+    call_command('import_recipes', str(source), checkpoint=str(checkpoint))
+
+    assert sorted(Recipe.objects.values_list('title', flat=True)) == ['Recette 3', 'Recette 4']
+    assert json.loads(checkpoint.read_text())['rows'] == 5
+
+
+@pytest.mark.django_db
+def test_import_rejects_malformed_rows_without_aborting(tmp_path, django_user_model):
+    django_user_model.objects.create_user(username='chef')
+    source = tmp_path / 'recipes.jsonl'
+    source.write_text('\n'.join([
+        json.dumps({'title': 'Couscous', 'created_by': 'chef'}),
+        '{"title": "Tronquée", ',
+        json.dumps(['pas', 'un', 'objet']),
+        json.dumps({'title': 42, 'created_by': 'chef'}),
+        json.dumps({'title': 'Liste', 'created_by': ['chef'], 'category': {'x': 1}}),
+        json.dumps({'title': 'Baklava', 'created_by': 'chef'}),
+    ]), encoding='utf-8')
+    err = io.StringIO()
+    call_command('import_recipes', str(source), stdout=io.StringIO(), stderr=err)
+
+    assert set(Recipe.objects.values_list('title', flat=True)) == {'Couscous', 'Baklava'}
+    assert err.getvalue().count('Ligne rejetée') == 4
+    assert 'JSON invalide' in err.getvalue() and 'objet JSON attendu' in err.getvalue()
+
+
+@pytest.mark.django_db
+def test_import_rejects_non_integral_numbers(tmp_path, django_user_model):
+    user = django_user_model.objects.create_user(username='fan')
+    recipe = Recipe.objects.create(title='Flan', description='x', created_by=user)
+    source = tmp_path / 'reviews.jsonl'
+    source.write_text('\n'.join(json.dumps(row) for row in [
+        {'recipe': recipe.pk, 'user': 'fan', 'rating': 3.7},
+        {'recipe': recipe.pk + 0.5, 'user': 'fan', 'rating': 4},
+        {'recipe': recipe.pk, 'user': 'fan', 'rating': True},
+        {'recipe': float(recipe.pk), 'user': 'fan', 'rating': 4.0},
+    ]), encoding='utf-8')
+    err = io.StringIO()
+    call_command('import_recipes', str(source), kind='reviews', stdout=io.StringIO(), stderr=err)
+
+    # 3.7 n'est pas tronqué en 3 : ligne rejetée ; 4.0 est bien un entier
+    assert err.getvalue().count('Ligne rejetée') == 3
+    assert list(Review.objects.values_list('rating', flat=True)) == [4]
+
+
+@pytest.mark.django_db
+def test_lookup_cache_keeps_whole_batch_after_eviction(django_user_model):
+    from recipes.importing import LookupCache
+
+    users = [django_user_model.objects.create_user(username=f'u{i}') for i in range(4)]
+    cache = LookupCache(django_user_model.objects.all(), 'username', max_size=3)
+    cache.resolve({'u0', 'u1'})
+    # u0 déjà connu, u2 et u3 dépassent la taille : le cache est vidé puis relu en entier
+    ids = cache.resolve({'u0', 'u2', 'u3'})
+    assert ids == {'u0': users[0].pk, 'u2': users[2].pk, 'u3': users[3].pk}
+
+
+#-----------------------------------------------------------------------------
+#---Export en flux (commande export_catalogue et vue staff)
+#-----------------------------------------------------------------------------
+
+@pytest.mark.django_db
+def test_export_catalogue_command(tmp_path, django_user_model):
+    import csv
+    import gzip
+
+    user = django_user_model.objects.create_user(username='chef')
+    category = Category.objects.create(name='Plats')
+    old = Recipe.objects.create(title='Ancienne', description='a', category=category, created_by=user)
+    Recipe.objects.filter(pk=old.pk).update(created_at='2020-01-01T00:00:00Z')
+    Recipe.objects.create(title='Nouvelle', description='Ligne 1\nLigne 2', category=category, created_by=user)
+
+    output = tmp_path / 'recipes.csv.gz'
+    call_command('export_catalogue', 'recipes', format='csv', gzip=True, output=str(output))
+    with gzip.open(output, 'rt', encoding='utf-8', newline='') as fh:
+        rows = list(csv.DictReader(fh))
+    assert [r['title'] for r in rows] == ['Ancienne', 'Nouvelle']
+    assert rows[1]['description'] == 'Ligne 1\nLigne 2'
+    assert rows[1]['category__name'] == 'Plats'
+
+    output = tmp_path / 'recipes.ndjson'
+    call_command('export_catalogue', 'recipes', since='2024-01-01', output=str(output))
+    lines = output.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['title'] for line in lines] == ['Nouvelle']
+
+
+@pytest.mark.django_db
+def test_export_view_is_staff_only_and_streams(client, django_user_model):
+    from django.urls import reverse
+
+    user = django_user_model.objects.create_user(username='user', password='pass123')
+    Review.objects.create(
+        recipe=Recipe.objects.create(title='Tarte', description='x', created_by=user),
+        user=user, rating=5,
+    )
+    url = reverse('recipes:catalogue_export', args=['reviews'])
+
+    client.login(username='user', password='pass123')
+    assert client.get(url).status_code == 302
+
+    django_user_model.objects.create_user(username='staff', password='pass123', is_staff=True)
+    client.login(username='staff', password='pass123')
+    response = client.get(url)
+    assert response.streaming
+    rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+    assert rows[0]['rating'] == 5
+
+
+@pytest.mark.django_db
+def test_export_view_streams_asynchronously_under_asgi(django_user_model):
+    import gzip
+
+    from asgiref.sync import async_to_sync
+    from django.test import AsyncRequestFactory
+    from recipes import views
+
+    user = django_user_model.objects.create_user(username='staff', is_staff=True)
+    recipe = Recipe.objects.create(title='Tarte', description='x', created_by=user)
+    Review.objects.bulk_create([
+        Review(recipe=recipe, user=django_user_model.objects.create_user(username=f'u{i}'), rating=4)
+        for i in range(50)
+    ])
+    request = AsyncRequestFactory().get('/', {'gzip': '1'})
+    request.user = user
+    response = views.catalogue_export(request, 'reviews')
+    # Itérateur async : Django l'envoie bloc par bloc sans tout charger
+    assert response.is_async
+
+    async def consume():
+        return [chunk async for chunk in response.streaming_content]
+
+    lines = gzip.decompress(b''.join(async_to_sync(consume)())).splitlines()
+    assert len(lines) == 50 and json.loads(lines[0])['rating'] == 4
+
+
+#-----------------------------------------------------------------------------
+#---Recommandations (commande build_recommendations)
+#-----------------------------------------------------------------------------
+
+@pytest.mark.django_db
+def test_build_recommendations_full_then_incremental(client, django_user_model, django_assert_max_num_queries):
+    pytest.importorskip('scipy')
+    from recipes.models import RecipeSimilarity
+
+    chef = django_user_model.objects.create_user(username='chef')
+    sweet = [Recipe.objects.create(title=f'Dessert {i}', description='x', created_by=chef) for i in range(3)]
+    salty = [Recipe.objects.create(title=f'Plat {i}', description='x', created_by=chef) for i in range(2)]
+    fans = [django_user_model.objects.create_user(username=f'fan{i}') for i in range(6)]
+    # Les trois premiers adorent les desserts et boudent les plats, les autres l'inverse
+    Review.objects.bulk_create([
+        Review(recipe=recipe, user=fan, rating=(5 if (i < 3) == (recipe in sweet) else 1))
+        for i, fan in enumerate(fans) for recipe in sweet + salty
+    ])
+
+    call_command('build_recommendations', min_support=2)
+    neighbours = list(
+        RecipeSimilarity.objects.filter(recipe=sweet[0]).order_by('-score').values_list('similar_id', flat=True)
+    )
+    assert neighbours == [sweet[1].pk, sweet[2].pk]
+    assert not RecipeSimilarity.objects.filter(recipe=sweet[0], similar__in=salty).exists()
+
+    # Page détail : voisins lus en une requête indexée
+    with django_assert_max_num_queries(4):
+        response = client.get(f'/{sweet[0].pk}/')
+    assert [r.pk for r in response.context['recipe'].similar_recipes] == neighbours
+
+    # Incrémental : seule la recette dont un avis a changé est recalculée
+    review = Review.objects.get(recipe=salty[1], user=fans[0])
+    review.rating = 5
+    review.save()
+    out = io.StringIO()
+    call_command('build_recommendations', stdout=out)
+    assert out.getvalue().startswith('1 recettes recalculées')
+
+
+@pytest.mark.django_db
+def test_find_duplicate_recipes_groups_near_copies(tmp_path, django_user_model):
+    chef = django_user_model.objects.create_user(username='chef')
+    text = ("Faire revenir les oignons dans le beurre, ajouter le riz arborio, mouiller au "
+            "bouillon louche après louche puis finir au parmesan.")
+    copies = Recipe.objects.bulk_create([
+        Recipe(title='Risotto', description=text, created_by=chef),
+        Recipe(title='Risotto crémeux', description=text + ' Servir aussitôt.', created_by=chef),
+        Recipe(title='Gratin', description='Pommes de terre, crème et muscade au four.', created_by=chef),
+    ])
+    # bulk_create indexe aussi les recettes importées
+    assert RecipeFingerprint.objects.count() == 3
+
+    output = tmp_path / 'doublons.json'
+    out = io.StringIO()
+    call_command('find_duplicate_recipes', reindex=True, output=str(output), stdout=out)
+    assert '1 groupes de doublons, 2 recettes.' in out.getvalue()
+    groups = json.loads(output.read_text(encoding='utf-8'))
+    assert [[row['id'] for row in group] for group in groups] == [[copies[0].pk, copies[1].pk]]
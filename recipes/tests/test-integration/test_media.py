@@ -0,0 +1,142 @@
+import os
+
+import pytest
+from YummyBox_core.media import FileRange, parse_range
+
+DATA = bytes(range(256)) * 4  # 1024 octets
+
+
+@pytest.fixture
+def media(tmp_path, settings):
+    settings.MEDIA_ROOT = tmp_path
+    (tmp_path / 'recipes' / 'renditions').mkdir(parents=True)
+    (tmp_path / 'recipes' / 'tarte.jpg').write_bytes(DATA)
+    (tmp_path / 'recipes' / 'renditions' / 'tarte.320w.0123456789ab.webp').write_bytes(DATA)
+    (tmp_path / 'recipes' / 'envoi.0123456789ab.jpg').write_bytes(DATA)
+    return tmp_path
+
+
+def body(response):
+    try:
+        return b''.join(response.streaming_content)
+    finally:
+        response.close()
+
+
+@pytest.mark.django_db
+def test_media_full_response_and_conditional_get(client, media):
+    response = client.get('/media/recipes/tarte.jpg')
+    assert response.status_code == 200
+    assert body(response) == DATA
+    assert response['Content-Type'] == 'image/jpeg'
+    assert response['Content-Length'] == str(len(DATA))
+    assert response['Accept-Ranges'] == 'bytes'
+    assert 'max-age=3600' in response['Cache-Control'] and 'immutable' not in response['Cache-Control']
+    etag, last_modified = response['ETag'], response['Last-Modified']
+
+    # Revalidation : 304 sans ouvrir le fichier, validateurs répétés
+    response = client.get('/media/recipes/tarte.jpg', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+    response = client.get('/media/recipes/tarte.jpg', HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 304
+
+    # Nom avec empreinte du contenu : cache d'un an, immutable
+    response = client.get('/media/recipes/renditions/tarte.320w.0123456789ab.webp')
+    body(response)
+    assert 'immutable' in response['Cache-Control'] and 'max-age=31536000' in response['Cache-Control']
+    # Envoi dont le nom imite une empreinte, hors des déclinaisons : cache court
+    response = client.get('/media/recipes/envoi.0123456789ab.jpg')
+    body(response)
+    assert 'immutable' not in response['Cache-Control'] and 'max-age=3600' in response['Cache-Control']
+
+    response = client.head('/media/recipes/tarte.jpg')
+    assert response.status_code == 200 and response['Content-Length'] == str(len(DATA))
+
+
+@pytest.mark.django_db
+def test_media_byte_ranges(client, media):
+    response = client.get('/media/recipes/tarte.jpg', HTTP_RANGE='bytes=10-19')
+    assert response.status_code == 206
+    assert body(response) == DATA[10:20]
+    assert response['Content-Range'] == f'bytes 10-19/{len(DATA)}'
+    assert response['Content-Length'] == '10'
+
+    response = client.get('/media/recipes/tarte.jpg', HTTP_RANGE='bytes=-100')
+    assert body(response) == DATA[-100:]
+    response = client.get('/media/recipes/tarte.jpg', HTTP_RANGE='bytes=1000-')
+    assert body(response) == DATA[1000:]
+
+    response = client.get('/media/recipes/tarte.jpg', HTTP_RANGE='bytes=5000-')
+    assert response.status_code == 416
+    assert response['Content-Range'] == f'bytes */{len(DATA)}'
+
+    # Plusieurs intervalles, ou If-Range d'une autre version : fichier complet
+    response = client.get('/media/recipes/tarte.jpg', HTTP_RANGE='bytes=0-1,5-6')
+    assert response.status_code == 200 and body(response) == DATA
+    response = client.get('/media/recipes/tarte.jpg', HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"ancienne"')
+    assert response.status_code == 200 and body(response) == DATA
+    etag = client.head('/media/recipes/tarte.jpg')['ETag']
+    response = client.get('/media/recipes/tarte.jpg', HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag)
+    assert response.status_code == 206 and body(response) == DATA[:10]
+
+
+@pytest.mark.django_db
+def test_media_offload_to_proxy(client, media, settings):
+    settings.MEDIA_ACCEL = 'nginx'
+    response = client.get('/media/recipes/tarte.jpg', HTTP_RANGE='bytes=0-9')
+    # Le proxy envoie le fichier et gère la plage
+    assert response.status_code == 200
+    assert response['X-Accel-Redirect'] == '/protected-media/recipes/tarte.jpg'
+    assert response.content == b''
+    assert response['ETag']
+
+    settings.MEDIA_ACCEL = 'sendfile'
+    response = client.get('/media/recipes/tarte.jpg')
+    assert response['X-Sendfile'] == str(media / 'recipes' / 'tarte.jpg')
+
+
+@pytest.mark.parametrize('accel, ok', [('', False), ('nginx', True)])
+def test_asgi_mode_requires_media_accel(accel, ok):
+    import subprocess
+    import sys
+    from django.conf import settings
+
+    env = {**os.environ, 'SERVER_MODE': 'asgi', 'MEDIA_ACCEL': accel,
+           'DJANGO_SETTINGS_MODULE': 'YummyBox_core.settings'}
+    result = subprocess.run([sys.executable, '-c', 'import django; django.setup()'],
+                            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+    assert (result.returncode == 0) == ok, result.stderr
+    if not ok:
+        assert 'exige MEDIA_ACCEL' in result.stderr
+
+
+@pytest.mark.django_db
+def test_media_rejects_missing_files_and_traversal(client, media):
+    assert client.get('/media/recipes/absente.jpg').status_code == 404
+    assert client.get('/media/recipes/').status_code == 404
+    assert client.get('/media/recipes/%2E%2E/%2E%2E/secret.txt').status_code == 404
+    assert client.post('/media/recipes/tarte.jpg').status_code == 405
+
+
+def test_file_range_positions_descriptor_for_sendfile(tmp_path):
+    path = tmp_path / 'f.bin'
+    path.write_bytes(DATA)
+    with open(path, 'rb') as fh:
+        part = FileRange(fh, 100, 50)
+        # gunicorn lit la position du descripteur puis envoie Content-Length octets
+        assert os.lseek(part.fileno(), 0, os.SEEK_CUR) == 100
+        assert part.read(4096) == DATA[100:150]
+        assert part.read(4096) == b''
+
+
+def test_parse_range():
+    assert parse_range('bytes=0-0', 10) == (0, 1)
+    assert parse_range('bytes=5-100', 10) == (5, 5)
+    assert parse_range('bytes=-3', 10) == (7, 3)
+    assert parse_range('bytes=7-3', 10) is None
+    assert parse_range('items=0-1', 10) is None
+    with pytest.raises(ValueError):
+        parse_range('bytes=10-', 10)
+    with pytest.raises(ValueError):
+        parse_range('bytes=-0', 10)
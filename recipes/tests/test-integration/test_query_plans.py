@@ -0,0 +1,86 @@
+import re
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+from recipes import conditional, leaderboards, views
+from recipes.models import Review
+from recipes.pagination import _keyset_slice, _ranked_slice, encode_cursor, encode_score_cursor
+
+
+#-----------------------------------------------------------------------------
+#---Plans d'exécution des requêtes chaudes (EXPLAIN QUERY PLAN, SQLite)
+#-----------------------------------------------------------------------------
+
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+pytestmark = pytest.mark.skipif(connection.vendor != 'sqlite', reason="EXPLAIN QUERY PLAN propre à SQLite")
+
+
+def query_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def assert_indexed(queryset):
+    # Échoue sur un parcours complet de table ou un tri en B-tree temporaire
+    plan = query_plan(queryset)
+    problems = [step for step in plan if FULL_SCAN.match(step) or 'TEMP B-TREE' in step]
+    assert not problems, "\n".join(plan)
+
+
+# Requêtes construites par le code de production (vues, pagination), pas recopiées :
+# un index perdu par une modification de list_queryset() ou de la pagination
+# fait échouer ces tests.
+CURSOR = encode_cursor(timezone.now(), 1000)
+
+
+@pytest.mark.django_db
+def test_recipe_list_first_page_plan():
+    assert_indexed(_keyset_slice(views.list_queryset(), None, views.RECIPES_PER_PAGE))
+
+
+@pytest.mark.django_db
+def test_recipe_list_cursor_page_plan():
+    queryset = _keyset_slice(views.list_queryset(), CURSOR, views.RECIPES_PER_PAGE)
+    plan = query_plan(queryset)
+    assert any('recipe_created_idx' in step for step in plan), "\n".join(plan)
+    assert_indexed(queryset)
+
+
+@pytest.mark.django_db
+def test_recipe_list_by_category_plan():
+    assert_indexed(_keyset_slice(views.list_queryset().filter(category_id=1), None, views.RECIPES_PER_PAGE))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('cursor', [None, CURSOR])
+def test_recipe_detail_reviews_plan(cursor):
+    assert_indexed(_keyset_slice(views.review_queryset(1), cursor, views.REVIEWS_PER_PAGE))
+
+
+@pytest.mark.django_db
+def test_reviews_by_user_plan():
+    assert_indexed(Review.objects.filter(user_id=1).order_by('-created_at', '-id')[:50])
+
+
+@pytest.mark.django_db
+def test_recipe_detail_validators_plan():
+    queryset = conditional.detail_validators_queryset(1)
+    plan = query_plan(queryset)
+    assert any('review_recipe_updated_idx' in step for step in plan), "\n".join(plan)
+    assert_indexed(queryset)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('board', ['top', 'trending'])
+@pytest.mark.parametrize('category_id', [None, 1])
+@pytest.mark.parametrize('cursor', [None, encode_score_cursor(0.5, 1000)])
+def test_leaderboard_page_plan(board, category_id, cursor):
+    queryset = _ranked_slice(leaderboards.board_queryset(board, category_id),
+                             leaderboards.BOARDS[board], cursor, views.RECIPES_PER_PAGE)
+    plan = query_plan(queryset)
+    assert any('score_' in step for step in plan), "\n".join(plan)
+    assert_indexed(queryset)
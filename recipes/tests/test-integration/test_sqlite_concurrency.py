@@ -0,0 +1,177 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from django.conf import settings as django_settings
+from django.db import connections, transaction
+
+ALIAS = 'sqlite_file'
+
+
+@pytest.fixture
+def file_db(tmp_path, settings, django_db_blocker):
+    # Même configuration que la base de production, sur un fichier temporaire
+    config = {**settings.DATABASES['default'], 'NAME': str(tmp_path / 'prod.sqlite3')}
+    connections.settings[ALIAS] = connections.configure_settings({'default': config})['default']
+    with django_db_blocker.unblock():
+        with connections[ALIAS].cursor() as cursor:
+            cursor.execute('CREATE TABLE counter (id INTEGER PRIMARY KEY, value INTEGER NOT NULL)')
+            cursor.execute('INSERT INTO counter (id, value) VALUES (1, 0)')
+        yield connections
+        connections[ALIAS].close()
+    del connections.settings[ALIAS]
+    del connections[ALIAS]
+
+
+def read_counter():
+    with connections[ALIAS].cursor() as cursor:
+        cursor.execute('SELECT value FROM counter WHERE id = 1')
+        return cursor.fetchone()[0]
+
+
+def in_thread(target, *args):
+    def run():
+        try:
+            target(*args)
+        finally:
+            connections[ALIAS].close()
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_pragmas_are_applied_to_each_connection(file_db):
+    with connections[ALIAS].cursor() as cursor:
+        values = {}
+        for pragma in ('journal_mode', 'synchronous', 'busy_timeout', 'temp_store', 'cache_size'):
+            cursor.execute(f'PRAGMA {pragma}')
+            values[pragma] = cursor.fetchone()[0]
+    assert values['journal_mode'] == 'wal'
+    assert values['synchronous'] == 1  # NORMAL
+    assert values['busy_timeout'] == 20_000
+    assert values['temp_store'] == 2  # MEMORY
+    assert values['cache_size'] == -64 * 1024
+
+
+def test_readers_are_not_blocked_by_a_writer(file_db):
+    written, release = threading.Event(), threading.Event()
+
+    def writer():
+        # Verrou exclusif : celui que prend tout écrivain au moment du commit
+        # (ou quand son cache déborde), qui bloque les lecteurs hors WAL
+        with connections[ALIAS].cursor() as cursor:
+            cursor.execute('BEGIN EXCLUSIVE')
+            cursor.execute('UPDATE counter SET value = 42 WHERE id = 1')
+            written.set()
+            release.wait(5)
+            cursor.execute('COMMIT')
+
+    thread = in_thread(writer)
+    assert written.wait(5)
+    started = time.monotonic()
+    # Transaction d'écriture ouverte : la lecture voit l'état validé, sans attendre
+    assert read_counter() == 0
+    assert time.monotonic() - started < 1
+    release.set()
+    thread.join()
+    assert read_counter() == 42
+
+
+def test_concurrent_writers_wait_instead_of_failing(file_db):
+    errors = []
+
+    def writer():
+        for _ in range(20):
+            try:
+                with transaction.atomic(using=ALIAS):
+                    # Lecture puis écriture : la montée de verrou échouerait en mode DEFERRED
+                    value = read_counter()
+                    with connections[ALIAS].cursor() as cursor:
+                        cursor.execute('UPDATE counter SET value = %s WHERE id = 1', [value + 1])
+            except Exception as exc:  # noqa: BLE001 - on veut voir toute erreur
+                errors.append(exc)
+
+    threads = [in_thread(writer) for _ in range(8)]
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert read_counter() == 160
+
+
+@pytest.mark.parametrize('mode, conn_max_age, expected', [
+    ('wsgi', None, '600'), ('asgi', None, '0'), ('asgi', '600', None),
+])
+def test_persistent_connections_only_under_wsgi(mode, conn_max_age, expected):
+    # Sous ASGI, une connexion par thread de requête : jamais réutilisée
+    env = {**os.environ, 'SERVER_MODE': mode, 'MEDIA_ACCEL': 'nginx',
+           'DJANGO_SETTINGS_MODULE': 'YummyBox_core.settings'}
+    env.pop('CONN_MAX_AGE', None)
+    if conn_max_age is not None:
+        env['CONN_MAX_AGE'] = conn_max_age
+    code = "from django.conf import settings; print(settings.DATABASES['default']['CONN_MAX_AGE'])"
+    result = subprocess.run([sys.executable, '-c', code], cwd=django_settings.BASE_DIR, env=env,
+                            capture_output=True, text=True)
+    if expected is None:
+        assert result.returncode != 0 and 'exige CONN_MAX_AGE=0' in result.stderr
+    else:
+        assert result.stdout.strip() == expected, result.stderr
+
+
+UPSERT_RACE = """
+import sys, threading
+import django
+from django.conf import settings
+django.setup()
+settings.DATABASES['default']['OPTIONS']['transaction_mode'] = sys.argv[1]
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from recipes.models import Recipe, Review, ReviewQuerySet
+
+call_command('migrate', verbosity=0)
+user = get_user_model().objects.create_user(username='double-clic')
+recipe = Recipe.objects.create(title='Tarte', description='x', created_by=user)
+connection.close()
+
+# Les deux requêtes lisent l'avis précédent avant d'écrire, si le code le permet
+barrier = threading.Barrier(2, timeout=1)
+first = ReviewQuerySet.first
+def first_then_wait(self):
+    row = first(self)
+    try:
+        barrier.wait()
+    except threading.BrokenBarrierError:
+        pass
+    return row
+ReviewQuerySet.first = first_then_wait
+
+errors = []
+def post():
+    try:
+        Review.objects.upsert(recipe.pk, user.pk, 5)
+    except Exception as exc:
+        errors.append(repr(exc))
+    finally:
+        connection.close()
+threads = [threading.Thread(target=post) for _ in range(2)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+recipe.refresh_from_db()
+print(recipe.rating_count, recipe.rating_sum, errors)
+"""
+
+
+@pytest.mark.parametrize('mode', ['IMMEDIATE', 'DEFERRED'])
+def test_concurrent_first_reviews_count_once(tmp_path, mode):
+    # Double clic sur « publier » : un seul avis compté, quel que soit transaction_mode
+    env = {**os.environ, 'SQLITE_PATH': str(tmp_path / 'prod.sqlite3'),
+           'DJANGO_SETTINGS_MODULE': 'YummyBox_core.settings'}
+    result = subprocess.run([sys.executable, '-c', UPSERT_RACE, mode], cwd=django_settings.BASE_DIR,
+                            env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == '1 5 []'
@@ -0,0 +1,103 @@
+import asyncio
+import io
+from pathlib import Path
+
+import pytest
+from django.conf import settings as django_settings
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory
+from YummyBox_core.middleware import StaticFilesMiddleware
+from YummyBox_core.storage import StaticStorage
+
+CSS = "/* Carte */\n.card {\n    background: url('../img/logo.png');\n    color: #333;\n}\n" * 40
+
+
+@pytest.fixture
+def collected(tmp_path, settings):
+    # Équivalent de collectstatic sur deux fichiers : copie puis post-traitement
+    settings.STATIC_ROOT = tmp_path
+    storage = StaticStorage(location=tmp_path, base_url='/static/')
+    storage.save('css/site.css', ContentFile(CSS.encode()))
+    storage.save('img/logo.png', ContentFile(b'\x89PNG' + b'\x00' * 64))
+    processed = list(storage.post_process({name: (storage, name) for name in ['css/site.css', 'img/logo.png']}))
+    assert not [error for _, _, error in processed if isinstance(error, Exception)]
+    return StaticStorage(location=tmp_path, base_url='/static/')
+
+
+def test_static_storage_minifies_hashes_and_precompresses(collected, tmp_path):
+    css_name = collected.stored_name('css/site.css')
+    logo_name = collected.stored_name('img/logo.png')
+    assert css_name != 'css/site.css' and logo_name != 'img/logo.png'
+
+    content = (tmp_path / css_name).read_text()
+    # Minifié, et l'image référencée par son nom haché
+    assert '/* Carte */' not in content and '\n' not in content.strip()
+    assert f'url("../{logo_name}")' in content
+    assert (tmp_path / f'{css_name}.gz').exists()
+    assert (tmp_path / f'{css_name}.br').exists()
+
+
+def test_static_storage_without_manifest_keeps_names(tmp_path):
+    # Développement et tests : collectstatic pas lancé
+    assert StaticStorage(location=tmp_path, base_url='/static/').url('css/site.css') == '/static/css/site.css'
+
+
+def test_static_middleware_serves_precompressed_immutable_files(collected, settings):
+    settings.WHITENOISE_AUTOREFRESH = False
+    settings.WHITENOISE_USE_FINDERS = False
+    url = collected.url('css/site.css')
+
+    middleware = StaticFilesMiddleware(lambda request: HttpResponse('vue'))
+    response = middleware(RequestFactory().get(url, HTTP_ACCEPT_ENCODING='gzip, br'))
+    assert response.status_code == 200
+    assert response['Content-Encoding'] == 'br'
+    assert 'immutable' in response['Cache-Control']
+    assert 'max-age=315360000' in response['Cache-Control']
+
+    # Nom non haché : cache court
+    response = middleware(RequestFactory().get('/static/css/site.css'))
+    assert 'immutable' not in response['Cache-Control']
+
+    # Chaîne async (ASGI) : pas de passage par un thread pour les autres requêtes
+    async def get_response(request):
+        return HttpResponse('vue')
+
+    middleware = StaticFilesMiddleware(get_response)
+    response = asyncio.run(middleware(RequestFactory().get(url)))
+    assert response.status_code == 200 and 'immutable' in response['Cache-Control']
+    response = asyncio.run(middleware(RequestFactory().get('/')))
+    assert response.content == b'vue'
+
+
+@pytest.mark.django_db
+def test_pages_link_static_bundles_instead_of_inline_css(client):
+    html = client.get('/accounts/login/').content.decode()
+    assert '<style>' not in html and '<script>' not in html
+    assert '/static/accounts/css/login.css' in html
+    assert '/static/fonts/fonts.css' in html
+    assert 'fonts.googleapis.com' not in html
+
+
+def test_build_fonts_subsets_icons_used_by_templates(tmp_path):
+    call_command('build_fonts', output=str(tmp_path / 'fonts'), stdout=io.StringIO(), stderr=io.StringIO())
+    css = (tmp_path / 'fonts' / 'fonts.css').read_text(encoding='utf-8')
+    # Icônes des templates (alias v5 compris), pas le catalogue complet
+    assert '.fa-home::before{content:"\\f015"}' in css
+    assert '.fa-facebook-f::before' in css
+    assert '.fa-rocket::before' not in css
+    assert (tmp_path / 'fonts' / 'fa-solid-900.woff2').stat().st_size < 10 * 1024
+    # Polices de texte : sous-ensemble latin, déclarées avec leur licence
+    assert 'font-family:"Poppins";font-style:normal;font-weight:400' in css
+    assert 'font-family:"Dancing Script"' in css and 'SIL OFL 1.1' in css
+    assert (tmp_path / 'fonts' / 'poppins-400.woff2').stat().st_size < 20 * 1024
+
+
+def test_committed_fonts_match_a_fresh_build(tmp_path):
+    # static/fonts/ est versionné : pages et image Docker l'utilisent sans build_fonts
+    call_command('build_fonts', output=str(tmp_path / 'fonts'), stdout=io.StringIO(), stderr=io.StringIO())
+    committed = Path(django_settings.BASE_DIR) / 'static' / 'fonts'
+    assert sorted(p.name for p in committed.iterdir()) == sorted(p.name for p in (tmp_path / 'fonts').iterdir())
+    assert (committed / 'fonts.css').read_text(encoding='utf-8') == \
+        (tmp_path / 'fonts' / 'fonts.css').read_text(encoding='utf-8')
@@ -0,0 +1,70 @@
+import pytest
+from django.db.models import Count, Sum
+from recipes.benchmarking import compare, measure_session_engine, percentile, seed_database
+from recipes.models import Recipe, Review
+
+
+@pytest.mark.django_db
+def test_seed_database_is_consistent():
+    seed_database(users=20, recipes=30, reviews=300, seed=7, batch_size=50)
+
+    assert Recipe.objects.count() == 30
+    totals = Review.objects.aggregate(n=Count('pk'), s=Sum('rating'))
+    stored = Recipe.objects.aggregate(n=Sum('rating_count'), s=Sum('rating_sum'))
+    assert (stored['n'], stored['s']) == (totals['n'], totals['s'])
+    # Popularité asymétrique : la recette la plus notée dépasse largement la moyenne
+    top = Recipe.objects.order_by('-rating_count').first().rating_count
+    assert top > 3 * totals['n'] / 30
+
+
+def test_compare_flags_regressions():
+    baseline = {'small': {'recipe_list': {'queries': 5, 'p95_ms': 10.0, 'peak_kb': 300.0}}}
+    same = {'small': {'recipe_list': {'queries': 5, 'p95_ms': 11.0, 'peak_kb': 310.0}}}
+    worse = {'small': {'recipe_list': {'queries': 6, 'p95_ms': 20.0, 'peak_kb': 300.0}}}
+
+    assert compare(same, baseline, tolerance=0.25) == []
+    assert len(compare(worse, baseline, tolerance=0.25)) == 2
+
+    # +40 % mais +2 ms seulement : sous le plancher absolu, bruit de mesure
+    noisy = {'small': {'recipe_list': {'queries': 5, 'p95_ms': 7.0, 'peak_kb': 300.0}}}
+    fast = {'small': {'recipe_list': {'queries': 5, 'p95_ms': 5.0, 'peak_kb': 300.0}}}
+    assert compare(noisy, fast, tolerance=0.25) == []
+    assert len(compare(noisy, fast, tolerance=0.25, min_deltas={})) == 1
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(100, 0, -1))
+    assert percentile(values, 50) == 51
+    assert percentile(values, 95) == 95
+    assert percentile(values, 100) == 100
+    assert percentile([7], 99) == 7
+
+
+@pytest.mark.django_db
+def test_measure_takes_median_of_repeats():
+    from types import SimpleNamespace
+    from recipes.benchmarking import measure
+
+    calls = []
+
+    def request():
+        calls.append(1)
+        return SimpleNamespace(status_code=200)
+
+    stats = measure(request, iterations=4, warmup=1, repeats=3)
+    assert len(calls) == 1 + 4 * 3 + 1
+    assert stats['repeats'] == 3 and stats['status'] == 200
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('engine, queries', [
+    ('django.contrib.sessions.backends.db', 2),
+    ('django.contrib.sessions.backends.signed_cookies', 1),
+])
+def test_measure_session_engine(engine, queries):
+    stats = measure_session_engine(engine, users=3, concurrency=2, requests=12)
+
+    assert stats['requests'] == 12
+    assert stats['errors'] == 0 and stats['anonymous'] == 0
+    # Session (db uniquement) + utilisateur chargé avec son profil
+    assert stats['queries_per_request'] == queries
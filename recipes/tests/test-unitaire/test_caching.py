@@ -0,0 +1,115 @@
+import pickle
+import threading
+import time
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from recipes import views
+from recipes.models import Recipe, Review
+from YummyBox_core.caching import LocalLRU, TieredCache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def slow_builder(calls, value='valeur', delay=0.2):
+    def build():
+        calls.append(1)
+        time.sleep(delay)
+        return value
+    return build
+
+
+def run_concurrently(count, target):
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(i):
+        barrier.wait()
+        results[i] = target(i)
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_local_lru_is_bounded_and_expires():
+    lru = LocalLRU(maxsize=2)
+    lru.set('a', 1, ttl=60)
+    lru.set('b', 2, ttl=60)
+    lru.get('a')
+    lru.set('c', 3, ttl=60)  # 'b' est le moins récemment utilisé
+    assert lru.get('b') is None and lru.get('a')[1] == 1
+    lru.set('d', 4, ttl=-1)
+    assert lru.get('d') is None
+
+
+def test_single_flight_within_a_process():
+    layer = TieredCache('test-flight', ttl=60)
+    calls = []
+    build = slow_builder(calls)
+    results = run_concurrently(16, lambda i: layer.get_or_set('hot', build))
+
+    assert results == ['valeur'] * 16
+    assert len(calls) == 1
+    assert layer.stats()['miss'] == 1 and layer.stats()['coalesced'] == 15
+
+
+def test_shared_lock_across_workers():
+    # Une instance par « worker » : LRU et single-flight propres, cache partagé commun
+    workers = [TieredCache('test-lock', ttl=60, poll_interval=0.01) for _ in range(8)]
+    calls = []
+    build = slow_builder(calls)
+    results = run_concurrently(8, lambda i: workers[i].get_or_set('hot', build))
+
+    assert results == ['valeur'] * 8
+    assert len(calls) == 1
+
+
+def test_stale_value_is_served_during_rebuild():
+    layer = TieredCache('test-stale', ttl=60, stale_ttl=60)
+    full_key = layer.make_key('hot')
+    cache.set(full_key, (time.time() - 1, 'ancienne'), 60)
+    cache.add(f'{full_key}:lock', 'autre-worker', 10)
+    calls = []
+
+    assert layer.get_or_set('hot', slow_builder(calls, 'nouvelle', delay=0)) == 'ancienne'
+    assert calls == [] and layer.stats()['stale'] == 1
+
+    cache.delete(f'{full_key}:lock')
+    assert layer.get_or_set('hot', slow_builder(calls, 'nouvelle', delay=0)) == 'nouvelle'
+    assert len(calls) == 1
+
+
+@pytest.mark.django_db
+def test_recipe_detail_uses_cache(client, django_user_model, django_assert_max_num_queries):
+    user = django_user_model.objects.create_user(username='user', password='pass123')
+    recipe = Recipe.objects.create(title='Tarte', description='x', created_by=user)
+    Review.objects.create(recipe=recipe, user=user, rating=5, comment='Top')
+    client.force_login(user)
+    url = reverse('recipes:recipe_detail', args=[recipe.id])
+
+    assert 'Top' in client.get(url).content.decode()
+    with django_assert_max_num_queries(3):
+        # Session, utilisateur avec profil, validateurs : ni recette ni avis relus
+        html = client.get(url).content.decode()
+    assert 'Top' in html and 'Modifier' in html  # boutons de l'auteur
+
+    # Contenu mis en cache partagé : pas d'objet User (hash du mot de passe, e-mail)
+    payload = pickle.dumps(views.detail_data(recipe.id))
+    assert user.password.encode() not in payload and b'last_login' not in payload
+
+    Review.objects.create(recipe=recipe, user=django_user_model.objects.create_user('b', password='x'),
+                          rating=3, comment='Nouvel avis')
+    assert 'Nouvel avis' in client.get(url).content.decode()
+
+    client.force_login(django_user_model.objects.create_user('ops', password='x', is_staff=True))
+    metrics = client.get('/metrics').content.decode()
+    assert 'yummybox_cache_hit_ratio{namespace="recipe-detail"}' in metrics
@@ -1,6 +1,6 @@
 import pytest
 from recipes.forms import RecipeForm
-from recipes.models import Category
+from recipes.models import Category, Recipe
 
 @pytest.mark.django_db
 def test_recipe_form_valid():
@@ -20,3 +20,30 @@ def test_recipe_form_invalid():
         "category": ""
     })
     assert form.is_valid() is False
+
+TARTE = ("Tarte aux pommes", "Étaler la pâte brisée dans le moule, disposer les pommes en lamelles, "
+         "saupoudrer de sucre vanillé et cuire quarante minutes à four chaud.")
+
+@pytest.mark.django_db
+def test_recipe_form_flags_near_duplicate(django_user_model, django_assert_max_num_queries):
+    chef = django_user_model.objects.create_user(username="chef")
+    cat = Category.objects.create(name="Desserts")
+    original = Recipe.objects.create(title=TARTE[0], description=TARTE[1], created_by=chef)
+    Recipe.objects.create(title="Soupe", description="Poireaux et pommes de terre mixés.", created_by=chef)
+
+    data = {"title": "Tarte aux pommes !", "description": TARTE[1].replace("quarante", "quarante-cinq"),
+            "category": cat.id}
+    form = RecipeForm(data=data)
+    # Catégorie, recherche LSH (une requête), titres des doublons, validation du modèle
+    with django_assert_max_num_queries(4):
+        assert form.is_valid() is False
+    assert form.has_error("__all__", code="duplicate")
+    assert [pk for pk, _, _ in form.duplicates] == [original.pk]
+
+    # Confirmation explicite : la recette peut être publiée
+    form = RecipeForm(data={**data, "confirm_duplicate": "on"})
+    assert form.is_valid() is True
+
+    # Modifier la recette elle-même ne la signale pas comme son propre doublon
+    form = RecipeForm(data={"title": TARTE[0], "description": TARTE[1], "category": cat.id}, instance=original)
+    assert form.is_valid() is True
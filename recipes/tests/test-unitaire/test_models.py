@@ -68,9 +68,316 @@ def test_review_unique_together(user_factory):
         Review.objects.create(recipe=recipe, user=user, rating=4)
 
 
+@pytest.mark.django_db
+def test_rating_aggregates_follow_edit_and_delete(user_factory):
+    user1 = user_factory(username="user1")
+    user2 = user_factory(username="user2")
+    recipe = Recipe.objects.create(title="Flan", description="Vanille", created_by=user1)
+
+    Review.objects.create(recipe=recipe, user=user1, rating=2)
+    Review.objects.create(recipe=recipe, user=user2, rating=4)
+
+    review = Review.objects.get(recipe=recipe, user=user1)
+    review.rating = 5
+    review.save()
+    recipe.refresh_from_db()
+    assert (recipe.rating_sum, recipe.rating_count) == (9, 2)
+
+    review.delete()
+    recipe.refresh_from_db()
+    assert (recipe.rating_sum, recipe.rating_count) == (4, 1)
+
+    # Suppression en cascade via l'utilisateur
+    user2.delete()
+    recipe.refresh_from_db()
+    assert (recipe.rating_sum, recipe.rating_count) == (0, 0)
+    assert recipe.average_rating() is None
+
+
+@pytest.mark.django_db
+def test_rating_aggregates_bulk_paths(user_factory):
+    users = [user_factory(username=f"bulk{i}") for i in range(3)]
+    recipe = Recipe.objects.create(title="Crêpes", description="Sucrées", created_by=users[0])
+
+    Review.objects.bulk_create([Review(recipe=recipe, user=u, rating=3) for u in users])
+    recipe.refresh_from_db()
+    assert (recipe.rating_sum, recipe.rating_count) == (9, 3)
+
+    Review.objects.filter(user=users[0]).update(rating=5)
+    recipe.refresh_from_db()
+    assert recipe.average_rating() == round(11 / 3, 2)
+
+    Review.objects.filter(rating=3).delete()
+    assert Recipe.objects.with_average_rating().get(pk=recipe.pk).avg_rating == 5.0
+
+
+@pytest.mark.django_db
+def test_rebuild_ratings_command(user_factory):
+    from django.core.management import call_command
+
+    user = user_factory(username="rebuild")
+    recipe = Recipe.objects.create(title="Pain", description="Maison", created_by=user)
+    Review.objects.create(recipe=recipe, user=user, rating=4)
+    Recipe.objects.update(rating_sum=0, rating_count=0)
+
+    call_command('rebuild_ratings')
+    recipe.refresh_from_db()
+    assert (recipe.rating_sum, recipe.rating_count) == (4, 1)
+
+
+def _jpeg_with_exif(width, height):
+    from io import BytesIO
+    from PIL import Image
+
+    image = Image.new('RGB', (width, height), (200, 80, 40))
+    exif = Image.Exif()
+    exif[0x010F] = "PhoneMaker"  # Make
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', exif=exif)
+    return buffer.getvalue()
+
+
+@pytest.mark.django_db
+def test_image_renditions_generated_once(user_factory, settings, tmp_path,
+                                         django_capture_on_commit_callbacks):
+    from io import StringIO
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.core.management import call_command
+    from PIL import Image
+
+    settings.MEDIA_ROOT = tmp_path
+    user = user_factory(username="photographe")
+    upload = SimpleUploadedFile("tajine.jpg", _jpeg_with_exif(1500, 1000), content_type="image/jpeg")
+    # Pas d'encodage dans la requête : la commande (CronJob) s'en charge
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        recipe = Recipe.objects.create(title="Tajine", description="Agneau", image=upload, created_by=user)
+    assert callbacks == []
+    call_command('build_image_renditions', workers=1, stdout=StringIO())
+
+    recipe.refresh_from_db()
+    renditions = recipe.image_renditions
+    assert renditions['source'] == recipe.image.name
+    assert [w for w, _ in renditions['webp']] == [320, 640, 1024]
+    for width, name in renditions['jpeg']:
+        with Image.open(tmp_path / name) as im:
+            assert im.width == width
+            assert not im.getexif()
+
+    # Sauvegarde sans changement d'image : pas de retraitement
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        recipe.title = "Tajine d'agneau"
+        recipe.save()
+    assert callbacks == []
+
+    Recipe.objects.filter(pk=recipe.pk).update(image_renditions={})
+    call_command('build_image_renditions', workers=1, stdout=StringIO())
+    recipe.refresh_from_db()
+    assert recipe.image_renditions == renditions
+
+    # Image retirée : déclinaisons supprimées après validation
+    with django_capture_on_commit_callbacks(execute=True):
+        recipe.image = None
+        recipe.save()
+    recipe.refresh_from_db()
+    assert recipe.image_renditions == {}
+    assert not any((tmp_path / name).exists() for _, name in renditions['jpeg'])
+
+
+@pytest.mark.django_db
+def test_unreadable_image_is_logged_not_raised(user_factory, settings, tmp_path, caplog):
+    from io import StringIO
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.core.management import call_command
+    from recipes import images
+
+    settings.MEDIA_ROOT = tmp_path
+    user = user_factory(username="maladroit")
+    upload = SimpleUploadedFile("casse.jpg", b"pas une image", content_type="image/jpeg")
+    recipe = Recipe.objects.create(title="Crêpes", description="x", image=upload, created_by=user)
+
+    renditions = images.process_recipe_image(recipe.pk)
+    assert renditions['source'] == recipe.image.name and 'error' in renditions
+    assert "casse" in caplog.text
+
+    # La commande note l'échec et ne réessaie pas au passage suivant
+    Recipe.objects.filter(pk=recipe.pk).update(image_renditions={})
+    err = StringIO()
+    call_command('build_image_renditions', workers=1, stdout=StringIO(), stderr=err)
+    assert f"Recette {recipe.pk}" in err.getvalue()
+    recipe.refresh_from_db()
+    assert 'error' in recipe.image_renditions
+    out = StringIO()
+    call_command('build_image_renditions', workers=1, stdout=out)
+    assert "Aucune image" in out.getvalue()
+
+
 # Fixture pour créer un user rapidement
 @pytest.fixture
 def user_factory(db):
     def create_user(**kwargs):
         return User.objects.create_user(**kwargs)
     return create_user
+
+
+@pytest.mark.django_db
+def test_review_upsert_replaces_and_keeps_aggregates():
+    user = User.objects.create_user(username='upsert', password='pass123')
+    recipe = Recipe.objects.create(title='Quiche', description='x', created_by=user)
+
+    review, created = Review.objects.upsert(recipe.pk, user.pk, 2, 'Bof')
+    assert created and review.pk
+    review, created = Review.objects.upsert(recipe.pk, user.pk, 5, 'Finalement excellente')
+    assert not created
+
+    assert Review.objects.filter(recipe=recipe).count() == 1
+    assert Review.objects.get(recipe=recipe).comment == 'Finalement excellente'
+    recipe.refresh_from_db()
+    assert (recipe.rating_count, recipe.rating_sum) == (1, 5)
+
+    with pytest.raises(Recipe.DoesNotExist):
+        Review.objects.upsert(recipe.pk + 1, user.pk, 3)
+
+
+@pytest.mark.django_db
+def test_recipe_stats_incremental_matches_rebuild(django_assert_num_queries):
+    from datetime import timedelta
+    from django.utils import timezone
+    from recipes import stats
+    from recipes.models import RecipeStats
+
+    users = [User.objects.create_user(username=f'stats{i}') for i in range(4)]
+    recipe = Recipe.objects.create(title='Gratin', description='x', created_by=users[0])
+    other = Recipe.objects.create(title='Soupe', description='x', created_by=users[0])
+
+    Review.objects.create(recipe=recipe, user=users[0], rating=5)
+    old = Review.objects.create(recipe=recipe, user=users[1], rating=3)
+    # Avis ancien (hors fenêtre) : created_at modifié hors signaux, d'où la reconstruction
+    Review.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=45))
+    stats.rebuild([recipe.pk])
+    Review.objects.upsert(recipe.pk, users[2].pk, 1)
+    Review.objects.upsert(recipe.pk, users[2].pk, 4)
+    moved = Review.objects.create(recipe=recipe, user=users[3], rating=2)
+    moved.recipe = other
+    moved.save()
+    Review.objects.get(pk=old.pk).delete()
+    Review.objects.bulk_create([Review(recipe=other, user=users[0], rating=5)])
+
+    incremental = {s.recipe_id: (s.histogram, stats.recent_count(s)) for s in RecipeStats.objects.all()}
+    assert incremental[recipe.pk] == ([0, 0, 0, 1, 1], 2)
+    assert incremental[other.pk] == ([0, 1, 0, 0, 1], 2)
+
+    RecipeStats.objects.all().delete()
+    assert stats.rebuild() == 2
+    assert {s.recipe_id: (s.histogram, stats.recent_count(s)) for s in RecipeStats.objects.all()} == incremental
+
+    # Lecture : une seule ligne, la fenêtre glisse sans requête
+    with django_assert_num_queries(1):
+        row = Recipe.objects.select_related('stats').get(pk=recipe.pk).stats
+    later = timezone.localdate() + timedelta(days=stats.RECENT_DAYS)
+    assert stats.summary(row) == {'histogram': {'1': 0, '2': 0, '3': 0, '4': 1, '5': 1}, 'count': 2, 'recent': 2}
+    assert stats.recent_count(row, later) == 0
+
+
+@pytest.mark.django_db
+def test_rebuild_recipe_stats_command(user_factory):
+    from django.core.management import call_command
+    from recipes.models import RecipeStats
+
+    user = user_factory(username="stats")
+    recipe = Recipe.objects.create(title="Pain", description="Maison", created_by=user)
+    Review.objects.create(recipe=recipe, user=user, rating=4)
+    RecipeStats.objects.update(stars_4=0, daily=[])
+
+    call_command('rebuild_recipe_stats', batch_size=1)
+    assert RecipeStats.objects.get(recipe=recipe).histogram == [0, 0, 0, 1, 0]
+
+
+@pytest.mark.django_db
+def test_leaderboard_scores_incremental_match_rebuild():
+    from datetime import timedelta
+    from django.utils import timezone
+    from recipes import leaderboards
+    from recipes.models import RecipeScore
+
+    users = [User.objects.create_user(username=f'board{i}') for i in range(12)]
+    cat = Category.objects.create(name='Plats')
+    single = Recipe.objects.create(title='Un seul avis', description='x', category=cat, created_by=users[0])
+    popular = Recipe.objects.create(title='Plébiscitée', description='x', created_by=users[0])
+    older = Recipe.objects.create(title='Ancienne', description='x', created_by=users[0])
+
+    Review.objects.create(recipe=single, user=users[0], rating=5)
+    Review.objects.bulk_create([Review(recipe=popular, user=u, rating=5) for u in users[:9]])
+    Review.objects.create(recipe=popular, user=users[9], rating=4)
+    Review.objects.bulk_create([Review(recipe=older, user=u, rating=5) for u in users[:10]])
+    Review.objects.filter(recipe=older).update(created_at=timezone.now() - timedelta(days=14))
+    Review.objects.filter(recipe=older).update(rating=5)  # reconstruit avec les dates anciennes
+    Review.objects.upsert(single.pk, users[1].pk, 2)
+    Review.objects.upsert(single.pk, users[1].pk, 4)
+    Review.objects.get(recipe=popular, user=users[9]).delete()
+
+    incremental = {s.recipe_id: (s.bayesian, s.trending) for s in RecipeScore.objects.all()}
+    RecipeScore.objects.all().delete()
+    leaderboards.rebuild()
+    for score in RecipeScore.objects.all():
+        assert score.bayesian == pytest.approx(incremental[score.recipe_id][0])
+        assert score.trending == pytest.approx(incremental[score.recipe_id][1], rel=1e-6)
+
+    # Bayésien : dix 5 ★ anciens devant neuf récents, tous devant deux avis ; tendances : l'ancienne recule
+    top = list(leaderboards.board_queryset('top').order_by('-bayesian').values_list('recipe_id', flat=True))
+    assert top == [older.pk, popular.pk, single.pk]
+    trending = list(leaderboards.board_queryset('trending').order_by('-trending')
+                    .values_list('recipe_id', flat=True))
+    assert trending == [popular.pk, single.pk, older.pk]
+    assert leaderboards.trending_now(RecipeScore.objects.get(pk=popular.pk).trending) == pytest.approx(9, rel=1e-3)
+
+    # La catégorie suit la recette
+    single.category = None
+    single.save()
+    assert not leaderboards.board_queryset('top', cat.pk).exists()
+
+
+@pytest.mark.django_db
+def test_trending_scores_rebase_instead_of_overflowing():
+    from datetime import datetime, timedelta, timezone as dt_timezone
+    from django.utils import timezone
+    from recipes import leaderboards
+    from recipes.models import RecipeScore
+
+    users = [User.objects.create_user(username=f'futur{i}') for i in range(3)]
+    recipe = Recipe.objects.create(title='Durable', description='x', created_by=users[0])
+    Review.objects.bulk_create([Review(recipe=recipe, user=u, rating=5) for u in users[:2]])
+
+    # Changer de date de référence ne change pas le score ramené à une date donnée
+    now = timezone.now()
+    before = leaderboards.trending_now(RecipeScore.objects.get(pk=recipe.pk).trending, now)
+    leaderboards.rebase_trending(now)
+    score = RecipeScore.objects.get(pk=recipe.pk).trending
+    assert score == pytest.approx(2, rel=1e-3)
+    assert leaderboards.trending_now(score, now) == pytest.approx(before)
+
+    # Trente ans plus tard : 2^(écart / demi-vie) déborderait sans nouvelle référence
+    far = datetime(2056, 1, 1, tzinfo=dt_timezone.utc)
+    with pytest.raises(OverflowError):
+        leaderboards.decay_factor(far, leaderboards.DEFAULT_TRENDING_EPOCH)
+    leaderboards.rebase_trending(far)
+    Review.objects.filter(recipe=recipe).update(created_at=far)
+    leaderboards.rebuild([recipe.pk])  # reconstruction complète
+    assert RecipeScore.objects.get(pk=recipe.pk).trending == pytest.approx(2)
+    # Mise à jour incrémentale un jour plus tard
+    leaderboards.rating_changed(recipe.pk, far + timedelta(days=1), 1, 5)
+    score = RecipeScore.objects.get(pk=recipe.pk).trending
+    assert leaderboards.trending_now(score, far + timedelta(days=1)) == pytest.approx(1 + 2 / 2 ** (1 / 3.5))
+
+
+@pytest.mark.django_db
+def test_rebuild_leaderboards_command_refreshes_prior():
+    from django.core.management import call_command
+    from recipes.models import LeaderboardState, RecipeScore
+
+    user = User.objects.create_user(username='prior')
+    recipe = Recipe.objects.create(title='Pain', description='Maison', created_by=user)
+    Review.objects.create(recipe=recipe, user=user, rating=2)
+
+    call_command('rebuild_leaderboards', batch_size=1)
+    assert LeaderboardState.objects.get().prior_mean == 2.0
+    assert RecipeScore.objects.get(recipe=recipe).bayesian == pytest.approx(2.0)
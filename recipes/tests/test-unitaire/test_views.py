@@ -167,3 +167,268 @@ def test_recipe_review_post(client):
     assert response.status_code == 302
     assert response.url == reverse('recipes:recipe_detail', args=[recipe.id])
     assert Review.objects.filter(recipe=recipe, user=user).exists()
+
+
+@pytest.mark.django_db
+def test_recipe_review_second_post_updates(client):
+    user = User.objects.create_user(username='user', password='1234')
+    recipe = Recipe.objects.create(title='Tarte', description='Délicieuse', created_by=user)
+    url = reverse('recipes:recipe_review', args=[recipe.id])
+    client.login(username='user', password='1234')
+
+    # Double clic puis changement d'avis : ni erreur 500 ni doublon
+    for rating in (3, 3, 4):
+        assert client.post(url, data={'rating': rating, 'comment': 'Avis'}).status_code == 302
+    recipe.refresh_from_db()
+    assert Review.objects.filter(recipe=recipe).count() == 1
+    assert (recipe.rating_count, recipe.rating_sum) == (1, 4)
+    assert client.post(reverse('recipes:recipe_review', args=[recipe.id + 1]),
+                       data={'rating': 4, 'comment': ''}).status_code == 404
+
+
+@pytest.mark.django_db
+def test_recipe_list_keyset_pagination(client, django_assert_max_num_queries):
+    from recipes import views
+
+    user = User.objects.create_user(username='user', password='1234')
+    client.login(username='user', password='1234')
+    cat = Category.objects.create(name='Desserts')
+    for i in range(views.RECIPES_PER_PAGE + 3):
+        Recipe.objects.create(title=f'Recette {i}', description='x' * 500, category=cat, created_by=user)
+
+    url = reverse('recipes:recipe_list')
+    # session + user + profil + page de recettes (catégorie jointe) + catégories
+    with django_assert_max_num_queries(6):
+        response = client.get(url)
+    page = response.context['page']
+    assert len(page) == views.RECIPES_PER_PAGE
+    assert page.has_next
+    assert b'Desserts' in response.content
+
+    response = client.get(url, {'cursor': page.next_cursor})
+    second = response.context['page']
+    assert len(second) == 3
+    assert not second.has_next
+    seen = {r.id for r in page} | {r.id for r in second}
+    assert len(seen) == views.RECIPES_PER_PAGE + 3
+
+    assert client.get(url, {'cursor': 'pas-un-curseur'}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_recipe_search_ranking_and_facets(client):
+    from recipes import views
+
+    user = User.objects.create_user(username='user', password='1234')
+    desserts = Category.objects.create(name='Desserts')
+    plats = Category.objects.create(name='Plats')
+    Recipe.objects.create(title='Tarte au citron', description='Pâte sablée', category=desserts, created_by=user)
+    Recipe.objects.create(title='Quiche', description='Une tarte salée', category=plats, created_by=user)
+    Recipe.objects.create(title='Soupe', description='Légumes', category=plats, created_by=user)
+
+    response = client.get(reverse('recipes:recipe_search'), {'q': 'tarte'})
+    assert response.status_code == 200
+    results = response.context['results']
+    # Le titre pèse plus que la description
+    assert [hit['title'] for hit in results.hits] == ['Tarte au citron', 'Quiche']
+    assert {f['name']: f['count'] for f in results.facets} == {'Desserts': 1, 'Plats': 1}
+
+    # Index maintenu à jour lors d'un renommage de catégorie ou d'une suppression
+    plats.name = 'Salés'
+    plats.save()
+    response = client.get(reverse('recipes:recipe_search'), {'q': 'sales'})
+    assert {hit['title'] for hit in response.context['results'].hits} == {'Quiche', 'Soupe'}
+
+    Recipe.objects.filter(title='Quiche').delete()
+    response = client.get(reverse('recipes:recipe_search'), {'q': 'tarte', 'category': plats.id})
+    assert response.context['results'].hits == []
+
+    # Paramètres hors des bornes de SQLite : page ramenée au maximum, catégorie refusée
+    url = reverse('recipes:recipe_search')
+    response = client.get(url, {'q': 'tarte', 'page': 10 ** 19})
+    assert response.status_code == 200 and response.context['results'].page == views.SEARCH_MAX_PAGE
+    assert client.get(url, {'q': 'tarte', 'category': '9' * 20}).status_code == 400
+    assert client.get(url, {'q': 'tarte', 'category': '-1'}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_recipe_detail_conditional_get(client):
+    user = User.objects.create_user(username='user', password='1234')
+    other = User.objects.create_user(username='other', password='1234')
+    recipe = Recipe.objects.create(title='Tarte', description='Délicieuse', created_by=user)
+    url = reverse('recipes:recipe_detail', args=[recipe.id])
+
+    response = client.get(url)
+    etag = response['ETag']
+    assert response.has_header('Last-Modified')
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    # Un nouvel avis change le validateur
+    Review.objects.create(recipe=recipe, user=other, rating=4)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    etag = response['ETag']
+
+    # Une page dépendante de l'utilisateur ne partage pas son ETag
+    client.login(username='user', password='1234')
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    # Jeton CSRF du formulaire d'avis renouvelé : la page n'est plus la même
+    client.cookies['csrftoken'] = 'a' * 32
+    etag = client.get(url)['ETag']
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    client.cookies['csrftoken'] = 'b' * 32
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_recipe_detail_last_modified_never_moves_backwards(rf):
+    from datetime import timedelta
+    from django.utils import timezone
+    from recipes.conditional import recipe_detail_last_modified
+
+    user = User.objects.create_user(username='user', password='1234')
+    other = User.objects.create_user(username='other', password='1234')
+    recipe = Recipe.objects.create(title='Tarte', description='Délicieuse', created_by=user)
+    Recipe.objects.filter(pk=recipe.pk).update(updated_at=timezone.now() - timedelta(days=1))
+
+    def last_modified():
+        return recipe_detail_last_modified(rf.get('/'), recipe.pk)
+
+    review = Review.objects.create(recipe=recipe, user=other, rating=4)
+    seen = last_modified()
+    # Avis le plus récent supprimé : If-Modified-Since seul ne doit pas donner de 304
+    review.delete()
+    assert last_modified() > seen
+    Review.objects.create(recipe=recipe, user=other, rating=4)
+    seen = last_modified()
+    # Mises à jour en masse (sans auto_now sur l'avis)
+    Review.objects.filter(recipe=recipe).update(rating=2)
+    assert last_modified() > seen
+    seen = last_modified()
+    Review.objects.filter(recipe=recipe).update(comment='Trop sucrée')
+    assert last_modified() > seen
+
+
+@pytest.mark.django_db
+def test_recipe_list_conditional_get(client):
+    user = User.objects.create_user(username='user', password='1234')
+    client.login(username='user', password='1234')
+    cat = Category.objects.create(name='Desserts')
+    Recipe.objects.create(title='Tarte', description='Délicieuse', category=cat, created_by=user)
+    url = reverse('recipes:recipe_list')
+
+    etag = client.get(url)['ETag']
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    cat.name = 'Pâtisseries'
+    cat.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert 'Pâtisseries' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_recipe_cards_fragment_cache(client):
+    from django.core.cache import cache
+    from recipes.fragments import CARD_NAMESPACE
+    from YummyBox_core.metrics import registry
+
+    def card_lookups():
+        counters = registry.counters['yummybox_cache_lookups_total']
+        return {result: counters.get((CARD_NAMESPACE, result), 0) for result in ('hit', 'miss')}
+
+    cache.clear()
+    before = card_lookups()
+    user = User.objects.create_user(username='user', password='1234')
+    client.login(username='user', password='1234')
+    cat = Category.objects.create(name='Desserts')
+    recipe = Recipe.objects.create(title='Tarte', description='Délicieuse', category=cat, created_by=user)
+    url = reverse('recipes:recipe_list')
+
+    client.get(url)
+    client.get(url)
+    after = card_lookups()
+    assert (after['hit'] - before['hit'], after['miss'] - before['miss']) == (1, 1)
+    # Les compteurs ne passent plus par le cache partagé
+    assert cache.get('recipe-card:stats:hits') is None
+
+    # Le renommage de la catégorie change la version de la carte
+    cat.name = 'Pâtisseries'
+    cat.save()
+    response = client.get(url)
+    assert 'Pâtisseries' in response.content.decode()
+    assert card_lookups()['miss'] - before['miss'] == 2
+
+    recipe.title = 'Tarte fine'
+    recipe.save()
+    assert 'Tarte fine' in client.get(url).content.decode()
+
+
+@pytest.mark.django_db
+def test_recipe_detail_reviews_are_paginated(client, django_assert_max_num_queries):
+    from django.core.cache import cache
+    from recipes import views
+
+    cache.clear()
+    author = User.objects.create_user(username='author', password='1234')
+    recipe = Recipe.objects.create(title='Tarte', description='Délicieuse', created_by=author)
+    reviewers = User.objects.bulk_create([User(username=f'critique{i}') for i in range(45)])
+    Review.objects.bulk_create([
+        Review(recipe=recipe, user=reviewer, rating=4, comment=f'avis-{i}')
+        for i, reviewer in enumerate(reviewers)
+    ])
+
+    # Coût fixe : recette et première page d'avis (auteurs joints), quel que soit le volume
+    with django_assert_max_num_queries(4):
+        response = client.get(reverse('recipes:recipe_detail', args=[recipe.id]))
+    html = response.content.decode()
+    assert html.count('class="review-box"') == views.REVIEWS_PER_PAGE
+    assert 'critique44' in html and 'id="moreReviews"' in html
+
+    seen = html.count('class="review-box"')
+    url = response.context['reviews'].next_cursor
+    while url:
+        page = client.get(reverse('recipes:recipe_reviews', args=[recipe.id]),
+                          {'cursor': url, 'format': 'json'}).json()
+        seen += len(page['reviews'])
+        url = page['next_cursor']
+    assert seen == 45
+
+    fragment = client.get(reverse('recipes:recipe_reviews', args=[recipe.id]))
+    assert fragment.content.decode().count('class="review-box"') == views.REVIEWS_PER_PAGE
+    assert client.get(reverse('recipes:recipe_reviews', args=[recipe.id]), {'cursor': 'x'}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_leaderboards_pages(client, django_assert_max_num_queries):
+    from django.core.cache import cache
+
+    cache.clear()
+    author = User.objects.create_user(username='author', password='1234')
+    desserts = Category.objects.create(name='Desserts')
+    recipes = [
+        Recipe.objects.create(title=f'Recette {i}', description='x', created_by=author,
+                              category=desserts if i % 2 else None)
+        for i in range(30)
+    ]
+    reviewers = User.objects.bulk_create([User(username=f'votant{i}') for i in range(5)])
+    for i, recipe in enumerate(recipes):
+        Review.objects.bulk_create([Review(recipe=recipe, user=u, rating=1 + i % 5) for u in reviewers])
+
+    # Page du classement : scores et recettes en une requête, catégories et cartes en cache
+    with django_assert_max_num_queries(4):
+        response = client.get(reverse('recipes:top_rated'))
+    assert response.status_code == 200
+    ranked = [score.recipe_id for score in response.context['page']]
+    assert len(ranked) == 24 and response.context['page'].has_next
+    assert response.context['page'].object_list[0].recipe.title in {'Recette 4', 'Recette 29'}
+
+    following = client.get(reverse('recipes:top_rated'), {'cursor': response.context['page'].next_cursor})
+    assert len({*ranked, *(s.recipe_id for s in following.context['page'])}) == 30
+
+    response = client.get(reverse('recipes:trending'), {'category': desserts.pk})
+    assert {s.recipe.category_id for s in response.context['page']} == {desserts.pk}
+    assert client.get(reverse('recipes:trending'), {'category': 'x'}).status_code == 400
+    assert client.get(reverse('recipes:trending'), {'category': '9' * 20}).status_code == 400
+    assert client.get(reverse('recipes:trending'), {'cursor': 'x'}).status_code == 400
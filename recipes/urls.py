@@ -1,15 +1,24 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 
+# Vues les plus sollicitées : async sous ASGI (settings.ASYNC_VIEWS)
+hot_views = async_views if settings.ASYNC_VIEWS else views
 
-APP_NAME = 'recipes'
+
+app_name = 'recipes'
 
 urlpatterns = [
     path('', views.landing_page, name='landing'),  # Landing page
-    path('recipes/', views.recipe_list, name='recipe_list'),  # Liste recettes (login required)
+    path('recipes/', hot_views.recipe_list, name='recipe_list'),  # Liste recettes (login required)
+    path('search/', views.recipe_search, name='recipe_search'),  # Recherche plein texte (publique)
+    path('top/', views.leaderboard, {'board': 'top'}, name='top_rated'),  # Classement (public)
+    path('trending/', views.leaderboard, {'board': 'trending'}, name='trending'),
     path('add/', views.recipe_add, name='recipe_add'),  # Ajout recette (chef only)
-    path('<int:id>/', views.recipe_detail, name='recipe_detail'),
+    path('<int:id>/', hot_views.recipe_detail, name='recipe_detail'),
+    path('<int:id>/reviews/', views.recipe_reviews, name='recipe_reviews'),  # Avis suivants (curseur)
     path('<int:id>/edit/', views.recipe_edit, name='recipe_edit'),
     path('<int:id>/delete/', views.recipe_delete, name='recipe_delete'),
-    path('<int:id>/review/', views.recipe_review, name='recipe_review'),
+    path('<int:id>/review/', hot_views.recipe_review, name='recipe_review'),
+    path('export/<str:kind>/', views.catalogue_export, name='catalogue_export'),  # Export (staff)
 ]
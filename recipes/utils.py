@@ -0,0 +1,18 @@
+# Plus grand entier accepté par SQLite (signé sur 64 bits)
+MAX_ID = 2 ** 63 - 1
+
+
+def parse_int(value):
+    # Entier reçu en texte (query string, CSV) ou en nombre JSON ; ValueError pour
+    # un nombre non entier (3.7 n'est pas tronqué en 3) ou un booléen
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(value)
+    return int(value)
+
+
+def parse_id(value):
+    # Identifiant reçu en paramètre ; ValueError hors des entiers de SQLite
+    value = parse_int(value)
+    if not 0 < value <= MAX_ID:
+        raise ValueError(value)
+    return value
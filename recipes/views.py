@@ -2,14 +2,42 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from .models import Recipe, Category, Review
 from .forms import RecipeForm, ReviewForm
-from django.http import HttpResponseForbidden
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    Http404, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse, StreamingHttpResponse,
+)
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition
+from . import conditional, leaderboards, recommendations, stats
+from .exporting import EXPORTS, FORMATS, aexport_stream, export_filename, export_stream, parse_since
+from .fragments import render_recipe_cards
+from .pagination import InvalidCursor, paginate_keyset, paginate_ranked
+from .search import search_recipes
+from .utils import parse_id
+from accounts import roles
+from YummyBox_core.caching import TieredCache
 
 
+RECIPES_PER_PAGE = 24
+REVIEWS_PER_PAGE = 20
+SEARCH_RESULTS_PER_PAGE = 20
+# Au-delà, la recherche renvoie la dernière page permise (OFFSET borné)
+SEARCH_MAX_PAGE = 500
 
+# Clés versionnées (catalogue, validateurs de la recette) : pas de purge explicite
+CATEGORIES_CACHE = TieredCache('categories', ttl=60 * 60, maxsize=16)
+RECIPE_DETAIL_CACHE = TieredCache('recipe-detail', ttl=10 * 60, maxsize=256)
+# Classements : scores mis à jour à chaque avis, une minute de retard acceptée
+LEADERBOARD_CACHE = TieredCache('leaderboard', ttl=60, maxsize=256)
+LEADERBOARD_TITLES = {'top': 'Les mieux notées', 'trending': 'Tendances de la semaine'}
 
-# Vérifie si l'utilisateur est chef
+
+
+
+# Vérifie si l'utilisateur est chef (rôle en cache, sans requête)
 def is_chef(user):
-    return hasattr(user, 'profile') and user.profile.role == 'chef'
+    return roles.is_chef(user)
 
 
 def landing_page(request):
@@ -17,24 +45,157 @@ def landing_page(request):
     return render(request, 'landing.html')
 
 
-@login_required
-def recipe_list(request):
-    recipes = Recipe.objects.all().order_by('-created_at')
-    categories = Category.objects.all()
-    return render(request, 'recipes/recipe_list.html', {
-        'recipes': recipes,
+# Briques partagées avec les vues async (async_views.py)
+
+def list_queryset():
+    # Uniquement les colonnes affichées par les cartes, catégorie jointe dans la même requête
+    return (
+        Recipe.objects.select_related('category')
+        .only('id', 'title', 'image', 'image_renditions', 'created_at', 'updated_at',
+              'category__name')
+    )
+
+
+def id_param(request, name):
+    # Identifiant facultatif de la query string
+    value = request.GET.get(name)
+    return parse_id(value) if value else None
+
+
+def category_list():
+    return list(Category.objects.order_by('name'))
+
+
+def render_list_page(request, page, categories):
+    response = render(request, 'recipes/recipe_list.html', {
+        'recipes': page,
+        'page': page,
+        'cards': render_recipe_cards(page),
         'categories': categories
     })
+    return conditional.revalidate(request, response)
 
 
-def recipe_detail(request, id):
-    recipe = get_object_or_404(Recipe, id=id)
-    reviews = recipe.reviews.all()
-    return render(request, 'recipes/recipe_detail.html', {
+def review_queryset(recipe_id):
+    # Auteur joint dans la même requête ; parcours de l'index (recipe, -created_at, -id)
+    return (
+        Review.objects.filter(recipe_id=recipe_id).select_related('user')
+        .only('id', 'rating', 'comment', 'created_at', 'recipe_id', 'user__username')
+    )
+
+
+def detail_data(id):
+    # Recette et première page d'avis seulement : coût fixe quel que soit le nombre d'avis
+    # Statistiques d'avis jointes : lues sur une ligne précalculée (recipes.stats).
+    # Auteur non joint (created_by_id suffit) : l'objet part dans le cache partagé,
+    # ni hash de mot de passe ni e-mail ne doivent y entrer
+    recipe = get_object_or_404(Recipe.objects.select_related('category', 'stats'), id=id)
+    # Voisins précalculés (recipes.recommendations) : une requête sur l'index (recipe, -score)
+    recipe.similar_recipes = recommendations.similar_recipes(id)
+    return recipe, paginate_keyset(review_queryset(id), None, REVIEWS_PER_PAGE)
+
+
+def render_detail_page(request, recipe, reviews):
+    recipe_stats = stats.for_recipe(recipe)
+    response = render(request, 'recipes/recipe_detail.html', {
         'recipe': recipe,
         'reviews': reviews,
+        'stats': stats.summary(recipe_stats),
+        'rating_bars': stats.bars(recipe_stats),
+        'recent_days': stats.RECENT_DAYS,
         'review_form': ReviewForm(),
     })
+    return conditional.revalidate(request, response)
+
+
+@login_required
+@condition(etag_func=conditional.recipe_list_etag,
+           last_modified_func=conditional.recipe_list_last_modified)
+def recipe_list(request):
+    try:
+        page = paginate_keyset(list_queryset(), request.GET.get('cursor'), RECIPES_PER_PAGE)
+    except InvalidCursor:
+        return HttpResponseBadRequest("Curseur de pagination invalide.")
+    categories = CATEGORIES_CACHE.get_or_set(conditional.catalogue_version(request), category_list)
+    return render_list_page(request, page, categories)
+
+
+def recipe_search(request):
+    query = request.GET.get('q', '').strip()
+    try:
+        page = min(max(int(request.GET.get('page', 1)), 1), SEARCH_MAX_PAGE)
+        category_id = id_param(request, 'category')
+    except ValueError:
+        return HttpResponseBadRequest("Paramètres de recherche invalides.")
+    results = search_recipes(query, category_id=category_id, page=page,
+                             page_size=SEARCH_RESULTS_PER_PAGE)
+    return render(request, 'recipes/search.html', {
+        'query': query,
+        'results': results,
+    })
+
+
+def leaderboard(request, board):
+    # Classement précalculé (recipes.leaderboards), global ou par catégorie
+    try:
+        category_id = id_param(request, 'category')
+    except ValueError:
+        return HttpResponseBadRequest("Catégorie invalide.")
+    cursor = request.GET.get('cursor')
+    try:
+        page = LEADERBOARD_CACHE.get_or_set(
+            f'{board}:{category_id}:{cursor}',
+            lambda: paginate_ranked(leaderboards.board_queryset(board, category_id),
+                                    leaderboards.BOARDS[board], cursor, RECIPES_PER_PAGE),
+        )
+    except InvalidCursor:
+        return HttpResponseBadRequest("Curseur de pagination invalide.")
+    categories = CATEGORIES_CACHE.get_or_set(conditional.catalogue_version(request), category_list)
+    return render(request, 'recipes/leaderboard.html', {
+        'board': board,
+        'title': LEADERBOARD_TITLES[board],
+        'page': page,
+        'cards': render_recipe_cards([score.recipe for score in page]),
+        'categories': categories,
+        'category_id': category_id,
+        'query_prefix': f'category={category_id}&' if category_id is not None else '',
+    })
+
+
+@condition(etag_func=conditional.recipe_detail_etag,
+           last_modified_func=conditional.recipe_detail_last_modified)
+def recipe_detail(request, id):
+    version = conditional.recipe_detail_version(request, id)
+    if version is None:
+        raise Http404("Recette introuvable.")
+    recipe, reviews = RECIPE_DETAIL_CACHE.get_or_set(f'{id}:{version}', lambda: detail_data(id))
+    return render_detail_page(request, recipe, reviews)
+
+
+@condition(etag_func=conditional.recipe_reviews_etag,
+           last_modified_func=conditional.recipe_detail_last_modified)
+def recipe_reviews(request, id):
+    # Pages suivantes des avis : fragment HTML (« Voir plus d'avis ») ou JSON
+    if conditional.recipe_detail_version(request, id) is None:
+        raise Http404("Recette introuvable.")
+    try:
+        page = paginate_keyset(review_queryset(id), request.GET.get('cursor'), REVIEWS_PER_PAGE)
+    except InvalidCursor:
+        return HttpResponseBadRequest("Curseur de pagination invalide.")
+
+    if request.GET.get('format') == 'json' or 'application/json' in request.headers.get('Accept', ''):
+        response = JsonResponse({
+            'reviews': [
+                {'id': review.pk, 'user': review.user.username, 'rating': review.rating,
+                 'comment': review.comment, 'created_at': review.created_at.isoformat()}
+                for review in page
+            ],
+            'next_cursor': page.next_cursor,
+        })
+    else:
+        response = render(request, 'recipes/_review_page.html', {'page': page, 'recipe_id': id})
+    patch_vary_headers(response, ('Accept',))
+    return conditional.revalidate(request, response)
 
 
 @user_passes_test(is_chef)
@@ -81,14 +242,38 @@ def recipe_delete(request, id):
 
 @login_required
 def recipe_review(request, id):
-    recipe = get_object_or_404(Recipe, id=id)
     if request.method == "POST":
         form = ReviewForm(request.POST)
         if form.is_valid():
-            review = form.save(commit=False)
-            review.recipe = recipe
-            review.user = request.user
-            review.save()
-            return redirect('recipes:recipe_detail', id=id)
+            # Second avis ou double clic : l'avis existant est remplacé, pas d'erreur 500
+            try:
+                Review.objects.upsert(id, request.user.pk, form.cleaned_data['rating'],
+                                      form.cleaned_data['comment'])
+            except Recipe.DoesNotExist:
+                raise Http404("Recette introuvable.")
     # Si pas POST ou form invalide, on retourne quand même vers la page de détail
     return redirect('recipes:recipe_detail', id=id)
+
+
+@staff_member_required
+def catalogue_export(request, kind):
+    if kind not in EXPORTS:
+        raise Http404
+    fmt = request.GET.get('format', 'ndjson')
+    if fmt not in FORMATS:
+        return HttpResponseBadRequest("Format inconnu.")
+    try:
+        since = parse_since(request.GET.get('since'))
+    except ValueError:
+        return HttpResponseBadRequest("Paramètre since invalide.")
+    compress = request.GET.get('gzip') in ('1', 'true')
+
+    # Itérateur async sous ASGI : un itérateur synchrone y serait lu en entier
+    # avant l'envoi, le flux n'aurait plus de mémoire bornée
+    stream = aexport_stream if isinstance(request, ASGIRequest) else export_stream
+    response = StreamingHttpResponse(
+        stream(kind, fmt, since, compress),
+        content_type='application/gzip' if compress else f"{FORMATS[fmt][0]}; charset=utf-8",
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(kind, fmt, compress)}"'
+    return response